@@ -1,47 +1,66 @@
 """AACT Database Query Agent"""
 
-import os
-import asyncio
-from dotenv import load_dotenv
+import sys
+import contextlib
 from pathlib import Path
-from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset, StdioServerParameters
+
+# The MCP server pool, configuration and instructions live with the rest of
+# the runtime in adk_aact_agent_project
+REPO_DIR = Path(__file__).parent.parent
+if str(REPO_DIR) not in sys.path:
+    sys.path.append(str(REPO_DIR))
 from .agent import root_agent
+# Importing the configuration loads the .env file
+from adk_aact_agent_project.config import (
+    ROOT_DIR, MCP_COMMAND, MCP_ARGS, MCP_ENV, MCP_POOL_MIN_SIZE, MCP_POOL_MAX_SIZE,
+    SCHEMA_RETRIEVAL_ENABLED, SCHEMA_RETRIEVAL_TOP_K
+)
+
+# Build the correct path to the MCP server
+# Use Path for cross-platform compatibility
+MCP_SERVER_CWD = str((ROOT_DIR / "AACT_MCP").resolve())
 
-# Load environment variables
-load_dotenv()
+# Warm MCP servers shared by every agent created in this process; created by
+# the first create_agent() so importing the package stays cheap
+mcp_server_pool = None
 
 # Define the async function to create an agent with MCP tools
 async def create_agent():
     """Get ADK agent with MCP tools attached."""
-    # MCP Server Configuration
-    MCP_COMMAND = "uvx"
-    MCP_ARGS = ["mcp-server-aact"]
-    
-    # Build the correct path to the MCP server
-    # Use Path for cross-platform compatibility
-    current_dir = Path(__file__).parent
-    MCP_SERVER_CWD = str((current_dir.parent / "AACT_MCP").resolve())
-    
-    MCP_ENV = {
-        "DB_USER": os.getenv("AACT_DB_USER", ""),
-        "DB_PASSWORD": os.getenv("AACT_DB_PASSWORD", "")
-    }
-    
-    # Connect to MCP server and get tools
-    tools, exit_stack = await MCPToolset.from_server(
-        connection_params=StdioServerParameters(
+    # Servers come from the warm pool instead of a fresh uvx process per agent
+    global mcp_server_pool
+    from adk_aact_agent_project.mcp_pool import MCPServerPool, pool_tools
+    if mcp_server_pool is None:
+        mcp_server_pool = MCPServerPool(
             command=MCP_COMMAND,
             args=MCP_ARGS,
             cwd=MCP_SERVER_CWD,
-            env=MCP_ENV
+            env=MCP_ENV,
+            min_size=MCP_POOL_MIN_SIZE,
+            max_size=MCP_POOL_MAX_SIZE
         )
-    )
+    await mcp_server_pool.start()
+
+    # The schema index is shared with adk_aact_agent_project, whose accessor
+    # also keeps it refreshed in the background
+    from adk_aact_agent_project.aact_tools import get_schema_index
     
-    # Add the tools to the root agent
-    root_agent.tools = tools
+    # Add the tools to the root agent, and the definitions of the tables
+    # relevant to each question to its instruction
+    _query_agent.tools = pool_tools(mcp_server_pool, schema_index=get_schema_index)
+    if SCHEMA_RETRIEVAL_ENABLED:
+        from adk_aact_agent_project.schema_retrieval import SchemaRetriever
+        schema_retriever = SchemaRetriever(get_schema_index, top_k=SCHEMA_RETRIEVAL_TOP_K)
+        _query_agent.before_model_callback = schema_retriever.before_model_callback
+    
+    # The pool outlives individual agents, so there is nothing to clean up
+    # per agent; call mcp_server_pool.close() on shutdown.
+    exit_stack = contextlib.AsyncExitStack()
     
     # Return the agent and exit stack for proper cleanup
-    return root_agent, exit_stack
+    return _query_agent, exit_stack
+
+_query_agent = root_agent
 
 # This is the variable that ADK web will look for
-root_agent = create_agent 
\ No newline at end of file
+root_agent = create_agent
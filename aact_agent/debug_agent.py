@@ -2,13 +2,17 @@
 
 import os
 import sys
+import time
 import asyncio
 from pathlib import Path
 from dotenv import load_dotenv
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 from google.genai import types
-from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset, StdioServerParameters
+
+# The MCP server pool lives with the rest of the runtime in adk_aact_agent_project
+sys.path.append(str(Path(__file__).parent.parent))
+from adk_aact_agent_project.mcp_pool import MCPServerPool, pool_tools
 
 # Load environment variables
 load_dotenv()
@@ -37,19 +41,24 @@ async def test_agent():
     print(f"  Working Directory: {MCP_SERVER_CWD}")
     print(f"  Environment: DB_USER={MCP_ENV['DB_USER']}, DB_PASSWORD={'*' * len(MCP_ENV['DB_PASSWORD'])}")
     
+    pool = MCPServerPool(
+        command=MCP_COMMAND,
+        args=MCP_ARGS,
+        cwd=MCP_SERVER_CWD,
+        env=MCP_ENV,
+        min_size=1,
+        max_size=1
+    )
+    
     try:
-        # Connect to MCP server and get tools
-        tools, exit_stack = await MCPToolset.from_server(
-            connection_params=StdioServerParameters(
-                command=MCP_COMMAND,
-                args=MCP_ARGS,
-                cwd=MCP_SERVER_CWD,
-                env=MCP_ENV
-            )
-        )
+        # Pre-start a server from the pool and get tools
+        start_time = time.perf_counter()
+        await pool.start()
+        print(f"MCP server pool warmed in {time.perf_counter() - start_time:.2f}s")
+        tools = pool_tools(pool)
         
         print(f"Connected to MCP Server successfully!")
-        print(f"Available tools: {[tool.name for tool in tools]}")
+        print(f"Available tools: {[tool.__name__ for tool in tools]}")
         
         # Import the agent
         from agent import root_agent
@@ -110,9 +119,8 @@ async def test_agent():
     
     finally:
         # Cleanup
-        if 'exit_stack' in locals():
-            print("\nCleaning up resources...")
-            await exit_stack.aclose()
+        print("\nCleaning up resources...")
+        await pool.close()
 
 if __name__ == "__main__":
     print("===== AACT Query Agent Debug =====")
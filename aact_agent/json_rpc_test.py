@@ -8,16 +8,21 @@ import subprocess
 from pathlib import Path
 from dotenv import load_dotenv
 
+# The JSON-RPC client lives with the rest of the runtime in adk_aact_agent_project
+REPO_DIR = Path(__file__).parent.parent
+if str(REPO_DIR) not in sys.path:
+    sys.path.append(str(REPO_DIR))
+from adk_aact_agent_project.health import NotReadyError, wait_ready
+from adk_aact_agent_project.jsonrpc_client import JsonRpcClient, JsonRpcError
+
 # Load environment variables
 load_dotenv()
 
-# Define the request to list tables
-LIST_TABLES_REQUEST = {
-    "jsonrpc": "2.0",
-    "id": "test_list_tables",
-    "method": "list_tables",
-    "params": {}
-}
+# Requests sent together over one connection and matched by id
+REQUESTS = [
+    ("tools/list", {}),
+    ("tools/call", {"name": "list_tables", "arguments": {}}),
+]
 
 async def test_mcp_rpc_communication():
     """Test direct JSON-RPC communication with the MCP server."""
@@ -38,60 +43,63 @@ async def test_mcp_rpc_communication():
     print(f"  Working Directory: {os.path.abspath(MCP_SERVER_CWD)}")
     print(f"  Environment: DB_USER={MCP_ENV.get('DB_USER')}, DB_PASSWORD={'*' * len(MCP_ENV.get('DB_PASSWORD', ''))}")
     
+    client = None
     try:
         # Start the MCP server process
-        process = await asyncio.create_subprocess_exec(
-            MCP_COMMAND, *MCP_ARGS,
+        client = await JsonRpcClient.spawn(
+            MCP_COMMAND, MCP_ARGS,
             cwd=MCP_SERVER_CWD,
-            env={**os.environ, **MCP_ENV},
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
+            env=MCP_ENV,
+            timeout=10.0
         )
         
         print("MCP server process started, waiting for initialization...")
         
-        # Wait a moment for the server to initialize
-        await asyncio.sleep(2)
-        
-        # Send a JSON-RPC request
-        print(f"Sending JSON-RPC request: {json.dumps(LIST_TABLES_REQUEST)}")
-        process.stdin.write(json.dumps(LIST_TABLES_REQUEST).encode() + b'\n')
-        await process.stdin.drain()
-        
-        # Read the response
-        print("Waiting for response...")
-        response_line = await asyncio.wait_for(process.stdout.readline(), timeout=10.0)
-        response = json.loads(response_line)
-        
-        print(f"Received response: {json.dumps(response, indent=2)}")
+        # Wait for the handshake and a database ping instead of a fixed sleep
+        report = await wait_ready(client, deadline=60.0)
+        print(f"Initialized: {json.dumps(client.server_info.get('serverInfo', {}))}")
+        print(f"Ready in {report['seconds']:.2f}s ({report['attempts']} database ping attempt(s))")
         
-        # Check if the response contains an error
-        if "error" in response:
-            print(f"Error received: {response['error']}")
-        elif "result" in response:
-            print(f"Success! Tables: {response['result']}")
+        # Send the JSON-RPC requests without waiting for each response
+        for method, params in REQUESTS:
+            print(f"Sending JSON-RPC request: {method} {json.dumps(params)}")
+        print("Waiting for responses...")
+        responses = await asyncio.gather(
+            *(client.request(method, params) for method, params in REQUESTS),
+            return_exceptions=True
+        )
         
-        # Send a terminate request to properly close the server
-        terminate_request = {"jsonrpc": "2.0", "id": "terminate", "method": "terminate", "params": {}}
-        process.stdin.write(json.dumps(terminate_request).encode() + b'\n')
-        await process.stdin.drain()
+        for (method, _), response in zip(REQUESTS, responses):
+            # Check if the response contains an error
+            if isinstance(response, TimeoutError):
+                print(f"ERROR: Timeout waiting for {method} response")
+            elif isinstance(response, (JsonRpcError, ConnectionError)):
+                print(f"Error received for {method}: {response}")
+            elif isinstance(response, Exception):
+                raise response
+            else:
+                print(f"Success! {method}: {json.dumps(response, indent=2)}")
         
+        print(f"Requests: {json.dumps(client.stats())}")
         print("Test completed.")
     
-    except asyncio.TimeoutError:
-        print("ERROR: Timeout waiting for MCP server response")
+    except NotReadyError as e:
+        print(f"ERROR: MCP server not ready: {e}")
+        if client.stderr_lines:
+            print("Server stderr:\n" + "\n".join(client.stderr_lines))
+    
     except Exception as e:
         print(f"ERROR: {e}")
         import traceback
         traceback.print_exc()
+        if client is not None and client.stderr_lines:
+            print("Server stderr:\n" + "\n".join(client.stderr_lines))
     
     finally:
         # Make sure the process is terminated
-        if 'process' in locals():
+        if client is not None:
             try:
-                process.terminate()
-                await asyncio.wait_for(process.wait(), timeout=5.0)
+                await client.close()
             except Exception as ex:
                 print(f"Error terminating process: {ex}")
 
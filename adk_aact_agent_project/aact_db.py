@@ -0,0 +1,124 @@
+"""Direct AACT database access for the in-process tool transport."""
+
+import time
+
+import psycopg2
+import psycopg2.extras
+
+from .db_pool import AsyncConnectionPool
+from .result_format import ResultRows
+from .server_cursors import CursorRegistry
+from .metrics import observe_query
+from .tracing import db_span
+
+
+class AACTDatabase:
+    """Read-only, pooled access to the AACT PostgreSQL database.
+
+    Mirrors the AACT_MCP server's database access so the in-process tools
+    return the same results as the stdio ones, but runs queries on a bounded
+    pool of connections so one slow query does not stall other tool calls.
+
+    Args:
+        user: AACT database username.
+        password: AACT database password.
+        host: Database host.
+        port: Database port.
+        database: Database name.
+        min_size: Connections kept open.
+        max_size: Upper bound on open connections.
+        statement_timeout_ms: Per-connection ``statement_timeout``; 0 disables it.
+        health_check_interval: Seconds after which an idle connection is
+            pinged before reuse.
+        cursor_idle_timeout: Seconds after which an unused streaming cursor
+            is closed.
+        max_cursors: Maximum number of streaming cursors open at once.
+    """
+
+    def __init__(self, user, password, host, port, database, min_size=1, max_size=10,
+                 statement_timeout_ms=60000, health_check_interval=30.0,
+                 cursor_idle_timeout=300.0, max_cursors=4):
+        self.user = user
+        self.password = password
+        self.host = host
+        self.port = port
+        self.database = database
+        self.statement_timeout_ms = statement_timeout_ms
+        self.pool = AsyncConnectionPool(
+            connect=self._connect,
+            min_size=min_size,
+            max_size=max_size,
+            health_check_interval=health_check_interval,
+            # Statement timeouts raise OperationalError but leave the connection
+            # usable; psycopg2 marks genuinely lost connections as closed.
+            broken_errors=(psycopg2.InterfaceError,)
+        )
+        self.cursors = CursorRegistry(
+            self.pool, idle_timeout=cursor_idle_timeout, max_cursors=max_cursors
+        )
+
+    def _connect(self):
+        conn = psycopg2.connect(
+            host=self.host,
+            port=self.port,
+            database=self.database,
+            user=self.user,
+            password=self.password,
+            options=f"-c statement_timeout={int(self.statement_timeout_ms)}"
+        )
+        conn.set_session(readonly=True, autocommit=True)
+        return conn
+
+    @staticmethod
+    def _execute(conn, query, params, row_limit):
+        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            with db_span("db.execute", "postgresql"):
+                cur.execute(query, params)
+            if cur.description is None:
+                return []
+            with db_span("db.fetch", "postgresql") as span:
+                rows = cur.fetchmany(row_limit) if row_limit else cur.fetchall()
+                span.set_attribute("db.rows", len(rows))
+            columns = [column[0] for column in cur.description]
+        return ResultRows((dict(row) for row in rows), columns)
+
+    async def execute_query(self, query, params=None, row_limit=None):
+        """Execute a query on a pooled connection and return rows as dictionaries.
+
+        Args:
+            query: SQL to execute.
+            params: Optional query parameters.
+            row_limit: Optional maximum number of rows to fetch.
+
+        Returns:
+            A list of dictionaries, one per row.
+        """
+        start = time.perf_counter()
+        with db_span("db.query", "postgresql", query):
+            rows = await self.pool.run(self._execute, query, params, row_limit)
+        observe_query("postgresql", time.perf_counter() - start, len(rows))
+        return rows
+
+    async def stream_query(self, query, page_size, params=None):
+        """Run a query on a server-side cursor and return its first page.
+
+        Returns:
+            ``(rows, token)``; pass ``token`` to ``fetch_more`` for the next
+            page. ``token`` is None when there are no more rows.
+        """
+        start = time.perf_counter()
+        rows, token = await self.cursors.open(query, page_size, params)
+        observe_query("postgresql", time.perf_counter() - start, len(rows))
+        return rows, token
+
+    async def fetch_more(self, token, n):
+        """Return the next ``n`` rows of a streamed query as ``(rows, token)``."""
+        start = time.perf_counter()
+        rows, token = await self.cursors.fetch(token, n)
+        observe_query("postgresql", time.perf_counter() - start, len(rows))
+        return rows, token
+
+    async def close(self):
+        """Close open cursors and all pooled connections."""
+        await self.cursors.close_all()
+        await self.pool.close()
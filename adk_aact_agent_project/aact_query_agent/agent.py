@@ -1,7 +1,47 @@
 """AACT Database Query Agent definition."""
 
 from google.adk.agents import Agent
-from ..config import AGENT_INSTRUCTIONS
+from ..config import (
+    AGENT_INSTRUCTIONS, TOOL_TRANSPORT, BATCH_QUERY_TIMEOUT, BATCH_MAX_QUERIES, COMPACTION_ENABLED,
+    SCHEMA_RETRIEVAL_ENABLED, SCHEMA_RETRIEVAL_TOP_K
+)
+
+
+def _build_tools():
+    """Select the AACT tools for the configured transport."""
+    tools = _transport_tools()
+    if COMPACTION_ENABLED:
+        from ..compaction import recall_tool
+        from ..plugins import result_store
+        tools.append(recall_tool(result_store))
+    return tools
+
+
+def _transport_tools():
+    if TOOL_TRANSPORT == "inprocess":
+        from ..aact_tools import inprocess_tools
+        return inprocess_tools()
+    # Tools are served by the shared pool of warm MCP server processes;
+    # schema lookups are answered from the in-memory schema index.
+    from ..aact_tools import get_schema_index
+    from ..mcp_pool import pool_tools
+    from ..plugins import mcp_server_pool
+    return pool_tools(
+        mcp_server_pool,
+        schema_index=get_schema_index,
+        batch_timeout=BATCH_QUERY_TIMEOUT,
+        batch_max_queries=BATCH_MAX_QUERIES
+    )
+
+
+def _schema_callback():
+    """Inject the tables relevant to each question into the instruction."""
+    if not SCHEMA_RETRIEVAL_ENABLED:
+        return None
+    from ..aact_tools import get_schema_index
+    from ..schema_retrieval import SchemaRetriever
+    return SchemaRetriever(get_schema_index, top_k=SCHEMA_RETRIEVAL_TOP_K).before_model_callback
+
 
 # Define the root agent
 root_agent = Agent(
@@ -9,6 +49,6 @@ root_agent = Agent(
     model="gemini-2.0-flash", # Or another Gemini model
     description="An agent that interacts with the AACT clinical trials database.",
     instruction=AGENT_INSTRUCTIONS,
-    # DO NOT list tools here - the MCPStdioPlugin will provide them.
-    tools=[]
-) 
\ No newline at end of file
+    tools=_build_tools(),
+    before_model_callback=_schema_callback()
+)
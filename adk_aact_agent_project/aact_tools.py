@@ -0,0 +1,407 @@
+"""In-process AACT tools.
+
+These functions replace the stdio round trip to the AACT_MCP server with
+native ADK function tools running in the agent's own event loop. They keep
+the server's tool names and arguments so ``AGENT_INSTRUCTIONS`` applies to
+either transport. Queries run on a pooled connection in a worker thread, so
+concurrent calls from different sessions execute in parallel.
+"""
+
+import asyncio
+import datetime
+import decimal
+import logging
+
+from . import aggregate_cubes as cubes
+from .batch_query import run_batch
+from .config import (
+    DB_HOST, DB_PORT, DB_NAME, DB_SCHEMA, MCP_ENV, DB_ENGINE, MIRROR_DIR, CUBES_DIR,
+    DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_STATEMENT_TIMEOUT_MS, DB_HEALTH_CHECK_INTERVAL,
+    QUERY_CACHE_ENABLED, QUERY_CACHE_MAX_ENTRIES, QUERY_CACHE_MAX_BYTES,
+    QUERY_GUARD_ENABLED, QUERY_MAX_COST, QUERY_MAX_PLAN_ROWS, QUERY_INJECT_LIMIT,
+    SNAPSHOT_QUERY, SNAPSHOT_CHECK_INTERVAL, SCHEMA_PATH, SCHEMA_REFRESH_INTERVAL,
+    STREAM_CURSOR_IDLE_TIMEOUT, STREAM_MAX_CURSORS, RESULT_FORMAT, RESULT_DICTIONARY_ENCODING,
+    BATCH_QUERY_TIMEOUT, BATCH_MAX_QUERIES, INSIGHTS_PATH, INSIGHTS_FSYNC, INSIGHTS_MEMO_PAGE_SIZE
+)
+from .insights_store import InsightsStore
+from .query_cache import QueryCache
+from .query_guard import QueryGuard
+from .result_format import encode_compact
+from .schema_index import SchemaIndex
+from .server_cursors import CursorNotFound
+
+logger = logging.getLogger(__name__)
+
+_database = None
+aggregate_cubes = cubes.AggregateCubes(CUBES_DIR)
+insights_store = InsightsStore(INSIGHTS_PATH or None, fsync=INSIGHTS_FSYNC)
+
+# Upper bound on search_insights results, which go into the prompt
+MAX_INSIGHT_RESULTS = 20
+query_cache = QueryCache(max_entries=QUERY_CACHE_MAX_ENTRIES, max_bytes=QUERY_CACHE_MAX_BYTES)
+_snapshot_task = None
+query_guard = QueryGuard(max_cost=QUERY_MAX_COST, max_rows=QUERY_MAX_PLAN_ROWS)
+schema_index = SchemaIndex(SCHEMA_PATH)
+
+
+def get_schema_index():
+    """Return the schema index if the schema resource is available, else None.
+
+    The first call loads the index and starts its background refresh.
+    """
+    if not schema_index.ensure_loaded():
+        return None
+    schema_index.start_refresh(SCHEMA_REFRESH_INTERVAL)
+    return schema_index
+
+
+def get_database():
+    """Return the shared database connection, creating it on first use."""
+    global _database
+    if _database is None and DB_ENGINE == "duckdb":
+        from .duckdb_mirror import DuckDBDatabase
+        _database = DuckDBDatabase(
+            MIRROR_DIR,
+            max_concurrency=DB_POOL_MAX_SIZE,
+            statement_timeout_ms=DB_STATEMENT_TIMEOUT_MS,
+            cursor_idle_timeout=STREAM_CURSOR_IDLE_TIMEOUT,
+            max_cursors=STREAM_MAX_CURSORS
+        )
+    elif _database is None:
+        from .aact_db import AACTDatabase
+        _database = AACTDatabase(
+            user=MCP_ENV["DB_USER"],
+            password=MCP_ENV["DB_PASSWORD"],
+            host=DB_HOST,
+            port=DB_PORT,
+            database=DB_NAME,
+            min_size=DB_POOL_MIN_SIZE,
+            max_size=DB_POOL_MAX_SIZE,
+            statement_timeout_ms=DB_STATEMENT_TIMEOUT_MS,
+            health_check_interval=DB_HEALTH_CHECK_INTERVAL,
+            cursor_idle_timeout=STREAM_CURSOR_IDLE_TIMEOUT,
+            max_cursors=STREAM_MAX_CURSORS
+        )
+    return _database
+
+
+def _start_snapshot_probe():
+    """Start probing the AACT snapshot in the background on the running loop, once.
+
+    The probe query never runs on a request's path; until its first result
+    the query cache and the cubes have no snapshot to check against.
+    """
+    global _snapshot_task
+    loop = asyncio.get_running_loop()
+    if _snapshot_task is None or _snapshot_task.done() or _snapshot_task.get_loop() is not loop:
+        _snapshot_task = loop.create_task(_probe_snapshot_forever())
+
+
+async def _probe_snapshot_forever():
+    while True:
+        await _probe_snapshot()
+        await asyncio.sleep(SNAPSHOT_CHECK_INTERVAL)
+
+
+async def _probe_snapshot():
+    """Read the AACT snapshot date and clear the query cache if it changed."""
+    try:
+        if DB_ENGINE == "duckdb":
+            # The mirror records the snapshot it was built from.
+            snapshot = await asyncio.to_thread(lambda: get_database().snapshot)
+        else:
+            rows = await get_database().execute_query(SNAPSHOT_QUERY)
+            snapshot = str(next(iter(rows[0].values()))) if rows else None
+    except Exception as e:
+        logger.warning("AACT snapshot probe failed, clearing query cache: %s", e)
+        query_cache.clear()
+        return
+    query_cache.check_snapshot(snapshot)
+
+
+def _jsonable(value):
+    """Convert database values that are not JSON serializable to strings."""
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time, decimal.Decimal)):
+        return str(value)
+    return value
+
+
+def _rows(rows):
+    return [{key: _jsonable(value) for key, value in row.items()} for row in rows]
+
+
+def _result(rows, **extra):
+    """Shape query rows for the agent in the configured ``RESULT_FORMAT``."""
+    if RESULT_FORMAT == "compact":
+        data = encode_compact(rows, dictionary=RESULT_DICTIONARY_ENCODING)
+    else:
+        data = _rows(rows)
+    return {"data": data, **extra}
+
+
+async def list_tables():
+    """Shows all available tables in the AACT database."""
+    index = get_schema_index()
+    if index is not None:
+        return index.list_tables()
+    rows = await get_database().execute_query(
+        "SELECT table_name FROM information_schema.tables "
+        "WHERE table_schema = %s ORDER BY table_name",
+        (DB_SCHEMA,)
+    )
+    return [row["table_name"] for row in rows]
+
+
+async def describe_table(table_name: str):
+    """Shows the columns and data types for a specific table.
+
+    Args:
+        table_name: Name of the table to describe.
+    """
+    index = get_schema_index()
+    if index is not None:
+        columns = index.describe_table(table_name.removeprefix(f"{DB_SCHEMA}."))
+        if columns is not None:
+            return columns
+    rows = await get_database().execute_query(
+        "SELECT column_name AS name, data_type AS type, is_nullable AS nullable "
+        "FROM information_schema.columns "
+        "WHERE table_schema = %s AND table_name = %s ORDER BY ordinal_position",
+        (DB_SCHEMA, table_name)
+    )
+    if not rows:
+        return {"error": f"Table '{table_name}' not found in schema '{DB_SCHEMA}'"}
+    return _rows(rows)
+
+
+async def _check_cost(query):
+    """Return a rejection if ``query`` is over the planner budgets, else None."""
+    # The DuckDB mirror is local, and its EXPLAIN output is not Postgres'.
+    if not QUERY_GUARD_ENABLED or DB_ENGINE == "duckdb":
+        return None
+    return await query_guard.check(get_database(), query)
+
+
+async def read_query(query: str, max_rows: int = 25, stream: bool = False):
+    """Executes a SELECT SQL query to fetch data. Only SELECT queries are allowed.
+
+    Args:
+        query: The SELECT statement to execute.
+        max_rows: Maximum number of rows to return (page size when streaming).
+        stream: If true, return the first page and a continuation_token for
+            fetch_more instead of truncating the result.
+    """
+    if not query.strip().upper().startswith(("SELECT", "WITH")):
+        return {"error": "Only SELECT queries are allowed"}
+    if max_rows < 1:
+        return {"error": "max_rows must be at least 1"}
+    if stream:
+        rejection = await _check_cost(query)
+        if rejection is not None:
+            return rejection
+        try:
+            rows, token = await get_database().stream_query(query, max_rows)
+        except Exception as e:
+            return {"error": str(e)}
+        return _result(rows, continuation_token=token)
+    if QUERY_CACHE_ENABLED:
+        _start_snapshot_probe()
+        cached = query_cache.get(query, max_rows)
+        if cached is not None:
+            return _result(cached)
+    bounded = query_guard.apply_limit(query, max_rows) if QUERY_INJECT_LIMIT else query
+    rejection = await _check_cost(bounded)
+    if rejection is not None:
+        return rejection
+    try:
+        rows = await get_database().execute_query(bounded, row_limit=max_rows)
+    except Exception as e:
+        return {"error": str(e)}
+    if QUERY_CACHE_ENABLED:
+        query_cache.put(query, max_rows, rows)
+    return _result(rows)
+
+
+async def batch_read_query(queries: dict[str, str], max_rows: int = 25):
+    """Executes several independent SELECT queries concurrently and returns all results.
+
+    Args:
+        queries: Object mapping a short name for each result to its SELECT statement.
+        max_rows: Maximum number of rows to return per query.
+    """
+    return await run_batch(
+        lambda query: read_query(query, max_rows),
+        queries,
+        timeout=BATCH_QUERY_TIMEOUT,
+        max_queries=BATCH_MAX_QUERIES
+    )
+
+
+async def fetch_more(token: str, n: int = 25):
+    """Returns the next rows of a query started with read_query(stream=True).
+
+    Args:
+        token: The continuation_token returned by the previous page.
+        n: Number of rows to return.
+    """
+    if n < 1:
+        return {"error": "n must be at least 1"}
+    try:
+        rows, next_token = await get_database().fetch_more(token, n)
+    except CursorNotFound as e:
+        return {"error": f"{e}; run the query again with stream=True"}
+    except Exception as e:
+        return {"error": str(e)}
+    return _result(rows, continuation_token=next_token)
+
+
+async def _live_snapshot():
+    """Return the snapshot of the database queried, or None if unknown.
+
+    That is the mirror's snapshot with the DuckDB engine, and the latest
+    ``SNAPSHOT_QUERY`` result (probed in the background every
+    ``SNAPSHOT_CHECK_INTERVAL`` seconds) on AACT Postgres.
+    """
+    if DB_ENGINE == "duckdb":
+        return await asyncio.to_thread(lambda: get_database().snapshot)
+    _start_snapshot_probe()
+    return query_cache.snapshot
+
+
+def _cube_lookup(group_by, filters, max_rows, live_snapshot):
+    """Answer from the aggregate cubes; return ``(rows, total, snapshot)`` or None."""
+    snapshot = aggregate_cubes.snapshot
+    # Cubes built from another snapshot than the one being queried are stale
+    if snapshot is None or snapshot != live_snapshot:
+        return None
+    found = aggregate_cubes.lookup(group_by, filters, limit=max_rows)
+    return None if found is None else (*found, snapshot)
+
+
+async def query_aggregates(
+    group_by: list[str] | None = None,
+    phase: list[str] | None = None,
+    overall_status: list[str] | None = None,
+    condition: list[str] | None = None,
+    country: list[str] | None = None,
+    start_year_from: int | None = None,
+    start_year_to: int | None = None,
+    max_rows: int = 25
+):
+    """Counts studies by phase, status, start year, condition and country from precomputed aggregates.
+
+    Args:
+        group_by: Dimensions to count by, any of phase, overall_status,
+            start_year, condition, country; empty for a single total.
+        phase: Only these phases, e.g. ["PHASE3"].
+        overall_status: Only these statuses, e.g. ["COMPLETED"].
+        condition: Only these lower-case MeSH condition terms, e.g. ["neoplasms"].
+        country: Only these countries, e.g. ["United States"].
+        start_year_from: Only studies starting in or after this year.
+        start_year_to: Only studies starting in or before this year.
+        max_rows: Maximum number of groups to return, largest first.
+    """
+    if max_rows < 1:
+        return {"error": "max_rows must be at least 1"}
+    group_by = list(dict.fromkeys(group_by or []))
+    filters = {
+        name: values
+        for name, values in (("phase", phase), ("overall_status", overall_status),
+                             ("condition", condition), ("country", country))
+        if values
+    }
+    if start_year_from is not None or start_year_to is not None:
+        filters["start_year"] = (start_year_from, start_year_to)
+    error = cubes.validate(group_by, filters)
+    if error:
+        return {"error": error}
+
+    if cubes.answerable(group_by, filters):
+        try:
+            live_snapshot = await _live_snapshot()
+            found = await asyncio.to_thread(_cube_lookup, group_by, filters, max_rows, live_snapshot)
+        except Exception as e:
+            logger.warning("Aggregate cube lookup failed, using read_query: %s", e)
+            found = None
+        if found is not None:
+            rows, total, snapshot = found
+            extra = {"source": "aggregates", "snapshot": snapshot, "total_groups": total}
+            if condition and not any(row["studies"] for row in rows):
+                hints = []
+                for term in condition:
+                    suggestions = await asyncio.to_thread(aggregate_cubes.suggest_conditions, term)
+                    if not suggestions:
+                        hints.append(f"'{term}' is not a MeSH condition term")
+                    elif suggestions[0] != term.lower():
+                        hints.append(f"'{term}' is not a MeSH condition term; similar terms: {suggestions}")
+                if hints:
+                    extra["hint"] = "; ".join(hints) + ". Condition terms are lower-case MeSH terms, e.g. 'neoplasms'"
+            return _result(rows, **extra)
+
+    aggregate_cubes.counters["fallbacks"] += 1
+    result = await read_query(cubes.fallback_sql(group_by, filters, DB_SCHEMA), max_rows)
+    if "error" not in result:
+        result["source"] = "read_query"
+    return result
+
+
+async def append_insight(finding: str, tags: list[str] | None = None, tool_context=None):
+    """Saves a key finding or observation from your analysis.
+
+    Args:
+        finding: The insight to record.
+        tags: Optional short topic labels, e.g. ["oncology", "phase 3"].
+    """
+    session = tool_context.session if tool_context is not None else None
+    await insights_store.append(
+        finding,
+        session=session.id if session else None,
+        user=session.user_id if session else None,
+        tags=tags
+    )
+    return "Insight added to memo"
+
+
+async def search_insights(query: str, k: int = 5, tag: str | None = None):
+    """Finds previously recorded insights relevant to a question.
+
+    Args:
+        query: Words describing what you are looking for.
+        k: Maximum number of insights to return.
+        tag: Optional tag the insights must have.
+    """
+    k = max(1, min(k, MAX_INSIGHT_RESULTS))
+    results = insights_store.search(query, k=k, tag=tag)
+    return {
+        "insights": [
+            {
+                "finding": record["finding"],
+                "tags": record["tags"],
+                "added": datetime.datetime.fromtimestamp(record["ts"]).strftime("%Y-%m-%d %H:%M"),
+                "score": round(score, 2),
+            }
+            for record, score in results
+        ],
+        "total_insights": len(insights_store),
+    }
+
+
+async def get_insights_memo(page: int = -1, tag: str | None = None):
+    """Returns one page of the insights memo, the recorded findings in the order they were added.
+
+    Args:
+        page: 1-based page number; -1 (the default) is the most recent page.
+        tag: Optional tag the insights must have.
+    """
+    memo = await asyncio.to_thread(
+        insights_store.memo, page=page, page_size=INSIGHTS_MEMO_PAGE_SIZE, tag=tag
+    )
+    return {"memo": memo}
+
+
+def inprocess_tools():
+    """Return the AACT tools as native ADK function tools."""
+    return [
+        list_tables, describe_table, read_query, batch_read_query, fetch_more, query_aggregates,
+        append_insight, search_insights, get_insights_memo
+    ]
@@ -1,14 +1,33 @@
 """Agent definition for ADK Web compatibility.
 
-This file makes the agent compatible with the ADK Web framework,
-which expects to find a 'root_agent' in a module named 'agent'
-at the project root level.
+This file makes the agent compatible with the ADK Web framework, which
+loads ``app`` (or ``root_agent``) from a module named 'agent' in the agent
+directory. Run ``adk web`` from the repository root, so this module is
+imported as ``adk_aact_agent_project.agent``.
 """
 
+from google.adk.apps import App
+
 # Re-export the root_agent from the aact_query_agent package
-from aact_query_agent import root_agent
+from .aact_query_agent import root_agent
 
 # Re-export other required objects
-from config import APP_NAME
-from plugins import aact_mcp_plugin
-from sessions import session_service 
\ No newline at end of file
+from .config import APP_NAME, METRICS_HOST, METRICS_PORT
+from .plugins import metrics_registry, runner_plugins, start_metrics_server
+from .sessions import session_service
+
+# ADK Web builds its runner from this App, so the runner plugins (metrics,
+# context compaction, question cache) apply to web sessions too
+app = App(name=APP_NAME, root_agent=root_agent, plugins=runner_plugins)
+
+# Prometheus endpoint with turn, tool, database, cache and pool metrics
+metrics_server = start_metrics_server(METRICS_PORT, METRICS_HOST, metrics_registry) if METRICS_PORT else None
+
+
+def __getattr__(name):
+    # The MCP plugin and server pool are only created when something asks
+    # for them; the in-process transport never does.
+    if name in ("aact_mcp_plugin", "mcp_server_pool"):
+        from . import plugins
+        return getattr(plugins, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
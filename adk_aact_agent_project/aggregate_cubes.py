@@ -0,0 +1,330 @@
+"""Precomputed study counts for the most common AACT questions.
+
+Most exploratory questions ("phase 3 trials related to cancer", "recruiting
+trials by country") are distinct study counts grouped and filtered by a few
+dimensions. ``build_cubes`` computes them once per AACT snapshot from the
+Parquet mirror, over every combination (``GROUP BY CUBE``) of
+
+* ``phase`` and ``overall_status`` (``studies``),
+* ``start_year`` (year of ``studies.start_date``),
+* ``condition`` (``browse_conditions.downcase_mesh_term``, MeSH terms and
+  their ancestors, so "neoplasms" covers every cancer),
+* ``country`` (``countries.name``, removed countries excluded),
+
+and writes them to one Parquet file sorted by grouping set. ``AggregateCubes``
+answers a count from the grouping set holding exactly the requested
+dimensions, which takes milliseconds instead of a join and scan on AACT.
+
+A study has one phase, status and start year but may have several conditions
+and countries, so counts for several conditions or countries at once cannot
+be added up from the cube without counting a study twice. ``answerable``
+refuses those, and ``fallback_sql`` gives the equivalent query for
+``read_query``.
+
+Build the cubes after each mirror refresh (from the repository root):
+    python -m adk_aact_agent_project.aggregate_cubes --mirror-dir ~/aact/mirror
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+
+from .duckdb_mirror import METADATA_FILE, _import_duckdb
+
+logger = logging.getLogger(__name__)
+
+CUBES_FILE = "aggregate_cubes.parquet"
+CUBES_METADATA_FILE = "aggregate_cubes.json"
+
+# Dimension name -> SQL expression over the ``s`` (studies), ``bc``
+# (browse_conditions) and ``c`` (countries) aliases, in grouping order
+DIMENSIONS = {
+    "phase": "s.phase",
+    "overall_status": "s.overall_status",
+    "start_year": "CAST(extract(year FROM s.start_date) AS INTEGER)",
+    "condition": "bc.downcase_mesh_term",
+    "country": "c.name",
+}
+# Dimensions a study can have several values of
+MULTI_VALUED = ("condition", "country")
+REQUIRED_TABLES = ("studies", "browse_conditions", "countries")
+
+
+def _mask(dimensions):
+    """``GROUPING()`` value of the grouping set over ``dimensions``.
+
+    The first dimension is the most significant bit; a bit is set when the
+    dimension is aggregated away.
+    """
+    mask = 0
+    for i, name in enumerate(DIMENSIONS):
+        if name not in dimensions:
+            mask |= 1 << (len(DIMENSIONS) - 1 - i)
+    return mask
+
+
+def _literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _where(filters, column):
+    """SQL predicates for ``filters``; ``column(name)`` gives each dimension's column."""
+    predicates = []
+    for name, values in filters.items():
+        if name == "start_year":
+            if isinstance(values, tuple):
+                low, high = values
+                if low is not None:
+                    predicates.append(f"{column(name)} >= {int(low)}")
+                if high is not None:
+                    predicates.append(f"{column(name)} <= {int(high)}")
+            else:
+                predicates.append(f"{column(name)} IN ({', '.join(str(int(v)) for v in values)})")
+        else:
+            predicates.append(f"lower({column(name)}) IN ({', '.join(_literal(str(v).lower()) for v in values)})")
+    return predicates
+
+
+def validate(group_by, filters):
+    """Return an error message if the request uses unknown dimensions, else None.
+
+    Args:
+        group_by: Dimensions to group by.
+        filters: Dimension -> list of accepted values; ``start_year`` may
+            also be an inclusive ``(min, max)`` tuple with either end None.
+    """
+    unknown = sorted(set(group_by).union(filters) - set(DIMENSIONS))
+    if unknown:
+        return f"Unknown dimension(s) {', '.join(unknown)}; available: {', '.join(DIMENSIONS)}"
+    for name, values in filters.items():
+        if name == "start_year":
+            try:
+                [int(v) for v in values if v is not None]
+            except (TypeError, ValueError):
+                return "start_year values must be years"
+    return None
+
+
+def answerable(group_by, filters):
+    """Whether the cubes give an exact answer.
+
+    Counts over several conditions or countries that are not grouped by
+    would count studies with more than one of them twice.
+    """
+    return all(len(filters[name]) == 1 or name in group_by for name in MULTI_VALUED if name in filters)
+
+
+def fallback_sql(group_by, filters, schema="ctgov"):
+    """Return the query computing the same counts on the AACT database."""
+    used = set(group_by).union(filters)
+    columns = [f"{DIMENSIONS[name]} AS {name}" for name in group_by]
+    lines = [f"SELECT {', '.join(columns + ['count(DISTINCT s.nct_id) AS studies'])}", f"FROM {schema}.studies s"]
+    if "condition" in used:
+        lines.append(f"LEFT JOIN {schema}.browse_conditions bc ON bc.nct_id = s.nct_id")
+    if "country" in used:
+        lines.append(f"LEFT JOIN {schema}.countries c ON c.nct_id = s.nct_id AND NOT coalesce(c.removed, false)")
+    predicates = _where(filters, lambda name: DIMENSIONS[name])
+    if predicates:
+        lines.append("WHERE " + " AND ".join(predicates))
+    if group_by:
+        lines.append(f"GROUP BY {', '.join(str(i + 1) for i in range(len(group_by)))}")
+        lines.append("ORDER BY studies DESC")
+    return "\n".join(lines)
+
+
+def build_cubes(mirror_dir, cubes_dir=None, threads=None):
+    """Compute the cubes from a Parquet mirror.
+
+    Args:
+        mirror_dir: Directory produced by ``duckdb_mirror.build_mirror``.
+        cubes_dir: Directory to write the cubes to; defaults to ``mirror_dir``.
+        threads: DuckDB worker threads; defaults to DuckDB's own choice.
+
+    Returns:
+        The metadata written next to the cubes.
+    """
+    duckdb = _import_duckdb()
+    mirror_dir = pathlib.Path(mirror_dir)
+    cubes_dir = pathlib.Path(cubes_dir or mirror_dir)
+    cubes_dir.mkdir(parents=True, exist_ok=True)
+    missing = [table for table in REQUIRED_TABLES if not (mirror_dir / f"{table}.parquet").exists()]
+    if missing:
+        raise FileNotFoundError(f"The mirror in {mirror_dir} lacks {', '.join(missing)}")
+    with open(mirror_dir / METADATA_FILE, encoding="utf-8") as f:
+        snapshot = json.load(f).get("snapshot")
+
+    def table(name):
+        return f"read_parquet('{(mirror_dir / f'{name}.parquet').as_posix()}')"
+
+    # Conditions and countries are deduplicated per study first, so a study
+    # contributes one fact per (condition, country) pair
+    facts = (
+        f"SELECT s.nct_id, {', '.join(f'{sql} AS {name}' for name, sql in DIMENSIONS.items())} "
+        f"FROM {table('studies')} s "
+        f"LEFT JOIN (SELECT DISTINCT nct_id, downcase_mesh_term FROM {table('browse_conditions')}) bc "
+        f"ON bc.nct_id = s.nct_id "
+        f"LEFT JOIN (SELECT DISTINCT nct_id, name FROM {table('countries')} "
+        f"WHERE NOT coalesce(TRY_CAST(removed AS BOOLEAN), false)) c ON c.nct_id = s.nct_id"
+    )
+    names = ", ".join(DIMENSIONS)
+    target = cubes_dir / CUBES_FILE
+    partial = target.with_suffix(".parquet.tmp")
+    start = time.perf_counter()
+    con = duckdb.connect()
+    try:
+        if threads:
+            con.execute(f"SET threads = {int(threads)}")
+        con.execute(
+            f"COPY (SELECT GROUPING({names}) AS grouping_id, {names}, count(DISTINCT nct_id) AS studies "
+            f"FROM ({facts}) GROUP BY CUBE ({names}) ORDER BY grouping_id, condition, country) "
+            f"TO '{partial.as_posix()}' (FORMAT parquet, COMPRESSION zstd)"
+        )
+        os.replace(partial, target)
+        rows = con.execute(f"SELECT count(*) FROM read_parquet('{target.as_posix()}')").fetchone()[0]
+    finally:
+        con.close()
+
+    metadata = {
+        "snapshot": snapshot,
+        "built_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "dimensions": list(DIMENSIONS),
+        "rows": rows,
+        "seconds": round(time.perf_counter() - start, 1),
+    }
+    with open(cubes_dir / CUBES_METADATA_FILE, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+    return metadata
+
+
+class AggregateCubes:
+    """Read side of the cubes written by ``build_cubes``.
+
+    The cubes are reopened when their metadata file changes, so a rebuild
+    after an AACT refresh is picked up without a restart.
+
+    Args:
+        directory: Directory holding the cubes.
+    """
+
+    def __init__(self, directory):
+        self.directory = pathlib.Path(directory)
+        self.metadata = {}
+        self._con = None
+        self._stamp = None
+        self._lock = threading.Lock()
+        self.counters = {"lookups": 0, "fallbacks": 0}
+
+    def _metadata_stamp(self):
+        try:
+            stat = (self.directory / CUBES_METADATA_FILE).stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _connect(self):
+        """Return a DuckDB connection over the current cubes, or None if there are none."""
+        stamp = self._metadata_stamp()
+        with self._lock:
+            if stamp != self._stamp:
+                if self._con is not None:
+                    self._con.close()
+                self._con = None
+                self.metadata = {}
+                self._stamp = stamp
+                if stamp is not None:
+                    duckdb = _import_duckdb()
+                    with open(self.directory / CUBES_METADATA_FILE, encoding="utf-8") as f:
+                        self.metadata = json.load(f)
+                    con = duckdb.connect(":memory:")
+                    con.execute(
+                        f"CREATE VIEW cube AS SELECT * FROM read_parquet('{(self.directory / CUBES_FILE).as_posix()}')"
+                    )
+                    self._con = con
+                    logger.info("Loaded aggregate cubes for snapshot %s", self.metadata.get("snapshot"))
+            return self._con
+
+    @property
+    def snapshot(self):
+        """Snapshot the cubes were built from, or None without cubes."""
+        self._connect()
+        return self.metadata.get("snapshot")
+
+    def lookup(self, group_by, filters, limit=25):
+        """Return ``(rows, total_groups)`` from the cubes, or None without cubes.
+
+        The request must be ``answerable``. Rows have the ``group_by``
+        dimensions and ``studies``, largest counts first.
+        """
+        con = self._connect()
+        if con is None:
+            return None
+        self.counters["lookups"] += 1
+        predicates = [f"grouping_id = {_mask(set(group_by).union(filters))}"]
+        predicates += _where(filters, lambda name: name)
+        where = " AND ".join(predicates)
+        names = ", ".join(group_by)
+        if group_by:
+            # Single-valued dimensions that are filtered but not grouped by are
+            # summed away, which counts each study once
+            query = (
+                f"SELECT {names}, sum(studies)::BIGINT AS studies, count(*) OVER () AS total_groups "
+                f"FROM cube WHERE {where} GROUP BY {names} ORDER BY studies DESC, {names} LIMIT {int(limit)}"
+            )
+        else:
+            query = f"SELECT coalesce(sum(studies), 0)::BIGINT AS studies, 1 AS total_groups FROM cube WHERE {where}"
+        cursor = con.cursor()
+        try:
+            cursor.execute(query)
+            columns = [column[0] for column in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+        total = rows[0].pop("total_groups") if rows else 0
+        for row in rows[1:]:
+            del row["total_groups"]
+        return rows, total
+
+    def suggest_conditions(self, text, limit=10):
+        """Return condition terms containing ``text``: ``text`` itself if known, then most studies first."""
+        con = self._connect()
+        if con is None:
+            return []
+        cursor = con.cursor()
+        try:
+            cursor.execute(
+                f"SELECT condition FROM cube WHERE grouping_id = {_mask({'condition'})} "
+                f"AND condition LIKE ? ORDER BY condition = ? DESC, studies DESC LIMIT {int(limit)}",
+                [f"%{text.lower()}%", text.lower()]
+            )
+            return [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def stats(self):
+        """Return lookup counters and the cubes' snapshot and size."""
+        self._connect()
+        return {**self.counters, "snapshot": self.metadata.get("snapshot"), "rows": self.metadata.get("rows", 0)}
+
+    def close(self):
+        with self._lock:
+            if self._con is not None:
+                self._con.close()
+                self._con = None
+            self._stamp = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build aggregate cubes from an AACT Parquet mirror.")
+    parser.add_argument("--mirror-dir", required=True, help="Directory with the Parquet mirror")
+    parser.add_argument("--cubes-dir", help="Directory to write the cubes to (defaults to the mirror directory)")
+    parser.add_argument("--threads", type=int, help="DuckDB worker threads")
+    args = parser.parse_args()
+
+    print(f"Building aggregate cubes from {args.mirror_dir}...")
+    metadata = build_cubes(args.mirror_dir, args.cubes_dir, args.threads)
+    print(f"{metadata['rows']} cells for snapshot {metadata['snapshot']} in {metadata['seconds']}s.")
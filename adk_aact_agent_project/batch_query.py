@@ -0,0 +1,58 @@
+"""Concurrent execution of named queries for ``batch_read_query``.
+
+Answering one question often takes several independent queries (counts per
+phase, per status, per year). Sent one at a time, each costs a full
+model→tool→model round trip. A batch runs them all at once under a single
+deadline and returns every result, or error, in one tool response.
+"""
+
+import asyncio
+import time
+
+
+async def run_batch(run_query, queries, timeout=30.0, max_queries=8):
+    """Run named queries concurrently.
+
+    Args:
+        run_query: Coroutine function taking a query string and returning its
+            tool result.
+        queries: Mapping of result name to SELECT statement.
+        timeout: Overall deadline in seconds; queries still running when it
+            passes are cancelled and reported as errors.
+        max_queries: Maximum number of queries accepted in one batch.
+
+    Returns:
+        ``{"results": {name: result}, "elapsed_ms": ...}``.
+    """
+    if not isinstance(queries, dict) or not queries:
+        return {"error": "queries must be a non-empty object mapping names to SELECT statements"}
+    if len(queries) > max_queries:
+        return {"error": f"At most {max_queries} queries can be batched; split the batch"}
+
+    start = time.perf_counter()
+    tasks = {
+        name: asyncio.ensure_future(run_query(query))
+        for name, query in queries.items()
+    }
+    try:
+        _, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+    except asyncio.CancelledError:
+        for task in tasks.values():
+            task.cancel()
+        raise
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    results = {}
+    for name, task in tasks.items():
+        if task in pending:
+            results[name] = {"error": f"Not finished within the {timeout:g}s batch deadline"}
+        elif task.cancelled():
+            results[name] = {"error": "Query was cancelled"}
+        elif task.exception() is not None:
+            results[name] = {"error": str(task.exception())}
+        else:
+            results[name] = task.result()
+    return {"results": results, "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)}
@@ -0,0 +1,120 @@
+"""Benchmark ``query_aggregates`` against computing the same counts live.
+
+Builds the aggregate cubes over a mirror, then answers a set of common
+questions (counts by phase, status, start year, condition and country) two
+ways through the in-process tools:
+
+* ``query_aggregates``, answered from the cubes;
+* ``read_query`` with the equivalent SQL (``fallback_sql``) on the mirror,
+  with the query cache disabled so every call scans the tables.
+
+Both answers are compared, and latency percentiles are reported per path.
+By default the mirror is a synthetic stand-in built in a temporary directory
+(as in ``loadgen``); ``--mirror-dir`` uses a real one, whose cubes are
+rebuilt in place. The live path is the DuckDB mirror, so against the remote
+AACT Postgres the difference is larger.
+
+Usage (from the repository root):
+    python -m adk_aact_agent_project.bench_aggregates --studies 100000 --repeats 20
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+QUESTIONS = [
+    ("phase 3 trials per condition", {"group_by": ["condition"], "phase": ["PHASE3"]}),
+    ("studies by phase and status", {"group_by": ["phase", "overall_status"]}),
+    ("completed diabetes trials per start year", {
+        "group_by": ["start_year"], "condition": ["diabetes"], "overall_status": ["COMPLETED"]}),
+    ("recruiting trials per country", {"group_by": ["country"], "overall_status": ["RECRUITING"]}),
+    ("asthma trials in France since 2015", {"condition": ["asthma"], "country": ["France"], "start_year_from": 2015}),
+    ("phase 2 trials per country and condition", {"group_by": ["country", "condition"], "phase": ["PHASE2"]}),
+]
+
+
+def _filters(arguments):
+    filters = {name: arguments[name] for name in ("phase", "overall_status", "condition", "country") if name in arguments}
+    if "start_year_from" in arguments or "start_year_to" in arguments:
+        filters["start_year"] = (arguments.get("start_year_from"), arguments.get("start_year_to"))
+    return filters
+
+
+def _key(rows):
+    return sorted(tuple(str(value) for value in row.values()) for row in rows)
+
+
+async def _time(call, repeats):
+    # The first call opens the mirror or the cubes
+    await call()
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = await call()
+        latencies.append(time.perf_counter() - start)
+    return result, latencies
+
+
+async def run(args, _percentile):
+    from . import aact_tools
+    from .aggregate_cubes import fallback_sql
+
+    print(f"\n{'cube p50 ms':>12}{'p95 ms':>8}{'live p50 ms':>13}{'p95 ms':>8}{'speedup':>9}  question")
+    cube_all, live_all = [], []
+    mismatches = 0
+    for question, arguments in QUESTIONS:
+        sql = fallback_sql(arguments.get("group_by", []), _filters(arguments))
+        cube, cube_latencies = await _time(
+            lambda: aact_tools.query_aggregates(**arguments, max_rows=args.max_rows), args.repeats
+        )
+        live, live_latencies = await _time(lambda: aact_tools.read_query(sql, args.max_rows), args.repeats)
+        if cube.get("source") != "aggregates":
+            print(f"  not answered from the cubes: {question}")
+        if "error" in live or _key(cube["data"]) != _key(live["data"]):
+            mismatches += 1
+            print(f"  answers differ: {question}")
+        cube_all += cube_latencies
+        live_all += live_latencies
+        cube_p50, live_p50 = _percentile(cube_latencies, 50), _percentile(live_latencies, 50)
+        print(f"{cube_p50 * 1000:>12.2f}{_percentile(cube_latencies, 95) * 1000:>8.2f}"
+              f"{live_p50 * 1000:>13.2f}{_percentile(live_latencies, 95) * 1000:>8.2f}"
+              f"{live_p50 / cube_p50:>8.1f}x  {question}")
+    print(f"\nAll questions: cubes mean {statistics.mean(cube_all) * 1000:.2f} ms, "
+          f"live mean {statistics.mean(live_all) * 1000:.2f} ms; {mismatches} differing answers")
+    return 1 if mismatches else 0
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as directory:
+        mirror = args.mirror_dir
+        if mirror is None:
+            from .loadgen import build_stand_in
+            start = time.perf_counter()
+            mirror = build_stand_in(directory, studies=args.studies)
+            print(f"Stand-in mirror with {args.studies} studies built in {time.perf_counter() - start:.1f}s")
+
+        # Configure the in-process tools before they are imported
+        os.environ["AACT_DB_ENGINE"] = "duckdb"
+        os.environ["AACT_MIRROR_DIR"] = mirror
+        os.environ["AACT_CUBES_DIR"] = mirror
+        os.environ["AACT_QUERY_CACHE_ENABLED"] = "0"
+        os.environ["AACT_INSIGHTS_PATH"] = ""
+        from .aggregate_cubes import build_cubes
+        from .bench_transport import _percentile
+
+        metadata = build_cubes(mirror)
+        print(f"Aggregate cubes: {metadata['rows']} cells in {metadata['seconds']}s")
+        return asyncio.run(run(args, _percentile))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--studies", type=int, default=100000, help="Studies in the stand-in mirror")
+    parser.add_argument("--mirror-dir", help="Use this mirror instead of a stand-in")
+    parser.add_argument("--repeats", type=int, default=20, help="Calls per question and path")
+    parser.add_argument("--max-rows", type=int, default=1000)
+    sys.exit(main(parser.parse_args()))
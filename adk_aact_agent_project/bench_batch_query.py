@@ -0,0 +1,78 @@
+"""Benchmark end-to-end turn latency with and without ``batch_read_query``.
+
+A turn that needs several independent queries costs one model call per
+query when they are issued one at a time, and a single model call when they
+are batched. The model is simulated with a fixed delay per call, and the
+queries run for real through the in-process tools, so configure the database
+as for the agent (``AACT_DB_*``). The query cache is cleared before every
+turn.
+
+Usage (from the repository root):
+    python -m adk_aact_agent_project.bench_batch_query --turns 20 --model-ms 800
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from . import aact_tools
+from .bench_transport import _percentile
+
+DEFAULT_QUERIES = {
+    "by_phase": "SELECT phase, count(*) AS n FROM ctgov.studies GROUP BY phase ORDER BY n DESC",
+    "by_status": "SELECT overall_status, count(*) AS n FROM ctgov.studies GROUP BY overall_status ORDER BY n DESC",
+    "by_year": "SELECT extract(year FROM start_date) AS year, count(*) AS n FROM ctgov.studies GROUP BY 1 ORDER BY 1 DESC",
+    "by_type": "SELECT study_type, count(*) AS n FROM ctgov.studies GROUP BY study_type ORDER BY n DESC",
+}
+
+
+async def _model_call(model_ms):
+    await asyncio.sleep(model_ms / 1000)
+
+
+async def sequential_turn(queries, max_rows, model_ms):
+    """One model call per query, then one to answer."""
+    for query in queries.values():
+        await _model_call(model_ms)
+        await aact_tools.read_query(query, max_rows)
+    await _model_call(model_ms)
+
+
+async def batched_turn(queries, max_rows, model_ms):
+    """One model call that batches every query, then one to answer."""
+    await _model_call(model_ms)
+    await aact_tools.batch_read_query(queries, max_rows)
+    await _model_call(model_ms)
+
+
+async def _measure(turn, args):
+    latencies = []
+    for _ in range(args.turns):
+        aact_tools.query_cache.clear()
+        start = time.perf_counter()
+        await turn(DEFAULT_QUERIES, args.max_rows, args.model_ms)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def main(args):
+    # Open the connection pool outside the measurement.
+    await aact_tools.batch_read_query(DEFAULT_QUERIES, args.max_rows)
+    print(f"{len(DEFAULT_QUERIES)} queries per turn, {args.model_ms:.0f} ms per model call")
+    for name, turn in (("sequential read_query", sequential_turn), ("batch_read_query", batched_turn)):
+        latencies = await _measure(turn, args)
+        print(f"\n{name}")
+        print(f"  turns: {len(latencies)}")
+        print(f"  mean:  {statistics.mean(latencies) * 1000:.1f} ms")
+        print(f"  p50:   {_percentile(latencies, 50) * 1000:.1f} ms")
+        print(f"  p95:   {_percentile(latencies, 95) * 1000:.1f} ms")
+    await aact_tools.get_database().close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--model-ms", type=float, default=800.0, help="Simulated latency of one model call")
+    parser.add_argument("--max-rows", type=int, default=25)
+    asyncio.run(main(parser.parse_args()))
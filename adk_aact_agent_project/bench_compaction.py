@@ -0,0 +1,84 @@
+"""Measure prompt size and turn latency over a scripted 50-turn session.
+
+Each scripted turn is a user question, a ``read_query`` call and its result,
+and the model's answer. Before every turn the full history is sent as the
+request, once as is and once through ``ContextCompactor``. Prompt sizes and
+compaction time are measured. No model is called, so turn latency is not
+measured: it is modelled as ``--base-ms`` plus ``--ms-per-1k-tokens`` per
+thousand prompt tokens, with the measured compaction time added.
+
+Usage (from the repository root):
+    python -m adk_aact_agent_project.bench_compaction --turns 50 --rows 100
+"""
+
+import argparse
+import time
+
+from google.genai import types
+
+from .aact_tools import _rows
+from .bench_result_format import make_rows
+from .compaction import BYTES_PER_TOKEN, ContextCompactor, ResultStore
+
+
+def scripted_turn(turn, rows):
+    """Return the contents one analysis turn adds to the history."""
+    query = f"SELECT nct_id, phase, overall_status FROM ctgov.studies WHERE enrollment > {turn} LIMIT {rows}"
+    return [
+        types.Content(role="user", parts=[types.Part(text=f"Question {turn}: how do phases compare for enrollment above {turn}?")]),
+        types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(
+            id=f"call_{turn}", name="read_query", args={"query": query, "max_rows": rows}
+        ))]),
+        types.Content(role="user", parts=[types.Part(function_response=types.FunctionResponse(
+            id=f"call_{turn}", name="read_query", response={"data": _rows(make_rows(rows, seed=turn))}
+        ))]),
+        types.Content(role="model", parts=[types.Part(text=f"Answer {turn}: Phase 2 studies dominate this group.")]),
+    ]
+
+
+def main(args):
+    compactor = ContextCompactor(
+        ResultStore(),
+        max_tokens=args.max_tokens,
+        max_payload_bytes=args.max_payload_bytes,
+        keep_recent_turns=args.keep_turns
+    )
+    history = []
+    totals = {"full": [0, 0.0], "compacted": [0, 0.0]}
+    print(f"{'turn':>5}{'full tokens':>14}{'compacted':>12}{'compact ms':>12}{'model full ms':>15}{'model compacted ms':>20}")
+    for turn in range(1, args.turns + 1):
+        # The request for this turn carries the history plus the new question.
+        history.extend(scripted_turn(turn, args.rows))
+        request = history[:-1]
+
+        start = time.perf_counter()
+        _, before, after = compactor.compact(request)
+        compact_ms = (time.perf_counter() - start) * 1000
+
+        full_tokens = before // BYTES_PER_TOKEN
+        compacted_tokens = after // BYTES_PER_TOKEN
+        full_ms = args.base_ms + full_tokens / 1000 * args.ms_per_1k_tokens
+        compacted_ms = args.base_ms + compacted_tokens / 1000 * args.ms_per_1k_tokens + compact_ms
+        for name, tokens, latency in (("full", full_tokens, full_ms), ("compacted", compacted_tokens, compacted_ms)):
+            totals[name][0] += tokens
+            totals[name][1] += latency
+        if turn % args.every == 0 or turn == 1:
+            print(f"{turn:>5}{full_tokens:>14}{compacted_tokens:>12}{compact_ms:>12.2f}{full_ms:>15.0f}{compacted_ms:>20.0f}")
+
+    print(f"\nOver {args.turns} turns:")
+    for name, (tokens, latency) in totals.items():
+        print(f"  {name:<10} {tokens:>10} prompt tokens sent, {latency / 1000:>7.1f}s modelled latency")
+    print(f"  {compactor.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=100, help="Rows returned by each scripted query")
+    parser.add_argument("--max-tokens", type=int, default=32000)
+    parser.add_argument("--max-payload-bytes", type=int, default=4096)
+    parser.add_argument("--keep-turns", type=int, default=2)
+    parser.add_argument("--base-ms", type=float, default=400.0, help="Modelled fixed cost of a model call")
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=25.0, help="Modelled cost per 1k prompt tokens")
+    parser.add_argument("--every", type=int, default=10, help="Print every N turns")
+    main(parser.parse_args())
@@ -0,0 +1,123 @@
+"""Benchmark insight search: latency and prompt size with many insights.
+
+Fills an in-memory ``InsightsStore`` with synthetic findings of the kind the
+agent records (counts and trends by condition, phase, country and sponsor),
+then compares what reaches the prompt when the model
+
+* reads the whole insights memo, as before ``search_insights``;
+* reads one memo page (``INSIGHTS_MEMO_PAGE_SIZE`` insights);
+* calls ``search_insights`` with top-k results.
+
+Reports append throughput (the BM25 index is maintained on each append),
+search latency percentiles, and prompt size in bytes and estimated tokens
+(4 bytes per token).
+
+Usage (from the repository root):
+    python -m adk_aact_agent_project.bench_insights --insights 100000 --queries 200 --k 5
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+
+from .bench_transport import _percentile
+from .compaction import BYTES_PER_TOKEN
+from .config import INSIGHTS_MEMO_PAGE_SIZE
+from .insights_store import InsightsStore
+
+CONDITIONS = [
+    "breast cancer", "lung cancer", "melanoma", "leukemia", "lymphoma", "type 2 diabetes", "obesity",
+    "hypertension", "heart failure", "asthma", "COPD", "alzheimer disease", "parkinson disease",
+    "depression", "schizophrenia", "HIV infections", "hepatitis C", "covid-19", "influenza",
+    "rheumatoid arthritis", "psoriasis", "crohn disease", "multiple sclerosis", "epilepsy", "migraine",
+]
+PHASES = ["Phase 1", "Phase 1/Phase 2", "Phase 2", "Phase 2/Phase 3", "Phase 3", "Phase 4"]
+STATUSES = ["recruiting", "completed", "terminated", "withdrawn", "suspended", "active, not recruiting"]
+COUNTRIES = ["United States", "China", "France", "Germany", "Japan", "Canada", "Brazil", "India", "Spain", "Egypt"]
+SPONSORS = ["industry", "NIH", "other government", "university", "network"]
+TEMPLATES = [
+    "{count} {phase} {condition} trials are {status}; {share}% of them have sites in {country}.",
+    "{condition} trials sponsored by {sponsor} grew {share}% between {year} and {next_year}.",
+    "Median enrollment of {status} {phase} {condition} trials is {count} participants.",
+    "{share}% of {condition} trials that started in {year} were {status} by {next_year}.",
+    "{country} hosts {count} {condition} trials, mostly {phase} and sponsored by {sponsor}.",
+    "Terminated {condition} trials most often cite low accrual ({share}%); {count} list no reason.",
+]
+
+
+def _finding(rng):
+    year = rng.randint(2000, 2023)
+    return rng.choice(TEMPLATES).format(
+        count=rng.randint(3, 5000), share=rng.randint(1, 99), year=year, next_year=year + rng.randint(1, 5),
+        phase=rng.choice(PHASES), condition=rng.choice(CONDITIONS), status=rng.choice(STATUSES),
+        country=rng.choice(COUNTRIES), sponsor=rng.choice(SPONSORS),
+    )
+
+
+def _query(rng):
+    return f"{rng.choice(CONDITIONS)} {rng.choice(STATUSES)} {rng.choice(COUNTRIES)}"
+
+
+def _search_output(results):
+    """What ``search_insights`` returns to the model."""
+    return json.dumps({
+        "insights": [
+            {"finding": record["finding"], "tags": record["tags"], "added": "2025-01-01 00:00", "score": round(score, 2)}
+            for record, score in results
+        ],
+    })
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    store = InsightsStore()
+
+    start = time.perf_counter()
+    for i in range(args.insights):
+        condition = rng.choice(CONDITIONS)
+        store.add(_finding(rng), session=f"session_{i % 500}", tags=[condition])
+    elapsed = time.perf_counter() - start
+    print(f"{args.insights} insights appended and indexed in {elapsed:.2f}s "
+          f"({args.insights / elapsed:,.0f}/s, {elapsed / args.insights * 1e6:.1f} us each)")
+
+    latencies = []
+    result_sizes = []
+    for _ in range(args.queries):
+        query = _query(rng)
+        start = time.perf_counter()
+        results = store.search(query, k=args.k)
+        latencies.append(time.perf_counter() - start)
+        result_sizes.append(len(_search_output(results).encode()))
+    print(f"\nsearch_insights over {args.queries} queries, k={args.k}: "
+          f"mean {statistics.mean(latencies) * 1000:.2f} ms, "
+          f"p50 {_percentile(latencies, 50) * 1000:.2f} ms, "
+          f"p95 {_percentile(latencies, 95) * 1000:.2f} ms, "
+          f"p99 {_percentile(latencies, 99) * 1000:.2f} ms")
+
+    start = time.perf_counter()
+    full_memo = store.memo()
+    memo_seconds = time.perf_counter() - start
+    page = store.memo(page=-1, page_size=INSIGHTS_MEMO_PAGE_SIZE)
+    sizes = [
+        ("full memo", len(full_memo.encode())),
+        (f"memo page ({INSIGHTS_MEMO_PAGE_SIZE})", len(page.encode())),
+        (f"search top-{args.k} (mean)", statistics.mean(result_sizes)),
+    ]
+    print(f"\n{'prompt content':<24}{'bytes':>14}{'tokens':>12}")
+    for name, size in sizes:
+        print(f"{name:<24}{size:>14,.0f}{size / BYTES_PER_TOKEN:>12,.0f}")
+    print(f"\nFull memo rendered in {memo_seconds * 1000:.1f} ms; search results are "
+          f"{sizes[0][1] / sizes[2][1]:,.0f}x smaller")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--insights", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,105 @@
+"""Benchmark pipelined JSON-RPC throughput over one MCP server connection.
+
+Starts one MCP server with ``JsonRpcClient`` and issues the same tool call
+(or ``ping``, for the transport alone) at increasing in-flight depths. Depth
+1 is the one-request-at-a-time pattern of the old diagnostics; higher depths
+keep several requests outstanding on the same stdio pipe. Reports throughput
+and latency percentiles per depth, and the speedup over depth 1.
+
+The server is the configured AACT MCP server unless ``--command`` names
+another, e.g. a local build: ``--command python -m mcp_server_aact``.
+
+Usage (from the repository root):
+    python -m adk_aact_agent_project.bench_jsonrpc --calls 200 --depths 1 2 4 8 16 32
+    python -m adk_aact_agent_project.bench_jsonrpc --method ping
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from .bench_transport import _percentile
+from .config import MCP_COMMAND, MCP_ARGS, MCP_SERVER_CWD, MCP_ENV
+from .jsonrpc_client import JsonRpcClient
+
+
+async def _run_depth(call, calls, depth):
+    """Issue ``calls`` calls with ``depth`` outstanding; return latencies and elapsed."""
+    latencies = []
+    remaining = iter(range(calls))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(depth)))
+    return latencies, time.perf_counter() - start
+
+
+async def main(args):
+    command, *command_args = args.command or [MCP_COMMAND, *MCP_ARGS]
+    client = await JsonRpcClient.spawn(
+        command, command_args,
+        cwd=None if args.command else MCP_SERVER_CWD,
+        env=MCP_ENV,
+        max_in_flight=max(args.depths),
+        timeout=args.timeout
+    )
+    try:
+        try:
+            info = await client.initialize(timeout=args.start_timeout)
+        except Exception as e:
+            print(f"Server did not initialize: {e}")
+            print("\n".join(client.stderr_lines))
+            return 1
+        print(f"Server: {info.get('serverInfo', {}).get('name', '?')} "
+              f"(protocol {info.get('protocolVersion')})")
+
+        if args.method == "ping":
+            call = client.ping
+        else:
+            arguments = {"query": args.query, "max_rows": args.max_rows}
+
+            async def call():
+                result = await client.call_tool("read_query", arguments)
+                if result.get("isError"):
+                    raise RuntimeError(result.get("content"))
+
+        # Warm up the server's database connection outside the measurement.
+        await call()
+
+        print(f"\n{'depth':>6}{'calls/s':>10}{'speedup':>9}{'mean ms':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+        baseline = None
+        for depth in args.depths:
+            latencies, elapsed = await _run_depth(call, args.calls, depth)
+            throughput = len(latencies) / elapsed
+            baseline = baseline or throughput
+            print(f"{depth:>6}{throughput:>10.1f}{throughput / baseline:>8.2f}x"
+                  f"{statistics.mean(latencies) * 1000:>10.2f}"
+                  f"{_percentile(latencies, 50) * 1000:>9.2f}"
+                  f"{_percentile(latencies, 95) * 1000:>9.2f}"
+                  f"{_percentile(latencies, 99) * 1000:>9.2f}")
+        stats = client.stats()
+        print(f"\n{stats['sent']} requests, peak {stats['max_in_flight_seen']} in flight, "
+              f"{stats['errors']} errors, {stats['timeouts']} timeouts")
+    finally:
+        await client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pipelined JSON-RPC throughput over one MCP server connection.")
+    parser.add_argument("--calls", type=int, default=200, help="Calls per depth")
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--method", choices=["read_query", "ping"], default="read_query")
+    parser.add_argument("--query", default="SELECT nct_id, overall_status FROM ctgov.studies LIMIT 10")
+    parser.add_argument("--max-rows", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request deadline in seconds")
+    parser.add_argument("--start-timeout", type=float, default=60.0, help="Seconds to wait for initialize")
+    parser.add_argument("--command", nargs=argparse.REMAINDER, help="Server command line (default: the configured AACT MCP server)")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,79 @@
+"""Benchmark the compact result format against per-row JSON objects.
+
+Encodes synthetic rows shaped like ``ctgov.studies`` query results (strings
+with few distinct values, dates, Decimals and NULLs) and reports bytes on the
+wire, a rough token estimate and encode/decode times for each format.
+
+Usage (from the repository root):
+    python -m adk_aact_agent_project.bench_result_format --rows 25 100 1000 10000
+"""
+
+import argparse
+import datetime
+import decimal
+import json
+import random
+import time
+
+from .aact_tools import _rows
+from .result_format import decode_compact, encode_compact
+
+PHASES = ["Phase 1", "Phase 2", "Phase 3", "Phase 4", "Early Phase 1", None]
+STATUSES = ["Completed", "Recruiting", "Terminated", "Withdrawn", "Active, not recruiting"]
+
+
+def make_rows(n, seed=0):
+    """Build ``n`` rows resembling a SELECT over ctgov.studies."""
+    rng = random.Random(seed)
+    start = datetime.date(2000, 1, 1)
+    return [
+        {
+            "nct_id": f"NCT{rng.randrange(10 ** 8):08d}",
+            "phase": rng.choice(PHASES),
+            "overall_status": rng.choice(STATUSES),
+            "start_date": start + datetime.timedelta(days=rng.randrange(9000)),
+            "enrollment": decimal.Decimal(rng.randrange(5000)) if rng.random() > 0.1 else None,
+            "brief_title": f"Study of treatment {rng.randrange(100000)} in adults",
+        }
+        for _ in range(n)
+    ]
+
+
+def _time(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def bench(n, repeat):
+    rows = make_rows(n)
+    formats = {
+        "rows": (lambda: json.dumps(_rows(rows)), json.loads),
+        "compact": (
+            lambda: json.dumps(encode_compact(rows, dictionary=False)),
+            lambda text: decode_compact(json.loads(text)),
+        ),
+        "compact+dict": (
+            lambda: json.dumps(encode_compact(rows)),
+            lambda text: decode_compact(json.loads(text)),
+        ),
+    }
+    print(f"\n{n} rows")
+    print(f"  {'format':<14}{'bytes':>10}{'~tokens':>10}{'encode ms':>12}{'decode ms':>12}")
+    for name, (encode, decode) in formats.items():
+        encode_time, text = _time(encode, repeat)
+        decode_time, _ = _time(lambda: decode(text), repeat)
+        print(
+            f"  {name:<14}{len(text.encode('utf-8')):>10}{len(text) // 4:>10}"
+            f"{encode_time * 1000:>12.3f}{decode_time * 1000:>12.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[25, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    for n in args.rows:
+        bench(n, args.repeat)
@@ -0,0 +1,155 @@
+"""Offline benchmark of schema retrieval: round trips and prompt tokens per question.
+
+For a fixed question set with the tables each question needs, compares two
+policies without calling a model:
+
+* exploratory: ``list_tables``, one ``describe_table`` per needed table, the
+  query and the answer, as the original instructions ask;
+* retrieval: the top-k table definitions are injected into the instruction,
+  and only needed tables that were not retrieved are described.
+
+Prompt tokens are estimated from the JSON the model would receive (4 bytes
+per token). By default it uses a built-in subset of the AACT schema;
+``--schema`` points it at a real ``database_schema.json``.
+
+Usage (from the repository root):
+    python -m adk_aact_agent_project.bench_schema_retrieval --top-k 5
+"""
+
+import argparse
+import json
+import os
+import tempfile
+
+from .compaction import BYTES_PER_TOKEN
+from .config import AGENT_INSTRUCTIONS, SCHEMA_RETRIEVAL_STEP, SCHEMA_STEP
+from .schema_index import SchemaIndex
+from .schema_retrieval import SchemaRetriever
+
+AACT_TABLES = {
+    "studies": "nct_id brief_title official_title overall_status phase study_type enrollment start_date completion_date why_stopped source",
+    "conditions": "nct_id name downcase_name",
+    "browse_conditions": "nct_id mesh_term downcase_mesh_term mesh_type",
+    "interventions": "nct_id intervention_type name description",
+    "browse_interventions": "nct_id mesh_term downcase_mesh_term mesh_type",
+    "intervention_other_names": "nct_id intervention_id name",
+    "facilities": "nct_id name status city state zip country",
+    "countries": "nct_id name removed",
+    "sponsors": "nct_id agency_class lead_or_collaborator name",
+    "overall_officials": "nct_id role name affiliation",
+    "central_contacts": "nct_id contact_type name phone email",
+    "eligibilities": "nct_id sampling_method gender minimum_age maximum_age healthy_volunteers criteria",
+    "designs": "nct_id allocation intervention_model observational_model primary_purpose time_perspective masking",
+    "design_groups": "nct_id group_type title description",
+    "design_outcomes": "nct_id outcome_type measure time_frame population description",
+    "outcomes": "nct_id outcome_type title description time_frame population units param_type",
+    "outcome_measurements": "nct_id outcome_id result_group_id classification category title param_type param_value param_value_num dispersion_type",
+    "outcome_analyses": "nct_id outcome_id non_inferiority_type param_type param_value p_value method",
+    "baseline_measurements": "nct_id result_group_id classification category title units param_type param_value",
+    "result_groups": "nct_id ctgov_group_code result_type title description",
+    "reported_events": "nct_id result_group_id time_frame event_type subjects_affected subjects_at_risk adverse_event_term organ_system",
+    "drop_withdrawals": "nct_id result_group_id period reason count",
+    "milestones": "nct_id result_group_id title period description count",
+    "calculated_values": "nct_id number_of_facilities number_of_sae_subjects actual_duration were_results_reported months_to_report_results has_us_facility has_single_facility minimum_age_num maximum_age_num",
+    "brief_summaries": "nct_id description",
+    "detailed_descriptions": "nct_id description",
+    "keywords": "nct_id name downcase_name",
+    "id_information": "nct_id id_source id_type id_value",
+    "documents": "nct_id document_id document_type url comment",
+    "links": "nct_id url description",
+    "study_references": "nct_id pmid reference_type citation",
+}
+
+# (question, tables needed to answer it)
+QUESTIONS = [
+    ("How many recruiting studies are there per phase?", ["studies"]),
+    ("Which conditions have the most phase 3 trials?", ["studies", "conditions"]),
+    ("Count breast cancer studies by overall status", ["studies", "conditions"]),
+    ("Which drug interventions are most common in diabetes trials?", ["studies", "interventions", "conditions"]),
+    ("Which countries host the most trial facilities?", ["facilities"]),
+    ("How many studies in Boston facilities are recruiting?", ["studies", "facilities"]),
+    ("Who are the top industry sponsors of oncology trials?", ["studies", "sponsors", "conditions"]),
+    ("What is the average enrollment of terminated studies and why were they stopped?", ["studies"]),
+    ("How many trials accept healthy volunteers and what are the age limits?", ["eligibilities"]),
+    ("Which trials use randomized allocation with double masking?", ["designs"]),
+    ("List primary outcome measures with their time frames for asthma trials", ["design_outcomes", "conditions"]),
+    ("What serious adverse events are most reported in vaccine trials?", ["reported_events", "interventions"]),
+    ("Which completed studies have results reported and how long did reporting take?", ["studies", "calculated_values"]),
+    ("What are the most common reasons participants drop out or withdraw?", ["drop_withdrawals"]),
+    ("Which principal investigators lead the most trials and what are their affiliations?", ["overall_officials"]),
+    ("Show studies with MeSH term hypertension", ["browse_conditions"]),
+    ("How many studies have PubMed references?", ["study_references"]),
+    ("Which outcome analyses report p values below 0.05 for non inferiority?", ["outcome_analyses"]),
+]
+
+
+def _schema_file(directory):
+    tables = {
+        name: {"columns": [{"name": column, "type": "integer" if column.endswith(("_num", "count", "enrollment")) else "character varying"} for column in columns.split()]}
+        for name, columns in AACT_TABLES.items()
+    }
+    path = os.path.join(directory, "database_schema.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"tables": tables}, f)
+    return path
+
+
+def _tokens(value):
+    text = value if isinstance(value, str) else json.dumps(value)
+    return len(text) // BYTES_PER_TOKEN
+
+
+def _session_tokens(instruction, tool_outputs):
+    """Prompt tokens over a turn: each model call resends everything so far."""
+    total = 0
+    history = _tokens(instruction)
+    for output in tool_outputs + [None]:
+        total += history
+        if output is not None:
+            history += _tokens(output) + 20  # the function call itself
+    return total
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as directory:
+        index = SchemaIndex(args.schema or _schema_file(directory))
+        index.load()
+        retriever = SchemaRetriever(lambda: index, top_k=args.top_k)
+        table_list = index.list_tables()
+
+        totals = {"exploratory": [0, 0], "retrieval": [0, 0]}
+        found = needed = 0
+        print(f"{len(QUESTIONS)} questions, {len(table_list)} tables, top-k {args.top_k}\n")
+        print(f"{'calls':>7}{'tokens':>9}{'calls':>7}{'tokens':>9}  question")
+        for question, tables in QUESTIONS:
+            describes = [index.describe_table(table) for table in tables]
+            # list_tables, one describe per table, read_query; plus the answer.
+            exploratory = [table_list] + describes + [{"data": []}]
+            exploratory_calls = len(exploratory) + 1
+            exploratory_tokens = _session_tokens(AGENT_INSTRUCTIONS, exploratory)
+
+            retrieved = retriever.relevant_tables(question)
+            missing = [table for table in tables if table not in retrieved]
+            found += len(tables) - len(missing)
+            needed += len(tables)
+            instruction = AGENT_INSTRUCTIONS.replace(SCHEMA_STEP, SCHEMA_RETRIEVAL_STEP) + "\n\n" + retriever.render(retrieved)
+            retrieval = [index.describe_table(table) for table in missing] + [{"data": []}]
+            retrieval_calls = len(retrieval) + 1
+            retrieval_tokens = _session_tokens(instruction, retrieval)
+
+            totals["exploratory"][0] += exploratory_calls
+            totals["exploratory"][1] += exploratory_tokens
+            totals["retrieval"][0] += retrieval_calls
+            totals["retrieval"][1] += retrieval_tokens
+            print(f"{exploratory_calls:>7}{exploratory_tokens:>9}{retrieval_calls:>7}{retrieval_tokens:>9}  {question}")
+
+        print(f"\nTable recall@{args.top_k}: {found}/{needed} ({found / needed:.0%})")
+        for name, (calls, tokens) in totals.items():
+            print(f"{name:<12} {calls / len(QUESTIONS):5.2f} model calls and {tokens / len(QUESTIONS):8.0f} prompt tokens per question")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--schema", help="Path to a database_schema.json; defaults to a built-in AACT subset")
+    main(parser.parse_args())
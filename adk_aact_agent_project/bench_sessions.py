@@ -0,0 +1,106 @@
+"""Benchmark per-turn session overhead of the SQLite event log and in-memory services.
+
+Fills each service with ``--sessions`` stored sessions, then replays turns
+against a mix of hot and cold sessions. A turn is what the runner does with
+the session service: one lookup and two appended events (the user message
+and the agent reply), followed by a flush. Also reports how long the SQLite
+service takes to serve its first turn after a restart.
+
+Usage (from the repository root):
+    python -m adk_aact_agent_project.bench_sessions --sessions 10000 --turns 2000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from .bench_transport import _percentile
+from .session_store import EventLogSessionService, SQLiteSessionBackend
+
+APP = "bench"
+
+
+def _event(author, text, delta=None):
+    return Event(
+        author=author,
+        invocation_id="bench",
+        content=types.Content(role="user" if author == "user" else "model", parts=[types.Part(text=text)]),
+        actions=EventActions(state_delta=delta or {}),
+    )
+
+
+async def populate(service, sessions, events_per_session):
+    for i in range(sessions):
+        session = await service.create_session(app_name=APP, user_id=f"user{i % 500}", session_id=f"s{i}")
+        for j in range(events_per_session):
+            await service.append_event(session, _event("user", f"question {j}"))
+    await service.flush()
+
+
+async def run_turns(service, sessions, turns, hot_fraction, seed=0):
+    rng = random.Random(seed)
+    hot = max(1, int(sessions * hot_fraction))
+    latencies = []
+    for turn in range(turns):
+        # 90% of turns go to the hot set, the rest anywhere.
+        i = rng.randrange(hot) if rng.random() < 0.9 else rng.randrange(sessions)
+        start = time.perf_counter()
+        session = await service.get_session(app_name=APP, user_id=f"user{i % 500}", session_id=f"s{i}")
+        await service.append_event(session, _event("user", f"turn {turn}"))
+        await service.append_event(session, _event("agent", "answer", {"turns": turn}))
+        await service.flush()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _report(name, latencies):
+    print(f"\n{name}")
+    print(f"  turns: {len(latencies)}")
+    print(f"  mean:  {statistics.mean(latencies) * 1000:.3f} ms")
+    print(f"  p50:   {_percentile(latencies, 50) * 1000:.3f} ms")
+    print(f"  p95:   {_percentile(latencies, 95) * 1000:.3f} ms")
+    print(f"  p99:   {_percentile(latencies, 99) * 1000:.3f} ms")
+
+
+async def main(args):
+    print(f"{args.sessions} stored sessions with {args.events} events each")
+
+    memory = InMemorySessionService()
+    await populate(memory, args.sessions, args.events)
+    _report("InMemorySessionService", await run_turns(memory, args.sessions, args.turns, args.hot))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sessions.db")
+        service = EventLogSessionService(SQLiteSessionBackend(path), cache_size=args.cache_size)
+        start = time.perf_counter()
+        await populate(service, args.sessions, args.events)
+        print(f"\nSQLite store populated in {time.perf_counter() - start:.1f}s")
+        await service.close()
+
+        start = time.perf_counter()
+        service = EventLogSessionService(SQLiteSessionBackend(path), cache_size=args.cache_size)
+        await run_turns(service, args.sessions, 1, args.hot, seed=1)
+        print(f"Restart to first turn: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        latencies = await run_turns(service, args.sessions, args.turns, args.hot)
+        _report(f"EventLogSessionService (SQLite, cache {args.cache_size})", latencies)
+        print(f"  {service.stats()}")
+        await service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--events", type=int, default=4, help="Events stored per session")
+    parser.add_argument("--turns", type=int, default=2000)
+    parser.add_argument("--hot", type=float, default=0.05, help="Fraction of sessions that are hot")
+    parser.add_argument("--cache-size", type=int, default=1000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,117 @@
+"""Cold-start benchmark: time from interpreter launch to the console prompt.
+
+Runs a probe in a fresh ``python -X importtime`` process for each tool
+transport. The probe does what ``run_agent.py`` does before it shows the
+first prompt: load the configuration, import the ADK runtime, the agent and
+its tools, the runner plugins and the session service, build the ``Runner``
+and open the console session. MCP servers are not started, so only import
+and construction cost is measured.
+
+Reports the wall time to the prompt (median over ``--runs``), the total
+import time and the modules with the largest cumulative import time. It
+exits with status 1 when the median time to the first prompt exceeds
+``--max-seconds`` (4 by default, 0 disables the check), so it can guard
+against import regressions.
+
+Usage (from the repository root):
+    python -m adk_aact_agent_project.bench_startup --runs 5 --max-seconds 4
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+READY = "AACT_PROMPT_READY"
+
+PROBE = f"""
+import asyncio
+import time
+from adk_aact_agent_project.config import APP_NAME
+from google.adk.runners import Runner
+from google.genai import types
+from adk_aact_agent_project.aact_query_agent import root_agent
+from adk_aact_agent_project.plugins import runner_plugins
+from adk_aact_agent_project.sessions import session_service, get_or_create_session, close_session_service
+
+runner = Runner(agent=root_agent, app_name=APP_NAME, session_service=session_service, plugins=runner_plugins)
+
+async def main():
+    await get_or_create_session("console_user", "session_console_user")
+    print({READY!r}, time.time(), flush=True)
+    await close_session_service()
+
+asyncio.run(main())
+"""
+
+# import time:    self [us] | cumulative | imported package
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+def parse_importtime(stderr):
+    """Return ``[(module, self_us, cumulative_us, depth)]`` from ``-X importtime`` output."""
+    modules = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            modules.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return modules
+
+
+def run_probe(transport, session_db):
+    """Run the probe once; return ``(seconds_to_prompt, modules)``."""
+    env = dict(os.environ)
+    env.update({
+        "AACT_TOOL_TRANSPORT": transport,
+        "AACT_SESSION_DB_PATH": session_db,
+        "PYTHONPATH": os.pathsep.join(filter(None, [REPO_DIR, env.get("PYTHONPATH")])),
+    })
+    start = time.time()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=REPO_DIR, env=env, capture_output=True, text=True, timeout=300
+    )
+    # The probe stamps the moment it reached the prompt.
+    ready = [line.split()[1] for line in process.stdout.splitlines() if line.startswith(READY)]
+    if process.returncode != 0 or not ready:
+        errors = [line for line in process.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"{transport} probe failed:\n" + "\n".join(errors[-20:]))
+    return float(ready[0]) - start, parse_importtime(process.stderr)
+
+
+def main(args):
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        for transport in args.transports:
+            times, modules = [], []
+            for run in range(args.runs):
+                seconds, modules = run_probe(transport, os.path.join(directory, f"{transport}-{run}.db"))
+                times.append(seconds)
+            median = statistics.median(times)
+            total_ms = sum(cumulative for _, _, cumulative, depth in modules if depth == 0) / 1000
+            print(f"\n{transport}: {median * 1000:.0f} ms to first prompt "
+                  f"(min {min(times) * 1000:.0f}, max {max(times) * 1000:.0f}, {args.runs} runs), "
+                  f"{total_ms:.0f} ms importing {len(modules)} modules")
+            print(f"  {'cumulative ms':>13}{'self ms':>9}  module")
+            for module, self_us, cumulative_us, _ in sorted(modules, key=lambda m: -m[2])[:args.top]:
+                print(f"  {cumulative_us / 1000:>13.1f}{self_us / 1000:>9.1f}  {module}")
+            if args.max_seconds and median > args.max_seconds:
+                print(f"  REGRESSION: {median:.2f}s exceeds the {args.max_seconds:.2f}s threshold")
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--transports", nargs="+", default=["inprocess", "stdio"], choices=["inprocess", "stdio"])
+    parser.add_argument("--top", type=int, default=15, help="Modules listed by cumulative import time")
+    parser.add_argument("--max-seconds", type=float, default=4.0,
+                        help="Fail if the median time to first prompt exceeds this; 0 disables the check")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,90 @@
+"""Benchmark the in-process tool transport against the stdio MCP path.
+
+Runs the same AACT tool call repeatedly through both transports and reports
+per-call latency percentiles and throughput.
+
+Usage (from the repository root):
+    python -m adk_aact_agent_project.bench_transport --calls 200 --concurrency 4
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from . import aact_tools
+from .config import MCP_COMMAND, MCP_ARGS, MCP_SERVER_CWD, MCP_ENV
+from .mcp_pool import MCPServerPool
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _run(call, calls, concurrency):
+    """Issue ``calls`` invocations of ``call`` with bounded concurrency."""
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - start)
+
+    # Warm up connections and processes outside the measurement.
+    await call()
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(calls)))
+    elapsed = time.perf_counter() - start
+    return latencies, elapsed
+
+
+def _report(name, latencies, elapsed):
+    print(f"\n{name}")
+    print(f"  calls:      {len(latencies)}")
+    print(f"  mean:       {statistics.mean(latencies) * 1000:.2f} ms")
+    print(f"  p50:        {_percentile(latencies, 50) * 1000:.2f} ms")
+    print(f"  p95:        {_percentile(latencies, 95) * 1000:.2f} ms")
+    print(f"  p99:        {_percentile(latencies, 99) * 1000:.2f} ms")
+    print(f"  throughput: {len(latencies) / elapsed:.1f} calls/s")
+
+
+async def main(args):
+    arguments = {"query": args.query, "max_rows": args.max_rows}
+
+    if args.transport in ("inprocess", "both"):
+        latencies, elapsed = await _run(
+            lambda: aact_tools.read_query(**arguments), args.calls, args.concurrency
+        )
+        _report("In-process transport", latencies, elapsed)
+
+    if args.transport in ("stdio", "both"):
+        pool = MCPServerPool(
+            command=MCP_COMMAND,
+            args=MCP_ARGS,
+            cwd=MCP_SERVER_CWD,
+            env=MCP_ENV,
+            min_size=args.concurrency,
+            max_size=args.concurrency
+        )
+        await pool.start()
+        try:
+            latencies, elapsed = await _run(
+                lambda: pool.call_tool("read_query", arguments), args.calls, args.concurrency
+            )
+        finally:
+            await pool.close()
+        _report("Stdio MCP transport (warm pool)", latencies, elapsed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transport", choices=["inprocess", "stdio", "both"], default="both")
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--query", default="SELECT nct_id FROM ctgov.studies LIMIT 10")
+    parser.add_argument("--max-rows", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
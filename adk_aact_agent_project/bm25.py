@@ -0,0 +1,126 @@
+"""Small incremental BM25 index.
+
+Documents can be added, replaced and removed at any time; term statistics
+are kept up to date as documents change, so there is no separate rebuild
+step. Used to rank schema tables for a question and to search saved
+insights.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+
+_WORD_RE = re.compile(r"[a-z0-9]+(?:_[a-z0-9]+)*")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how in is it many much of on or "
+    "show that the their there these this to was were what when where which who "
+    "with list give me find all per".split()
+)
+
+
+def _stem(word):
+    """Strip common English plural endings."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Split ``text`` into lower-case, lightly stemmed terms.
+
+    Identifiers such as ``overall_status`` produce both the whole identifier
+    and its parts, so the column name matches "status" in a question.
+    """
+    terms = []
+    for word in _WORD_RE.findall(text.lower()):
+        parts = word.split("_")
+        if len(parts) > 1:
+            terms.append(word)
+        terms.extend(_stem(part) for part in parts if part not in STOPWORDS)
+    return terms
+
+
+class BM25Index:
+    """Okapi BM25 over documents that can change one at a time.
+
+    Args:
+        k1: Term frequency saturation.
+        b: Document length normalization.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = defaultdict(dict)
+        self._lengths = {}
+        self._doc_terms = {}
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._lengths
+
+    def add(self, doc_id, terms):
+        """Index ``terms`` (a string or a list of terms) under ``doc_id``, replacing it if present."""
+        if isinstance(terms, str):
+            terms = tokenize(terms)
+        if doc_id in self._lengths:
+            self.remove(doc_id)
+        counts = Counter(terms)
+        for term, count in counts.items():
+            self._postings[term][doc_id] = count
+        self._lengths[doc_id] = len(terms)
+        self._doc_terms[doc_id] = tuple(counts)
+        self._total_length += len(terms)
+
+    def remove(self, doc_id):
+        """Remove ``doc_id`` from the index if present."""
+        length = self._lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for term in self._doc_terms.pop(doc_id):
+            del self._postings[term][doc_id]
+            if not self._postings[term]:
+                del self._postings[term]
+
+    def idf(self, term):
+        """Inverse document frequency of ``term``."""
+        df = len(self._postings.get(term, ()))
+        return math.log(1 + (len(self._lengths) - df + 0.5) / (df + 0.5))
+
+    def search(self, query, k=5, candidates=None):
+        """Return up to ``k`` ``(doc_id, score)`` pairs, best first.
+
+        Args:
+            query: A string or a list of terms.
+            k: Number of results.
+            candidates: Optional set of doc ids to restrict scoring to.
+        """
+        terms = tokenize(query) if isinstance(query, str) else query
+        if not terms or not self._lengths:
+            return []
+        average_length = self._total_length / len(self._lengths) or 1.0
+        # norm = k1 * (1 - b + b * length / average_length), split into constants
+        base = self.k1 * (1 - self.b)
+        per_length = self.k1 * self.b / average_length
+        lengths = self._lengths
+        scores = defaultdict(float)
+        for term, query_count in Counter(terms).items():
+            docs = self._postings.get(term)
+            if not docs:
+                continue
+            weight = query_count * self.idf(term) * (self.k1 + 1)
+            if candidates is not None and len(candidates) < len(docs):
+                docs = {doc_id: docs[doc_id] for doc_id in candidates if doc_id in docs}
+            for doc_id, tf in docs.items():
+                if candidates is not None and doc_id not in candidates:
+                    continue
+                scores[doc_id] += weight * tf / (tf + base + per_length * lengths[doc_id])
+        # Only the top k are ordered, which matters with many matching documents
+        return heapq.nsmallest(k, scores.items(), key=lambda item: (-item[1], item[0]))
@@ -0,0 +1,295 @@
+"""Context compaction for long analysis sessions.
+
+Every ``read_query`` result stays in the session history, and ADK resends
+the whole history to the model on each turn, so prompts grow with every
+query. ``ContextCompactionPlugin`` rewrites the outgoing request before each
+model call. Tool results from earlier turns are replaced by short digests
+(row count, columns, a couple of sample rows), each with a result handle.
+The full payloads are kept in a bounded ``ResultStore`` and the agent can
+page through them again with ``recall_result``.
+
+Only the request is rewritten; session events keep the full results.
+"""
+
+import collections
+import hashlib
+import json
+import logging
+
+from google.adk.plugins.base_plugin import BasePlugin
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+# Rough size of a token in bytes of JSON, used for the token budget.
+BYTES_PER_TOKEN = 4
+
+
+def _payload_size(payload):
+    return len(json.dumps(payload, default=str))
+
+
+def _content_size(content):
+    return len(content.model_dump_json(exclude_none=True))
+
+
+def _rows_and_columns(payload):
+    """Return ``(rows, columns)`` if ``payload`` is a query result, else ``(None, None)``."""
+    data = payload.get("data", payload.get("result")) if isinstance(payload, dict) else None
+    if isinstance(data, list):
+        columns = list(data[0]) if data and isinstance(data[0], dict) else []
+        return data, columns
+    if isinstance(data, dict) and "columns" in data and "rows" in data:
+        return data["rows"], data["columns"]
+    return None, None
+
+
+def _page(payload, rows, offset, n):
+    """Return ``(rows, types)`` for ``rows[offset:offset + n]`` of a query result.
+
+    Dictionary codes of the compact format are resolved, so the page stands
+    on its own; ``types`` is the compact type tags, or None for plain rows.
+    """
+    page = rows[offset:offset + n]
+    data = payload.get("data", payload.get("result"))
+    if not isinstance(data, dict):
+        return page, None
+    dictionaries = data.get("dictionaries") or {}
+    lookups = [dictionaries.get(column) for column in data["columns"]]
+    if any(lookup is not None for lookup in lookups):
+        page = [
+            [lookup[value] if lookup is not None and value is not None else value
+             for lookup, value in zip(lookups, row)]
+            for row in page
+        ]
+    return page, data.get("types")
+
+
+def _is_user_turn(content):
+    return content.role == "user" and any(part.text for part in content.parts or ())
+
+
+class ResultStore:
+    """Full tool payloads addressed by handle, bounded by total size.
+
+    Handles are derived from the payload, so the same result always gets the
+    same handle and rewritten prompts stay identical between turns.
+
+    Args:
+        max_bytes: Maximum total JSON size of stored payloads.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._payloads = collections.OrderedDict()
+        self._bytes = 0
+
+    def put(self, payload):
+        """Store ``payload`` and return its handle."""
+        text = json.dumps(payload, sort_keys=True, default=str)
+        handle = "res_" + hashlib.sha1(text.encode("utf-8")).hexdigest()[:10]
+        if handle in self._payloads:
+            self._payloads.move_to_end(handle)
+            return handle
+        size = len(text)
+        self._payloads[handle] = (payload, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes and len(self._payloads) > 1:
+            _, (_, evicted) = self._payloads.popitem(last=False)
+            self._bytes -= evicted
+        return handle
+
+    def get(self, handle):
+        """Return the payload for ``handle``, or None if unknown or evicted."""
+        entry = self._payloads.get(handle)
+        if entry is None:
+            return None
+        self._payloads.move_to_end(handle)
+        return entry[0]
+
+    def __len__(self):
+        return len(self._payloads)
+
+
+class ContextCompactor:
+    """Replace old tool payloads in a request with digests and result handles.
+
+    Args:
+        store: ``ResultStore`` that keeps the full payloads.
+        max_tokens: Estimated prompt size above which every tool result
+            outside the recent turns is digested, oldest first.
+        max_payload_bytes: Tool results outside the recent turns larger than
+            this are always digested.
+        keep_recent_turns: Number of most recent user turns left untouched.
+        sample_rows: Rows of each result kept in its digest.
+        min_payload_bytes: Results smaller than this are never digested; a
+            digest would not be shorter.
+    """
+
+    def __init__(self, store, max_tokens=32000, max_payload_bytes=4096,
+                 keep_recent_turns=2, sample_rows=2, min_payload_bytes=512):
+        self.store = store
+        self.max_tokens = max_tokens
+        self.max_payload_bytes = max_payload_bytes
+        self.min_payload_bytes = min_payload_bytes
+        self.keep_recent_turns = keep_recent_turns
+        self.sample_rows = sample_rows
+        # Digested parts by function call id; every request rebuilds the
+        # history, so the same results are digested turn after turn.
+        self._digested = collections.OrderedDict()
+        self.requests = 0
+        self.compacted_requests = 0
+        self.digested_results = 0
+        self.bytes_saved = 0
+
+    def digest(self, name, payload):
+        """Return the compact stand-in for a tool result."""
+        handle = self.store.put(payload)
+        rows, columns = _rows_and_columns(payload)
+        if rows is not None:
+            sample, tags = _page(payload, rows, 0, self.sample_rows)
+            digest = {
+                "digest": f"{name} returned {len(rows)} rows; full result stored",
+                "columns": columns,
+                "sample": sample,
+            }
+            if tags is not None:
+                digest["types"] = tags
+        else:
+            text = json.dumps(payload, default=str)
+            digest = {"digest": f"{name} result ({len(text)} bytes) stored", "preview": text[:200]}
+        digest["result_handle"] = handle
+        digest["recall"] = f"Call recall_result(handle='{handle}') to see the full result."
+        return digest
+
+    def _digest_part(self, response):
+        key = (response.id, response.name) if response.id else None
+        part = self._digested.get(key) if key else None
+        if part is None:
+            part = types.Part(function_response=types.FunctionResponse(
+                id=response.id,
+                name=response.name,
+                response=self.digest(response.name, response.response)
+            ))
+            self.digested_results += 1
+            if key:
+                self._digested[key] = part
+                if len(self._digested) > 4096:
+                    self._digested.popitem(last=False)
+        else:
+            self._digested.move_to_end(key)
+        return part
+
+    def _digest_content(self, content, only_larger_than=0):
+        """Return ``content`` with its function responses digested, or None if unchanged."""
+        parts = []
+        changed = False
+        for part in content.parts or ():
+            response = part.function_response
+            if response is not None and (
+                (response.id, response.name) in self._digested
+                or _payload_size(response.response) > only_larger_than
+            ):
+                part = self._digest_part(response)
+                changed = True
+            parts.append(part)
+        if not changed:
+            return None
+        return types.Content(role=content.role, parts=parts)
+
+    def compact(self, contents):
+        """Return ``(contents, bytes_before, bytes_after)`` with old tool results digested.
+
+        The input list and its contents are not modified.
+        """
+        self.requests += 1
+        sizes = [_content_size(content) for content in contents]
+        before = sum(sizes)
+        turns = [i for i, content in enumerate(contents) if _is_user_turn(content)]
+        protected = turns[-self.keep_recent_turns] if len(turns) >= self.keep_recent_turns else 0
+        if self.keep_recent_turns <= 0:
+            protected = len(contents)
+        compacted = list(contents)
+        total = before
+
+        # Oversized results first, then any old result while over the token budget.
+        budget = self.max_tokens * BYTES_PER_TOKEN
+        for threshold, enforce_budget in ((self.max_payload_bytes, False), (self.min_payload_bytes, True)):
+            for i in range(protected):
+                if enforce_budget and total <= budget:
+                    break
+                digested = self._digest_content(compacted[i], only_larger_than=threshold)
+                if digested is not None:
+                    compacted[i] = digested
+                    size = _content_size(digested)
+                    total += size - sizes[i]
+                    sizes[i] = size
+
+        if total != before:
+            self.compacted_requests += 1
+            self.bytes_saved += before - total
+            logger.info(
+                "Compacted request: ~%d -> ~%d tokens", before // BYTES_PER_TOKEN, total // BYTES_PER_TOKEN
+            )
+        return compacted, before, total
+
+    def stats(self):
+        """Return compaction counters."""
+        return {
+            "requests": self.requests,
+            "compacted_requests": self.compacted_requests,
+            "digested_results": self.digested_results,
+            "bytes_saved": self.bytes_saved,
+            "stored_results": len(self.store),
+        }
+
+
+class ContextCompactionPlugin(BasePlugin):
+    """Runner plugin that compacts every model request with a ``ContextCompactor``.
+
+    Args:
+        compactor: The compactor to apply.
+    """
+
+    def __init__(self, compactor, name="aact_context_compaction"):
+        super().__init__(name=name)
+        self.compactor = compactor
+
+    async def before_model_callback(self, *, callback_context, llm_request):
+        llm_request.contents, _, _ = self.compactor.compact(llm_request.contents)
+        return None
+
+
+def recall_tool(store):
+    """Build the ``recall_result`` tool over ``store``."""
+
+    async def recall_result(handle: str, offset: int = 0, n: int = 25):
+        """Returns rows of an earlier tool result that was replaced by a digest.
+
+        Args:
+            handle: The result_handle from the digest.
+            offset: Index of the first row to return.
+            n: Number of rows to return.
+        """
+        if n < 1:
+            return {"error": "n must be at least 1"}
+        if offset < 0:
+            return {"error": "offset must be at least 0"}
+        payload = store.get(handle)
+        if payload is None:
+            return {"error": "Unknown or expired result handle; run the query again"}
+        rows, columns = _rows_and_columns(payload)
+        if rows is None:
+            return payload
+        page, tags = _page(payload, rows, offset, n)
+        result = {
+            "columns": columns,
+            "rows": page,
+            "total_rows": len(rows),
+            "offset": offset,
+        }
+        if tags is not None:
+            result["types"] = tags
+        return result
+
+    return recall_result
@@ -24,8 +24,150 @@ MCP_ENV = {
     "DB_PASSWORD": os.getenv("AACT_DB_PASSWORD", "")
 }
 
-# Agent instructions
-AGENT_INSTRUCTIONS = """
+# AACT database connection (used by the in-process tool transport)
+DB_HOST = os.getenv("AACT_DB_HOST", "aact-db.ctti-clinicaltrials.org")
+DB_PORT = os.getenv("AACT_DB_PORT", "5432")
+DB_NAME = os.getenv("AACT_DB_NAME", "aact")
+DB_SCHEMA = "ctgov"
+
+# Query engine for the in-process tools: "postgres" (the AACT database) or
+# "duckdb" (a local Parquet mirror built with duckdb_mirror.py)
+DB_ENGINE = os.getenv("AACT_DB_ENGINE", "postgres")
+MIRROR_DIR = os.getenv("AACT_MIRROR_DIR", str(ROOT_DIR / "aact_mirror"))
+
+# Precomputed study counts built by aggregate_cubes.py after each mirror
+# refresh, answering query_aggregates without a database query
+CUBES_DIR = os.getenv("AACT_CUBES_DIR", MIRROR_DIR)
+
+# Connection pool for the in-process tools
+DB_POOL_MIN_SIZE = int(os.getenv("AACT_DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.getenv("AACT_DB_POOL_MAX_SIZE", "10"))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("AACT_DB_STATEMENT_TIMEOUT_MS", "60000"))
+DB_HEALTH_CHECK_INTERVAL = float(os.getenv("AACT_DB_HEALTH_CHECK_INTERVAL", "30"))
+
+# Streamed read_query results (server-side cursors paged with fetch_more)
+STREAM_CURSOR_IDLE_TIMEOUT = float(os.getenv("AACT_STREAM_CURSOR_IDLE_TIMEOUT", "300"))
+STREAM_MAX_CURSORS = int(os.getenv("AACT_STREAM_MAX_CURSORS", "4"))
+
+# Shape of read_query results: "rows" (one JSON object per row) or "compact"
+# (column header, row arrays, typed values, dictionary-encoded strings)
+RESULT_FORMAT = os.getenv("AACT_RESULT_FORMAT", "rows")
+RESULT_DICTIONARY_ENCODING = os.getenv("AACT_RESULT_DICTIONARY_ENCODING", "1") == "1"
+
+# read_query result cache for the in-process tools. AACT refreshes daily, so
+# the cache is dropped whenever the snapshot probe returns a new value.
+QUERY_CACHE_ENABLED = os.getenv("AACT_QUERY_CACHE_ENABLED", "1") == "1"
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("AACT_QUERY_CACHE_MAX_ENTRIES", "1024"))
+QUERY_CACHE_MAX_BYTES = int(os.getenv("AACT_QUERY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+SNAPSHOT_QUERY = os.getenv(
+    "AACT_SNAPSHOT_QUERY", "SELECT max(updated_at)::date AS snapshot FROM ctgov.studies"
+)
+SNAPSHOT_CHECK_INTERVAL = float(os.getenv("AACT_SNAPSHOT_CHECK_INTERVAL", "900"))
+
+# Planner cost guard for read_query: queries whose EXPLAIN estimates exceed
+# these budgets are rejected with a hint instead of running on AACT
+QUERY_GUARD_ENABLED = os.getenv("AACT_QUERY_GUARD_ENABLED", "1") == "1"
+QUERY_MAX_COST = float(os.getenv("AACT_QUERY_MAX_COST", "5000000"))
+QUERY_MAX_PLAN_ROWS = int(os.getenv("AACT_QUERY_MAX_PLAN_ROWS", "1000000"))
+QUERY_INJECT_LIMIT = os.getenv("AACT_QUERY_INJECT_LIMIT", "1") == "1"
+
+# Schema resource generated by the AACT_MCP server's scripts/generate_json_schema.py.
+# When present, list_tables and describe_table are answered from memory.
+SCHEMA_PATH = os.getenv(
+    "AACT_SCHEMA_PATH", str(ROOT_DIR / "AACT_MCP" / "src" / "resources" / "database_schema.json")
+)
+SCHEMA_REFRESH_INTERVAL = float(os.getenv("AACT_SCHEMA_REFRESH_INTERVAL", "60"))
+
+# Tool transport: "stdio" serves the AACT tools from MCP server processes,
+# "inprocess" runs them as native function tools in the agent's event loop.
+TOOL_TRANSPORT = os.getenv("AACT_TOOL_TRANSPORT", "stdio")
+
+# MCP server pool configuration
+# Servers are pre-started so runners and sessions never wait on uvx startup.
+MCP_POOL_MIN_SIZE = int(os.getenv("AACT_MCP_POOL_MIN_SIZE", "1"))
+MCP_POOL_MAX_SIZE = int(os.getenv("AACT_MCP_POOL_MAX_SIZE", "4"))
+MCP_POOL_IDLE_TIMEOUT = float(os.getenv("AACT_MCP_POOL_IDLE_TIMEOUT", "300"))
+MCP_POOL_MAX_REQUESTS = int(os.getenv("AACT_MCP_POOL_MAX_REQUESTS", "500"))
+
+# Readiness of a newly started MCP server: the initialize handshake and, with
+# MCP_READY_DB_PING, a SELECT 1 through read_query, polled with backoff for up
+# to MCP_READY_TIMEOUT seconds
+MCP_READY_TIMEOUT = float(os.getenv("AACT_MCP_READY_TIMEOUT", "60"))
+MCP_READY_DB_PING = os.getenv("AACT_MCP_READY_DB_PING", "1") == "1"
+
+# MCP connection behind the agent's tools: "pool" (warm server processes, one
+# call per server at a time) or "multiplexed" (one supervised server with up
+# to MCP_MAX_IN_FLIGHT pipelined calls)
+MCP_CONNECTION = os.getenv("AACT_MCP_CONNECTION", "pool")
+MCP_MAX_IN_FLIGHT = int(os.getenv("AACT_MCP_MAX_IN_FLIGHT", "16"))
+
+# Supervision: a tool call without an answer after MCP_CALL_TIMEOUT seconds
+# counts as a stall and its server is restarted; after MCP_BREAKER_FAILURES
+# consecutive failures tool calls fail fast for MCP_BREAKER_RESET seconds
+MCP_CALL_TIMEOUT = float(os.getenv("AACT_MCP_CALL_TIMEOUT", "120"))
+MCP_BREAKER_FAILURES = int(os.getenv("AACT_MCP_BREAKER_FAILURES", "5"))
+MCP_BREAKER_RESET = float(os.getenv("AACT_MCP_BREAKER_RESET", "30"))
+
+# Schema retrieval: the definitions of the SCHEMA_RETRIEVAL_TOP_K tables most
+# relevant to each user message are added to the instruction
+SCHEMA_RETRIEVAL_ENABLED = os.getenv("AACT_SCHEMA_RETRIEVAL_ENABLED", "1") == "1"
+SCHEMA_RETRIEVAL_TOP_K = int(os.getenv("AACT_SCHEMA_RETRIEVAL_TOP_K", "5"))
+
+# Question cache: validated SQL of previously answered questions, offered to
+# the model as a first guess ("hint"), answered directly without the model
+# ("skip"), or disabled ("off")
+QUESTION_CACHE_MODE = os.getenv("AACT_QUESTION_CACHE_MODE", "hint")
+QUESTION_CACHE_MAX_ENTRIES = int(os.getenv("AACT_QUESTION_CACHE_MAX_ENTRIES", "2048"))
+
+# Session storage: "sqlite" keeps sessions in SESSION_DB_PATH across restarts;
+# "memory" uses ADK's InMemorySessionService
+SESSION_BACKEND = os.getenv("AACT_SESSION_BACKEND", "sqlite")
+SESSION_DB_PATH = os.getenv("AACT_SESSION_DB_PATH", str(ROOT_DIR / "sessions.db"))
+SESSION_CACHE_SIZE = int(os.getenv("AACT_SESSION_CACHE_SIZE", "1000"))
+SESSION_FLUSH_INTERVAL = float(os.getenv("AACT_SESSION_FLUSH_INTERVAL", "0.05"))
+
+# Insights recorded by append_insight (in-process tools): an append-only
+# JSON-lines log at INSIGHTS_PATH ("" keeps them in memory), fsynced per batch
+# of concurrent appends when INSIGHTS_FSYNC is set, and rendered as a memo in
+# pages of INSIGHTS_MEMO_PAGE_SIZE
+INSIGHTS_PATH = os.getenv("AACT_INSIGHTS_PATH", str(ROOT_DIR / "insights.jsonl"))
+INSIGHTS_FSYNC = os.getenv("AACT_INSIGHTS_FSYNC", "1") == "1"
+INSIGHTS_MEMO_PAGE_SIZE = int(os.getenv("AACT_INSIGHTS_MEMO_PAGE_SIZE", "50"))
+
+# Context compaction: before each model call, tool results older than the
+# last COMPACTION_KEEP_TURNS turns are replaced by digests with result handles
+# when they exceed COMPACTION_MAX_PAYLOAD_BYTES, or while the prompt is over
+# COMPACTION_MAX_TOKENS
+COMPACTION_ENABLED = os.getenv("AACT_COMPACTION_ENABLED", "1") == "1"
+COMPACTION_MAX_TOKENS = int(os.getenv("AACT_COMPACTION_MAX_TOKENS", "32000"))
+COMPACTION_MAX_PAYLOAD_BYTES = int(os.getenv("AACT_COMPACTION_MAX_PAYLOAD_BYTES", "4096"))
+COMPACTION_KEEP_TURNS = int(os.getenv("AACT_COMPACTION_KEEP_TURNS", "2"))
+RESULT_STORE_MAX_BYTES = int(os.getenv("AACT_RESULT_STORE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Tracing: "file" appends OpenTelemetry spans for each turn, model call, tool
+# call, MCP round trip and database call to TRACE_FILE as JSON lines;
+# "console" prints them, "otlp" sends them to a collector, "off" disables it
+TRACING = os.getenv("AACT_TRACING", "off")
+TRACE_FILE = os.getenv("AACT_TRACE_FILE", str(ROOT_DIR / "traces.jsonl"))
+
+# Metrics: the web runner serves Prometheus metrics on
+# http://METRICS_HOST:METRICS_PORT/metrics; 0 disables the endpoint
+METRICS_PORT = int(os.getenv("AACT_METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("AACT_METRICS_HOST", "127.0.0.1")
+
+# Concurrent conversations in run_agent.py's socket and batch modes: turns
+# running at once across all users and for one user, and the socket address
+RUNNER_MAX_CONCURRENT_TURNS = int(os.getenv("AACT_RUNNER_MAX_CONCURRENT_TURNS", "8"))
+RUNNER_MAX_TURNS_PER_USER = int(os.getenv("AACT_RUNNER_MAX_TURNS_PER_USER", "2"))
+RUNNER_HOST = os.getenv("AACT_RUNNER_HOST", "127.0.0.1")
+RUNNER_PORT = int(os.getenv("AACT_RUNNER_PORT", "8765"))
+
+# batch_read_query: overall deadline and maximum number of queries per batch
+BATCH_QUERY_TIMEOUT = float(os.getenv("AACT_BATCH_QUERY_TIMEOUT", "30"))
+BATCH_MAX_QUERIES = int(os.getenv("AACT_BATCH_MAX_QUERIES", "8"))
+
+# Agent instructions; BASE_AGENT_INSTRUCTIONS covers the MCP server's tools
+BASE_AGENT_INSTRUCTIONS = """
 You are an assistant designed to query the AACT clinical trials database.
 You have access to tools that allow you to interact with this database.
 
@@ -33,18 +175,54 @@ Available tools:
 - `list_tables`: Shows all available tables in the database.
 - `describe_table`: Shows the columns and data types for a specific table. (Requires 'table_name' argument).
 - `read_query`: Executes a SELECT SQL query to fetch data. (Requires 'query' argument, optionally 'max_rows'). Only SELECT queries are allowed.
+- `batch_read_query`: Executes several independent SELECT queries at once. (Requires 'queries' argument, an object mapping a short name to each SELECT statement; optionally 'max_rows' per query). Returns a result or error for each name.
 - `append_insight`: Saves a key finding or observation from your analysis. (Requires 'finding' argument).
 
 Database Schema: You can refer to the database schema resource for table details.
-Insights Memo: You can refer to the insights memo resource for saved findings.
 
 Steps to follow:
 1. Understand the user's request (e.g., find specific trials, analyze data, explore tables).
 2. Use `list_tables` or `describe_table` first if you need to understand the data structure.
 3. Construct a valid SQL SELECT query based on the user's request and the table structure.
-4. Use the `read_query` tool to execute the query.
+4. Use the `read_query` tool to execute the query. When you need several queries that do not depend on each other's results (e.g. counts per phase, per status and per year), run them together in one `batch_read_query` call.
 5. Analyze the results returned by the tool.
 6. If you discover something important, use `append_insight` to record it.
 7. Formulate a clear and concise response to the user based on the query results or tool actions.
 8. Always use the tools provided when database interaction or insight management is needed. Do not make up data.
-""" 
\ No newline at end of file
+"""
+
+# Extra tools available with the in-process transport
+INPROCESS_TOOL_INSTRUCTIONS = """
+Additional tools:
+- `read_query` with `stream=True`: Returns the first `max_rows` rows plus a `continuation_token` when more rows exist. Use it for large results instead of raising `max_rows`.
+- `fetch_more`: Returns the next page of a streamed query. (Requires 'token' argument, optionally 'n').
+- `append_insight` also accepts optional `tags`, short topic labels for the finding.
+- `query_aggregates`: Returns study counts grouped and filtered by `phase`, `overall_status`, `start_year`, `condition` (MeSH term, lower case, e.g. "neoplasms" for any cancer) and `country` in milliseconds. (Optional 'group_by' list and filter arguments of the same names; 'start_year_from' and 'start_year_to' bound the start year). Prefer it over `read_query` for such counts; use `read_query` for anything else.
+- `search_insights`: Returns the recorded insights most relevant to a question. (Requires 'query' argument, optionally 'k' and 'tag'). Check it before re-running an analysis that may already have been done.
+- `get_insights_memo`: Returns a page of every recorded insight in the order they were added. (Optional 'page', -1 for the most recent, and 'tag'). Use it when the user asks for the memo; use `search_insights` to look for specific findings.
+
+If `read_query` rejects a query as too expensive, follow its `hint`: add WHERE filters, join on nct_id, or aggregate, and try again.
+"""
+
+COMPACT_RESULT_INSTRUCTIONS = """
+Query results are returned in a compact form: `columns` lists the column names once, each entry of `rows` is an array of values in that order, and `types` gives each column's type. Where a column appears in `dictionaries`, its row values are indexes into that list.
+"""
+
+COMPACTION_INSTRUCTIONS = """
+Results of tool calls from earlier turns may be shown as a short digest with a `result_handle`. Use `recall_result` (Requires 'handle' argument, optionally 'offset' and 'n') to page through the full result instead of running the query again.
+"""
+
+# Step 2 of the instructions; the schema retriever swaps in SCHEMA_RETRIEVAL_STEP
+# on the requests it adds table definitions to
+SCHEMA_STEP = "2. Use `list_tables` or `describe_table` first if you need to understand the data structure."
+SCHEMA_RETRIEVAL_STEP = "2. Check the relevant tables listed at the end of these instructions; they are chosen for the current question and show each table's columns. Use `describe_table` only for a table that is not listed, and `list_tables` only if none of the listed tables fit."
+
+AGENT_INSTRUCTIONS = BASE_AGENT_INSTRUCTIONS
+
+if COMPACTION_ENABLED:
+    AGENT_INSTRUCTIONS += COMPACTION_INSTRUCTIONS
+
+if TOOL_TRANSPORT == "inprocess":
+    AGENT_INSTRUCTIONS += INPROCESS_TOOL_INSTRUCTIONS
+    if RESULT_FORMAT == "compact":
+        AGENT_INSTRUCTIONS += COMPACT_RESULT_INSTRUCTIONS
@@ -0,0 +1,242 @@
+"""Concurrent conversations over one shared runner.
+
+``ConversationManager`` runs turns for many users at once on a single
+``Runner``, so every conversation shares the agent's tools, the MCP server
+pool and the database pool. Each conversation has its own session and runs
+one turn at a time; turns are bounded per user and globally, and wait for a
+free slot instead of failing.
+
+Requests arrive as lines, either on a local TCP socket (``serve_socket``) or
+on stdin for batch jobs (``serve_stdin``). A line is a JSON object::
+
+    {"id": "q1", "user": "alice", "session": "trial-design", "text": "How many ..."}
+
+where only ``text`` is required, or plain text, which is asked as the
+connection's default user. Replies are JSON lines carrying the request's
+``id``, ``user`` and ``session`` with either ``text`` or ``error``; requests
+on one connection run concurrently, so replies come back as they finish. A
+connection has at most ``max_concurrent`` requests pending; the next line is
+read once one of them is answered.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import sys
+
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationManager:
+    """Run turns for many users on one runner with bounded concurrency.
+
+    Args:
+        runner: The ADK ``Runner`` shared by all conversations.
+        max_concurrent: Turns running at once across all users.
+        max_per_user: Turns running at once for one user.
+    """
+
+    def __init__(self, runner, max_concurrent=8, max_per_user=2):
+        self.runner = runner
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self._global = asyncio.Semaphore(max_concurrent)
+        self._users = {}
+        self._sessions = {}
+        self._known_sessions = set()
+        self.active = 0
+        self.waiting = 0
+        self.completed = 0
+        self.failed = 0
+
+    @contextlib.asynccontextmanager
+    async def _slot(self, table, key, size):
+        """Hold one of ``size`` slots for ``key``; idle entries are dropped."""
+        entry = table.get(key)
+        if entry is None:
+            entry = table[key] = [asyncio.Semaphore(size), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del table[key]
+
+    async def _ensure_session(self, user_id, session_id):
+        key = (user_id, session_id)
+        if key in self._known_sessions:
+            return
+        service = self.runner.session_service
+        session = await service.get_session(app_name=self.runner.app_name, user_id=user_id, session_id=session_id)
+        if session is None:
+            await service.create_session(app_name=self.runner.app_name, user_id=user_id, session_id=session_id)
+        self._known_sessions.add(key)
+
+    async def ask(self, user_id, text, session_id=None):
+        """Run one turn and return the agent's final text.
+
+        Args:
+            user_id: The user asking.
+            text: The user's message.
+            session_id: Conversation to continue; defaults to the user's
+                ``session_<user_id>``.
+
+        Returns:
+            The final response text.
+        """
+        session_id = session_id or f"session_{user_id}"
+        self.waiting += 1
+        started = False
+        try:
+            # A conversation runs one turn at a time, and a queued turn does
+            # not hold a user or global slot while it waits for its session.
+            async with self._slot(self._sessions, (user_id, session_id), 1), \
+                    self._slot(self._users, user_id, self.max_per_user), \
+                    self._global:
+                self.waiting -= 1
+                self.active += 1
+                started = True
+                try:
+                    answer = await self._run_turn(user_id, session_id, text)
+                finally:
+                    self.active -= 1
+        except BaseException:
+            if not started:
+                self.waiting -= 1
+            self.failed += 1
+            raise
+        self.completed += 1
+        return answer
+
+    async def _run_turn(self, user_id, session_id, text):
+        await self._ensure_session(user_id, session_id)
+        message = types.Content(role="user", parts=[types.Part(text=text)])
+        answer = []
+        async for event in self.runner.run_async(user_id=user_id, session_id=session_id, new_message=message):
+            if event.error_code:
+                raise RuntimeError(event.error_message or event.error_code)
+            if event.is_final_response() and event.content and event.content.parts:
+                answer.extend(part.text for part in event.content.parts if part.text)
+        return "".join(answer)
+
+    def stats(self):
+        """Return turn counters."""
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "failed": self.failed,
+            "users": len(self._users),
+        }
+
+    def _parse(self, line, default_user):
+        try:
+            request = json.loads(line)
+        except ValueError:
+            request = None
+        if not isinstance(request, dict):
+            request = {"text": line}
+        if request.get("user") in (None, ""):
+            request["user"] = default_user
+        return request
+
+    async def _respond(self, request, write):
+        reply = {key: request.get(key) for key in ("id", "user", "session") if request.get(key) is not None}
+        text = request.get("text") or request.get("question")
+        if not text:
+            reply["error"] = "Request has no text"
+        else:
+            try:
+                reply["text"] = await self.ask(str(request["user"]), str(text), request.get("session"))
+            except Exception as e:
+                logger.warning("Turn for %s failed: %s", request["user"], e)
+                reply["error"] = str(e)
+        await write(json.dumps(reply))
+
+    async def serve_lines(self, read_line, write, default_user, max_pending=None):
+        """Answer requests from ``read_line()`` concurrently until it returns ''.
+
+        Args:
+            read_line: Coroutine function returning the next line, or '' at
+                the end of input.
+            write: Coroutine function writing one reply line.
+            default_user: User for requests that do not name one.
+            max_pending: Requests read but not yet answered; the next line
+                is read only when one is free. Defaults to ``max_concurrent``.
+        """
+        pending = asyncio.Semaphore(max_pending or self.max_concurrent)
+        tasks = set()
+
+        def done(task):
+            tasks.discard(task)
+            pending.release()
+
+        while True:
+            # Backpressure: stop reading while the connection's requests are
+            # all pending, instead of queueing a task per line
+            await pending.acquire()
+            line = await read_line()
+            if not line:
+                pending.release()
+                break
+            line = line.strip()
+            if not line:
+                pending.release()
+                continue
+            task = asyncio.create_task(self._respond(self._parse(line, default_user), write))
+            tasks.add(task)
+            task.add_done_callback(done)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+
+async def serve_socket(manager, host="127.0.0.1", port=8765):
+    """Serve conversations on ``host:port`` until cancelled.
+
+    Each connection's default user is ``conn_<n>``.
+    """
+    connections = 0
+
+    async def handle(reader, writer):
+        nonlocal connections
+        connections += 1
+        lock = asyncio.Lock()
+
+        async def read_line():
+            return (await reader.readline()).decode("utf-8", "replace")
+
+        async def write(line):
+            async with lock:
+                writer.write(line.encode() + b"\n")
+                await writer.drain()
+
+        try:
+            await manager.serve_lines(read_line, write, f"conn_{connections}")
+        except ConnectionError as e:
+            logger.info("Connection closed: %s", e)
+        finally:
+            writer.close()
+            with contextlib.suppress(Exception):
+                await writer.wait_closed()
+
+    server = await asyncio.start_server(handle, host, port)
+    addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+    print(f"Serving conversations on {addresses} (JSON lines; Ctrl-C to stop)")
+    async with server:
+        await server.serve_forever()
+
+
+async def serve_stdin(manager, default_user="batch_user"):
+    """Answer requests read from stdin, writing replies to stdout, until EOF."""
+    async def read_line():
+        return await asyncio.to_thread(sys.stdin.readline)
+
+    async def write(line):
+        print(line, flush=True)
+
+    await manager.serve_lines(read_line, write, default_user)
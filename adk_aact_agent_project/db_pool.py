@@ -0,0 +1,249 @@
+"""Bounded async pool of blocking DB-API connections.
+
+psycopg2 connections are blocking, so each query runs in a worker thread on
+a connection checked out from the pool. Concurrent tool calls from different
+sessions run in parallel on separate connections instead of queueing behind
+one slow query, and the event loop is never blocked.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the acquire timeout."""
+
+
+class _PooledConnection:
+    __slots__ = ("conn", "last_checked")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.last_checked = time.monotonic()
+
+
+class AsyncConnectionPool:
+    """Async pool of DB-API connections with health checks.
+
+    Args:
+        connect: Zero-argument callable returning a new connection. Point it at
+            a local Postgres to test without the AACT database.
+        min_size: Connections opened up front and kept open.
+        max_size: Upper bound on open connections.
+        health_check_interval: Connections idle for longer than this many
+            seconds are pinged before being handed out.
+        acquire_timeout: Seconds to wait for a free connection before raising
+            ``PoolTimeout``.
+        broken_errors: Exception types that mark a connection as unusable.
+    """
+
+    def __init__(self, connect, min_size=1, max_size=10, health_check_interval=30.0,
+                 acquire_timeout=30.0, broken_errors=()):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+        self.broken_errors = tuple(broken_errors)
+
+        self._idle = []
+        self._in_use = {}
+        self._size = 0
+        # Created on first use in each event loop; a Condition binds to one loop
+        self._cond = None
+        self._cond_loop = None
+        self._opened = False
+        self._closed = False
+        self.stats = {
+            "connections_opened": 0,
+            "connections_discarded": 0,
+            "health_check_failures": 0,
+            "acquire_timeouts": 0,
+            "queries": 0,
+        }
+
+    def _condition(self):
+        """Return the pool's Condition for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._cond_loop is not loop:
+            self._cond = asyncio.Condition()
+            self._cond_loop = loop
+        return self._cond
+
+    @property
+    def size(self):
+        """Number of open connections, idle or in use."""
+        return self._size
+
+    @property
+    def in_use(self):
+        """Number of connections currently checked out."""
+        return len(self._in_use)
+
+    async def open(self):
+        """Open ``min_size`` connections."""
+        if self._opened:
+            return
+        self._opened = True
+        self._closed = False
+        missing = self.min_size - self._size
+        self._size += missing
+        results = await asyncio.gather(
+            *(asyncio.to_thread(self._new_connection) for _ in range(missing)),
+            return_exceptions=True
+        )
+        cond = self._condition()
+        async with cond:
+            for result in results:
+                if isinstance(result, BaseException):
+                    self._size -= 1
+                    logger.error("Failed to open database connection: %s", result)
+                else:
+                    self._idle.append(result)
+            cond.notify_all()
+
+    def _new_connection(self):
+        pooled = _PooledConnection(self.connect())
+        self.stats["connections_opened"] += 1
+        return pooled
+
+    @staticmethod
+    def _ping(conn):
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT 1")
+            cur.fetchone()
+        finally:
+            cur.close()
+
+    async def _healthy(self, pooled):
+        if getattr(pooled.conn, "closed", False):
+            return False
+        if time.monotonic() - pooled.last_checked < self.health_check_interval:
+            return True
+        try:
+            await asyncio.to_thread(self._ping, pooled.conn)
+        except Exception as e:
+            logger.info("Database connection failed health check: %s", e)
+            self.stats["health_check_failures"] += 1
+            return False
+        pooled.last_checked = time.monotonic()
+        return True
+
+    async def acquire(self):
+        """Check out a healthy connection, opening one if the pool has room."""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        if not self._opened:
+            await self.open()
+
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            cond = self._condition()
+            async with cond:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    try:
+                        await asyncio.wait_for(cond.wait(), timeout=max(remaining, 0))
+                    except asyncio.TimeoutError:
+                        self.stats["acquire_timeouts"] += 1
+                        raise PoolTimeout(
+                            f"No database connection available within {self.acquire_timeout}s "
+                            f"({self._size} open, max {self.max_size})"
+                        )
+                pooled = self._idle.pop() if self._idle else None
+                if pooled is None:
+                    self._size += 1
+
+            if pooled is None:
+                try:
+                    pooled = await asyncio.to_thread(self._new_connection)
+                except BaseException:
+                    await self._drop_slot()
+                    raise
+            elif not await self._healthy(pooled):
+                await self._discard(pooled)
+                continue
+
+            self._in_use[id(pooled.conn)] = pooled
+            return pooled.conn
+
+    async def release(self, conn, discard=False):
+        """Return a connection to the pool, closing it if it is broken."""
+        pooled = self._in_use.pop(id(conn), None)
+        if pooled is None:
+            return
+        if discard or self._closed or getattr(conn, "closed", False):
+            await self._discard(pooled)
+            return
+        cond = self._condition()
+        async with cond:
+            self._idle.append(pooled)
+            cond.notify()
+
+    async def _discard(self, pooled):
+        self.stats["connections_discarded"] += 1
+        with contextlib.suppress(Exception):
+            pooled.conn.close()
+        await self._drop_slot()
+
+    async def _drop_slot(self):
+        cond = self._condition()
+        async with cond:
+            self._size -= 1
+            cond.notify()
+
+    @contextlib.asynccontextmanager
+    async def connection(self):
+        """Async context manager yielding a pooled connection.
+
+        The connection is discarded if the body raises one of ``broken_errors``.
+        """
+        conn = await self.acquire()
+        broken = False
+        try:
+            yield conn
+        except self.broken_errors:
+            broken = True
+            raise
+        finally:
+            await self.release(conn, discard=broken)
+
+    async def run(self, fn, *args):
+        """Run ``fn(conn, *args)`` in a worker thread on a pooled connection.
+
+        If the awaiting task is cancelled, the in-flight statement is cancelled
+        on the server before the connection goes back to the pool.
+        """
+        async with self.connection() as conn:
+            self.stats["queries"] += 1
+            task = asyncio.ensure_future(asyncio.to_thread(fn, conn, *args))
+            try:
+                return await asyncio.shield(task)
+            except asyncio.CancelledError:
+                cancel = getattr(conn, "cancel", None)
+                if cancel is not None:
+                    with contextlib.suppress(Exception):
+                        cancel()
+                with contextlib.suppress(BaseException):
+                    await task
+                raise
+
+    async def close(self):
+        """Close every idle connection and refuse further checkouts."""
+        self._closed = True
+        cond = self._condition()
+        async with cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            cond.notify_all()
+        for pooled in idle:
+            with contextlib.suppress(Exception):
+                pooled.conn.close()
+        self._opened = False
@@ -4,11 +4,12 @@ import asyncio
 import os
 import sys
 import json
-import time
-import subprocess
 from pathlib import Path
 from dotenv import load_dotenv
 
+from health import NotReadyError, wait_ready
+from jsonrpc_client import JsonRpcClient, JsonRpcError
+
 # Load environment variables
 ROOT_DIR = Path(__file__).parent.parent
 ENV_PATH = ROOT_DIR / '.env'
@@ -29,30 +30,20 @@ MCP_ENV = {
     "DB_PASSWORD": DB_PASSWORD
 }
 
-# Define a simple JSON-RPC request for list_tables
-LIST_TABLES_REQUEST = {
-    "jsonrpc": "2.0",
-    "id": "test-list-tables",
-    "method": "list_tables",
-    "params": {}
+# Seconds to wait for the server to answer the handshake and a database ping
+READY_TIMEOUT = 60.0
+
+# Tool calls sent together over the one connection; responses are matched by
+# request id, so they may come back in any order
+TOOL_CALLS = {
+    "list_tables": {},
+    "describe_table": {"table_name": "studies"},
+    "read_query": {"query": "SELECT COUNT(*) AS studies FROM ctgov.studies", "max_rows": 1},
 }
 
-async def read_process_output(process, timeout=5.0):
-    """Read process output with timeout."""
-    start_time = time.time()
-    output_lines = []
-    
-    while time.time() - start_time < timeout:
-        line = process.stdout.readline()
-        if not line:
-            await asyncio.sleep(0.1)
-            continue
-            
-        output_lines.append(line.strip())
-        if len(output_lines) > 0:
-            return output_lines
-            
-    return output_lines
+def tool_text(result):
+    """Return the text content of a tools/call result."""
+    return "\n".join(item.get("text", "") for item in result.get("content", []) if item.get("type") == "text")
 
 async def test_mcp_communication():
     """Test direct communication with MCP server."""
@@ -67,19 +58,12 @@ async def test_mcp_communication():
     
     # Start MCP server
     print("\n1. Starting MCP server...")
-    env = os.environ.copy()
-    env.update(MCP_ENV)
-    
     try:
-        process = subprocess.Popen(
-            [MCP_COMMAND] + MCP_ARGS,
+        client = await JsonRpcClient.spawn(
+            MCP_COMMAND, MCP_ARGS,
             cwd=MCP_SERVER_CWD,
-            env=env,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1
+            env=MCP_ENV,
+            timeout=10.0
         )
     except FileNotFoundError:
         print(f"❌ ERROR: MCP command '{MCP_COMMAND}' not found")
@@ -89,71 +73,57 @@ async def test_mcp_communication():
         print(f"❌ ERROR starting MCP server: {e}")
         return False
     
-    # Wait for server to start
-    print("Waiting for server to initialize...")
-    await asyncio.sleep(5)  # Longer wait time
-    
-    # Check if process is still running
-    if process.poll() is not None:
-        print("❌ ERROR: MCP server failed to start")
-        stdout, stderr = process.communicate()
-        print(f"STDERR: {stderr}")
+    # Wait until the server answers the handshake and a database ping
+    print(f"Waiting for server to become ready (up to {READY_TIMEOUT:.0f} seconds)...")
+    try:
+        report = await wait_ready(client, deadline=READY_TIMEOUT)
+    except NotReadyError as e:
+        print(f"❌ ERROR: MCP server not ready after {e.report['seconds']:.2f}s: {e}")
+        await asyncio.sleep(0.1)
+        print("STDERR: " + "\n".join(client.stderr_lines))
+        await client.close(timeout=1.0)
         return False
     
-    print("✅ MCP server started successfully")
+    print(f"✅ MCP server ready in {report['seconds']:.2f}s "
+          f"(handshake {report['initialize_seconds']:.2f}s, database ping {report['db_ping_seconds'] * 1000:.0f} ms, "
+          f"{report['attempts']} attempt(s))")
     
-    # Send a request to list tables
     try:
-        print("\n2. Sending list_tables request to MCP server...")
-        
-        # Convert request to JSON
-        request_json = json.dumps(LIST_TABLES_REQUEST) + "\n"
-        print(f"Request: {request_json.strip()}")
+        info = client.server_info
+        print(f"Server: {info.get('serverInfo', {}).get('name', '?')} (protocol {info.get('protocolVersion')})")
         
-        # Send the request
-        process.stdin.write(request_json)
-        process.stdin.flush()
+        # Send the tool calls together instead of one request at a time
+        print(f"\n2. Sending {len(TOOL_CALLS)} tool calls to MCP server...")
+        print("Waiting for responses (up to 10 seconds each)...")
+        results = await asyncio.gather(
+            *(client.call_tool(name, arguments) for name, arguments in TOOL_CALLS.items()),
+            return_exceptions=True
+        )
         
-        # Wait for response with longer timeout
-        print("Waiting for response (up to 10 seconds)...")
-        response_lines = await read_process_output(process, timeout=10.0)
+        success = True
+        for name, result in zip(TOOL_CALLS, results):
+            if isinstance(result, TimeoutError):
+                print(f"❌ {name}: no response received from MCP server")
+                print("This suggests a communication issue between the agent and MCP server.")
+                success = False
+            elif isinstance(result, JsonRpcError):
+                print(f"❌ {name}: ERROR: {result}")
+                success = False
+            elif isinstance(result, Exception):
+                print(f"❌ {name}: ERROR during communication: {result}")
+                success = False
+            elif result.get("isError"):
+                print(f"❌ {name}: ERROR: {tool_text(result)}")
+                success = False
+            else:
+                text = tool_text(result)
+                print(f"✅ {name}: {text[:200]}{'...' if len(text) > 200 else ''}")
         
-        if not response_lines:
-            print("❌ ERROR: No response received from MCP server")
-            print("This suggests a communication issue between the agent and MCP server.")
-            
+        if not success and client.stderr_lines:
             # Check stderr for any errors
-            stderr_output = process.stderr.read()
-            if stderr_output:
-                print(f"Error output from server: {stderr_output}")
-                
-            return False
-        
-        # Process the first line as a response
-        response_line = response_lines[0]    
-        print(f"Raw response: {response_line}")
-        
-        # Parse response
-        try:
-            response = json.loads(response_line)
-            
-            if "result" in response:
-                tables = response["result"]
-                print(f"✅ Successfully received {len(tables)} tables")
-                print("First 5 tables:", ", ".join(tables[:5] if tables and len(tables) >= 5 else tables))
-                return True
-            elif "error" in response:
-                print(f"❌ ERROR: {response['error'].get('message', 'Unknown error')}")
-                return False
-            else:
-                print("❌ ERROR: Unexpected response format")
-                print(f"Full response: {response}")
-                return False
-                
-        except json.JSONDecodeError:
-            print("❌ ERROR: Invalid JSON response")
-            print(f"Response text: {response_line}")
-            return False
+            print("Error output from server:\n" + "\n".join(client.stderr_lines))
+        print(f"Requests: {json.dumps(client.stats())}")
+        return success
     
     except Exception as e:
         print(f"❌ ERROR during communication: {e}")
@@ -163,14 +133,8 @@ async def test_mcp_communication():
     finally:
         # Terminate MCP server
         print("\n3. Terminating MCP server...")
-        process.terminate()
-        await asyncio.sleep(1)
-        
-        if process.poll() is None:
-            process.kill()
-            print("   Process killed")
-        else:
-            print("   Process terminated normally")
+        await client.close(timeout=1.0)
+        print(f"   Process exited with code {client.process.returncode}")
 
 if __name__ == "__main__":
     success = asyncio.run(test_mcp_communication())
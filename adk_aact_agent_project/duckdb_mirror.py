@@ -0,0 +1,377 @@
+"""Local analytic mirror of an AACT snapshot.
+
+The public AACT Postgres is remote and shared, so aggregate scans over
+``studies``, ``conditions`` and ``interventions`` are slow. AACT also
+publishes each daily snapshot as pipe-delimited flat files. ``build_mirror``
+converts such an export into one Parquet file per table, and
+``DuckDBDatabase`` answers the in-process tools from those files with an
+embedded DuckDB engine: no network, columnar scans, and a Postgres-compatible
+dialect, with the ``ctgov.<table>`` names the agent already uses.
+
+Select it with ``AACT_DB_ENGINE=duckdb`` and ``AACT_MIRROR_DIR``.
+
+Build a mirror, and the aggregate cubes over it (from the repository root):
+    python -m adk_aact_agent_project.duckdb_mirror --export-dir ~/aact/20250101_export \\
+        --mirror-dir ~/aact/mirror --cubes
+"""
+
+import argparse
+import asyncio
+import contextlib
+import datetime
+import json
+import logging
+import os
+import pathlib
+import re
+import secrets
+import threading
+import time
+
+from .result_format import ResultRows
+from .server_cursors import CursorNotFound
+from .metrics import observe_query
+from .tracing import db_span
+
+logger = logging.getLogger(__name__)
+
+METADATA_FILE = "mirror.json"
+_TABLE_NAME_RE = re.compile(r"[a-z_][a-z0-9_]*\Z")
+
+
+def _import_duckdb():
+    try:
+        import duckdb
+    except ImportError as e:
+        raise ImportError(
+            "The DuckDB mirror engine requires duckdb. Install it with: pip install duckdb"
+        ) from e
+    return duckdb
+
+
+def build_mirror(export_dir, mirror_dir, tables=None, snapshot=None):
+    """Convert an AACT flat-file export into Parquet files.
+
+    Args:
+        export_dir: Directory holding the pipe-delimited ``<table>.txt`` files.
+        mirror_dir: Directory to write ``<table>.parquet`` files and metadata to.
+        tables: Optional list of table names to convert; defaults to all.
+        snapshot: Snapshot label; defaults to the export directory's date.
+
+    Returns:
+        The metadata written to ``mirror.json``.
+    """
+    duckdb = _import_duckdb()
+    export_dir = pathlib.Path(export_dir)
+    mirror_dir = pathlib.Path(mirror_dir)
+    mirror_dir.mkdir(parents=True, exist_ok=True)
+
+    files = sorted(export_dir.glob("*.txt"))
+    if tables:
+        wanted = set(tables)
+        files = [path for path in files if path.stem in wanted]
+    if not files:
+        raise FileNotFoundError(f"No AACT flat files (*.txt) found in {export_dir}")
+
+    con = duckdb.connect()
+    converted = {}
+    try:
+        for path in files:
+            table = path.stem.lower()
+            if not _TABLE_NAME_RE.match(table):
+                logger.warning("Skipping %s: not a table name", path.name)
+                continue
+            target = mirror_dir / f"{table}.parquet"
+            partial = target.with_suffix(".parquet.tmp")
+            start = time.perf_counter()
+            con.execute(
+                f"COPY (SELECT * FROM read_csv(?, delim='|', header=true, "
+                f"sample_size=-1, null_padding=true)) "
+                f"TO '{partial.as_posix()}' (FORMAT parquet, COMPRESSION zstd)",
+                [path.as_posix()]
+            )
+            os.replace(partial, target)
+            rows = con.execute(f"SELECT count(*) FROM read_parquet('{target.as_posix()}')").fetchone()[0]
+            converted[table] = rows
+            print(f"  {table}: {rows} rows in {time.perf_counter() - start:.1f}s")
+    finally:
+        con.close()
+
+    if snapshot is None:
+        snapshot = datetime.date.fromtimestamp(export_dir.stat().st_mtime).isoformat()
+    metadata = {
+        "snapshot": snapshot,
+        "built_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "tables": converted,
+    }
+    with open(mirror_dir / METADATA_FILE, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+    return metadata
+
+
+class _Stream:
+    __slots__ = ("cursor", "pending", "last_used", "lock")
+
+    def __init__(self, cursor, pending):
+        self.cursor = cursor
+        self.pending = pending
+        self.last_used = time.monotonic()
+        self.lock = asyncio.Lock()
+
+
+class DuckDBDatabase:
+    """AACT database backed by a local Parquet mirror.
+
+    Exposes the same coroutine interface as ``AACTDatabase`` so the in-process
+    tools work unchanged on either engine.
+
+    A mirror rebuilt in place is picked up on the next query, and
+    ``snapshot`` reports the new snapshot, which clears the query cache.
+
+    Args:
+        mirror_dir: Directory produced by ``build_mirror``.
+        max_concurrency: Maximum number of queries running at once.
+        statement_timeout_ms: Interrupt queries running longer than this; 0
+            disables the timeout.
+        cursor_idle_timeout: Seconds after which an unused stream is closed.
+        max_cursors: Maximum number of open streams.
+        threads: DuckDB worker threads; defaults to DuckDB's own choice.
+    """
+
+    def __init__(self, mirror_dir, max_concurrency=4, statement_timeout_ms=60000,
+                 cursor_idle_timeout=300.0, max_cursors=4, threads=None):
+        self.mirror_dir = pathlib.Path(mirror_dir)
+        self.statement_timeout_ms = statement_timeout_ms
+        self.cursor_idle_timeout = cursor_idle_timeout
+        self.max_cursors = max_cursors
+        self.threads = threads
+        self._con = None
+        self._stamp = None
+        self._lock = threading.Lock()
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        self._semaphore_loop = None
+        self._streams = {}
+        self.metadata = {}
+
+    def _slots(self):
+        """Return the concurrency Semaphore for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def _metadata_stamp(self):
+        try:
+            stat = (self.mirror_dir / METADATA_FILE).stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _connect(self):
+        """Return the connection, reloading the views when the mirror was rebuilt.
+
+        ``build_mirror`` writes ``mirror.json`` after the Parquet files, so a
+        changed metadata file means a complete new snapshot.
+        """
+        stamp = self._metadata_stamp()
+        if self._con is not None and (stamp is None or stamp == self._stamp):
+            return self._con
+        with self._lock:
+            if self._con is not None and (stamp is None or stamp == self._stamp):
+                return self._con
+            if stamp is None:
+                raise FileNotFoundError(
+                    f"No AACT mirror in {self.mirror_dir}; build one with "
+                    "python -m adk_aact_agent_project.duckdb_mirror"
+                )
+            with open(self.mirror_dir / METADATA_FILE, encoding="utf-8") as f:
+                metadata = json.load(f)
+            con = self._con
+            if con is None:
+                duckdb = _import_duckdb()
+                con = duckdb.connect(":memory:")
+                if self.threads:
+                    con.execute(f"SET threads = {int(self.threads)}")
+                con.execute("CREATE SCHEMA IF NOT EXISTS ctgov")
+                # Queries come from the model: they may read the mirror's
+                # files through the views, but no other local file, and
+                # cannot change these settings back
+                con.execute("SET allowed_directories = [?]", [self.mirror_dir.resolve().as_posix() + "/"])
+                con.execute("SET enable_external_access = false")
+                con.execute("SET lock_configuration = true")
+            for path in sorted(self.mirror_dir.glob("*.parquet")):
+                if _TABLE_NAME_RE.match(path.stem):
+                    con.execute(
+                        f"CREATE OR REPLACE VIEW ctgov.{path.stem} AS "
+                        f"SELECT * FROM read_parquet('{path.as_posix()}')"
+                    )
+            if self._con is not None:
+                logger.info("AACT mirror rebuilt; now serving snapshot %s", metadata.get("snapshot"))
+            self.metadata = metadata
+            self._stamp = stamp
+            self._con = con
+        return self._con
+
+    @property
+    def snapshot(self):
+        """Snapshot label recorded when the mirror was built."""
+        self._connect()
+        return self.metadata.get("snapshot")
+
+    @staticmethod
+    def _placeholders(query, params):
+        # The tools use psycopg2's %s placeholders; DuckDB expects ?.
+        return query.replace("%s", "?") if params else query
+
+    @staticmethod
+    def _rows(cursor, rows):
+        columns = [column[0] for column in cursor.description]
+        return ResultRows((dict(zip(columns, row)) for row in rows), columns)
+
+    @staticmethod
+    def _check_statement(cursor, query):
+        """Reject anything but a single SELECT; e.g. ``SELECT 1; COPY ... TO ...``."""
+        statements = cursor.extract_statements(query)
+        if len(statements) != 1 or statements[0].type != _import_duckdb().StatementType.SELECT:
+            raise ValueError("Only a single SELECT statement is allowed")
+
+    def _execute(self, cursor, query, params, row_limit):
+        self._check_statement(cursor, query)
+        with db_span("db.execute", "duckdb"):
+            cursor.execute(self._placeholders(query, params), list(params or []))
+        if cursor.description is None:
+            return []
+        with db_span("db.fetch", "duckdb") as span:
+            rows = cursor.fetchmany(row_limit) if row_limit else cursor.fetchall()
+            span.set_attribute("db.rows", len(rows))
+        return self._rows(cursor, rows)
+
+    async def _run(self, fn, cursor, *args):
+        """Run ``fn`` in a thread, interrupting it past the statement timeout."""
+        task = asyncio.ensure_future(asyncio.to_thread(fn, cursor, *args))
+        timeout = self.statement_timeout_ms / 1000 if self.statement_timeout_ms else None
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout=timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            cursor.interrupt()
+            with contextlib.suppress(BaseException):
+                await task
+            if isinstance(e, asyncio.TimeoutError):
+                raise TimeoutError(
+                    f"canceling statement due to statement timeout ({self.statement_timeout_ms} ms)"
+                ) from None
+            raise
+
+    async def execute_query(self, query, params=None, row_limit=None):
+        """Execute a query on the mirror and return rows as dictionaries."""
+        start = time.perf_counter()
+        with db_span("db.query", "duckdb", query):
+            async with self._slots():
+                cursor = (await asyncio.to_thread(self._connect)).cursor()
+                try:
+                    rows = await self._run(self._execute, cursor, query, params, row_limit)
+                finally:
+                    cursor.close()
+        observe_query("duckdb", time.perf_counter() - start, len(rows))
+        return rows
+
+    def _open(self, cursor, query, params, n):
+        self._check_statement(cursor, query)
+        with db_span("db.execute", "duckdb", query):
+            cursor.execute(self._placeholders(query, params), list(params or []))
+        return self._fetch(cursor, n + 1)
+
+    def _fetch(self, cursor, n):
+        with db_span("db.fetch", "duckdb") as span:
+            rows = cursor.fetchmany(n)
+            span.set_attribute("db.rows", len(rows))
+        return self._rows(cursor, rows)
+
+    async def _expire_idle(self):
+        now = time.monotonic()
+        for token, stream in list(self._streams.items()):
+            if now - stream.last_used > self.cursor_idle_timeout and not stream.lock.locked():
+                self._close_stream(token)
+
+    def _close_stream(self, token):
+        stream = self._streams.pop(token, None)
+        if stream is not None:
+            with contextlib.suppress(Exception):
+                stream.cursor.close()
+
+    async def stream_query(self, query, page_size, params=None):
+        """Run a query and return ``(first_page, token)``; see ``AACTDatabase``."""
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        await self._expire_idle()
+        if len(self._streams) >= self.max_cursors:
+            raise RuntimeError(
+                f"Too many open result cursors ({self.max_cursors}); "
+                "page through or let earlier results expire first"
+            )
+        start = time.perf_counter()
+        cursor = (await asyncio.to_thread(self._connect)).cursor()
+        try:
+            async with self._slots():
+                rows = await self._run(self._open, cursor, query, params, page_size)
+        except BaseException:
+            cursor.close()
+            raise
+        observe_query("duckdb", time.perf_counter() - start, min(len(rows), page_size))
+        if len(rows) <= page_size:
+            cursor.close()
+            return rows, None
+        token = secrets.token_urlsafe(16)
+        self._streams[token] = _Stream(cursor, rows[page_size:])
+        return rows[:page_size], token
+
+    async def fetch_more(self, token, n):
+        """Return the next ``n`` rows of a streamed query as ``(rows, token)``."""
+        if n < 1:
+            raise ValueError("n must be at least 1")
+        await self._expire_idle()
+        stream = self._streams.get(token)
+        if stream is None:
+            raise CursorNotFound("Unknown or expired continuation token")
+        async with stream.lock:
+            stream.last_used = time.monotonic()
+            start = time.perf_counter()
+            async with self._slots():
+                fetched = await self._run(self._fetch, stream.cursor, n + 1 - len(stream.pending))
+            observe_query("duckdb", time.perf_counter() - start, len(fetched))
+            rows = stream.pending + fetched
+            stream.pending = rows[n:]
+        if len(rows) <= n:
+            self._close_stream(token)
+            return rows, None
+        return rows[:n], token
+
+    async def close(self):
+        """Close open streams and the DuckDB connection."""
+        for token in list(self._streams):
+            self._close_stream(token)
+        with self._lock:
+            if self._con is not None:
+                self._con.close()
+                self._con = None
+            self._stamp = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a local Parquet mirror of an AACT flat-file export.")
+    parser.add_argument("--export-dir", required=True, help="Directory with the pipe-delimited AACT .txt files")
+    parser.add_argument("--mirror-dir", required=True, help="Directory to write the Parquet mirror to")
+    parser.add_argument("--tables", nargs="*", help="Only convert these tables")
+    parser.add_argument("--snapshot", help="Snapshot label (defaults to the export directory's date)")
+    parser.add_argument("--cubes", action="store_true", help="Rebuild the aggregate cubes after the mirror")
+    args = parser.parse_args()
+
+    print(f"Building AACT mirror from {args.export_dir} into {args.mirror_dir}...")
+    metadata = build_mirror(args.export_dir, args.mirror_dir, args.tables, args.snapshot)
+    print(f"Mirror for snapshot {metadata['snapshot']} ready with {len(metadata['tables'])} tables.")
+    if args.cubes:
+        from .aggregate_cubes import build_cubes
+        cubes = build_cubes(args.mirror_dir)
+        print(f"Aggregate cubes ready with {cubes['rows']} cells in {cubes['seconds']}s.")
@@ -0,0 +1,147 @@
+"""Readiness and health probes for AACT MCP servers.
+
+A server is ready when it has completed the MCP ``initialize`` handshake and
+answered a lightweight database ping (``SELECT 1`` through ``read_query``),
+so the first real tool call does not pay for uvx resolution, interpreter
+startup or the server's first database connection. ``wait_ready`` polls for
+that with exponential backoff until a deadline and reports how long it took,
+instead of sleeping for a guessed interval.
+
+The probes work with anything that has ``call_tool(name, arguments)``: a
+``JsonRpcClient`` (initialized here when needed) or a ``PooledServer``
+(initialized by its own session). Only the standard library is imported, so
+the diagnostic scripts can use this module directly.
+
+    client = await JsonRpcClient.spawn(MCP_COMMAND, MCP_ARGS, cwd=MCP_SERVER_CWD, env=MCP_ENV)
+    report = await wait_ready(client, deadline=60)
+    print(f"Ready in {report['seconds']:.2f}s")
+"""
+
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+DB_PING_QUERY = "SELECT 1 AS ok"
+
+
+class NotReadyError(TimeoutError):
+    """The server did not become ready.
+
+    Attributes:
+        report: The readiness report up to the failure, with ``ready`` False
+            and ``error`` describing the last failure.
+    """
+
+    def __init__(self, message, report):
+        super().__init__(message)
+        self.report = report
+
+
+def backoff_delays(initial=0.05, maximum=2.0, factor=2.0):
+    """Yield exponentially growing delays, capped at ``maximum``."""
+    delay = initial
+    while True:
+        yield delay
+        delay = min(maximum, delay * factor)
+
+
+def _tool_error(result):
+    """Return the error text of a tool result, or None if it succeeded."""
+    if isinstance(result, dict):
+        failed = result.get("isError")
+        content = result.get("content", [])
+        texts = [item.get("text", "") for item in content if item.get("type") == "text"]
+    else:
+        failed = getattr(result, "isError", None) or getattr(result, "is_error", False)
+        texts = [getattr(item, "text", "") for item in result.content if getattr(item, "type", None) == "text"]
+    if failed:
+        return "\n".join(texts) or "Tool call failed"
+    return None
+
+
+async def db_ping(server, timeout=5.0):
+    """Run the database ping through ``server``; return its latency in seconds.
+
+    Raises:
+        RuntimeError: The server answered with an error.
+        TimeoutError: No answer within ``timeout``.
+        Exception: Whatever ``server.call_tool`` raises.
+    """
+    start = time.monotonic()
+    result = await asyncio.wait_for(
+        server.call_tool("read_query", {"query": DB_PING_QUERY, "max_rows": 1}), timeout
+    )
+    error = _tool_error(result)
+    if error:
+        raise RuntimeError(f"Database ping failed: {error}")
+    return time.monotonic() - start
+
+
+async def wait_ready(server, deadline=60.0, check_db=True, attempt_timeout=5.0,
+                     initial_delay=0.05, max_delay=2.0):
+    """Wait until ``server`` has initialized and answers a database ping.
+
+    The handshake is one request with the whole deadline, since the server
+    reads it as soon as it is up; the database ping is retried with
+    exponential backoff, since the database may become reachable later. A
+    closed connection (the server exited) fails immediately.
+
+    Args:
+        server: A ``JsonRpcClient`` or any object with ``call_tool``.
+        deadline: Seconds to wait in total.
+        check_db: Whether to require a database ping after the handshake.
+        attempt_timeout: Seconds to wait for one database ping.
+        initial_delay: First backoff delay in seconds.
+        max_delay: Largest backoff delay in seconds.
+
+    Returns:
+        A report dict: ``ready``, ``seconds`` (time to ready),
+        ``initialize_seconds``, ``db_ping_seconds`` and ``attempts``.
+
+    Raises:
+        NotReadyError: The deadline passed or the server exited.
+    """
+    start = time.monotonic()
+    report = {"ready": False, "seconds": None, "initialize_seconds": None, "db_ping_seconds": None, "attempts": 0}
+
+    def remaining():
+        return deadline - (time.monotonic() - start)
+
+    def fail(message):
+        report["seconds"] = time.monotonic() - start
+        report["error"] = message
+        return NotReadyError(message, report)
+
+    if hasattr(server, "initialize") and getattr(server, "server_info", True) is None:
+        try:
+            await server.initialize(timeout=max(remaining(), 0.001))
+        except ConnectionError as e:
+            raise fail(f"Server exited before initializing: {e}") from e
+        except TimeoutError as e:
+            raise fail(f"Server did not initialize within {deadline}s") from e
+        report["initialize_seconds"] = time.monotonic() - start
+
+    if check_db:
+        delays = backoff_delays(initial_delay, max_delay)
+        while True:
+            report["attempts"] += 1
+            try:
+                report["db_ping_seconds"] = await db_ping(server, timeout=max(min(attempt_timeout, remaining()), 0.001))
+                break
+            except ConnectionError as e:
+                raise fail(f"Server exited: {e}") from e
+            except Exception as e:
+                if not getattr(server, "alive", True):
+                    raise fail(f"Server exited: {e}") from e
+                delay = next(delays)
+                if remaining() <= delay:
+                    raise fail(f"Not ready after {deadline}s ({report['attempts']} attempts): {e}") from e
+                logger.debug("MCP server not ready (attempt %d): %s", report["attempts"], e)
+                await asyncio.sleep(delay)
+
+    report["ready"] = True
+    report["seconds"] = time.monotonic() - start
+    logger.debug("MCP server ready in %.2fs", report["seconds"])
+    return report
@@ -0,0 +1,286 @@
+"""Append-only insights store behind ``append_insight`` and the insights memo.
+
+Insights are appended to a JSON-lines log, one record per line::
+
+    {"id": 41, "ts": 1760000000.0, "session": "session_alice", "user": "alice", "tags": ["oncology"], "finding": "..."}
+
+and indexed in memory by session, tag and time, so a lookup touches only
+the matching records. The log is replayed on start; a torn last line from a
+crash is skipped. Appending never rewrites earlier records.
+
+Durability uses group commit: an append waits until an fsync covers its
+record, and appends that arrive while an fsync is running share the next
+one, so concurrent sessions pay for one fsync per batch rather than one
+each.
+
+Each record's memo line is formatted once, when it is appended. The memo is
+rendered in pages, optionally for one session or tag; the full memo is
+extended with new lines instead of being rebuilt from scratch.
+
+Findings are also added to a BM25 index as they are appended, so
+``search`` returns the few insights relevant to a question instead of the
+whole memo.
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from .bm25 import BM25Index
+
+logger = logging.getLogger(__name__)
+
+EMPTY_MEMO = "No insights have been recorded yet."
+
+
+class InsightsStore:
+    """Append-only insights log with in-memory indexes.
+
+    Args:
+        path: JSON-lines log file; None keeps insights in memory only.
+        fsync: Whether appends wait for their record to reach the disk.
+    """
+
+    def __init__(self, path=None, fsync=True):
+        self.path = path
+        self.fsync = fsync
+        self._records = []
+        self._times = []
+        self._lines = []
+        self._by_session = {}
+        self._by_tag = {}
+        self._bm25 = BM25Index()
+        self._lock = threading.Lock()
+        self._file = None
+        self._loaded = False
+        self._memo = None
+        self._memo_count = 0
+        # Group commit: records written, records known durable, running fsync
+        self._written = 0
+        self._synced = 0
+        self._syncing = None
+        self.counters = {"appends": 0, "fsyncs": 0, "bytes": 0, "skipped_lines": 0}
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self._records)
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            if self.path:
+                self._load()
+                self._file = open(self.path, "a", encoding="utf-8")
+                if self._file.tell() and not self._ends_with_newline():
+                    # Start after a torn last line instead of extending it
+                    self._file.write("\n")
+            self._loaded = True
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    record["finding"]
+                except (ValueError, KeyError, TypeError):
+                    # A torn write at the end of the log, or a damaged line
+                    self.counters["skipped_lines"] += 1
+                    continue
+                self._index(record)
+        self._written = self._synced = len(self._records)
+        logger.info("Loaded %d insights from %s", len(self._records), self.path)
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _index(self, record):
+        position = len(self._records)
+        record["id"] = position
+        self._records.append(record)
+        # Times are kept non-decreasing so the time index stays sorted
+        self._times.append(max(record["ts"], self._times[-1]) if self._times else record["ts"])
+        self._lines.append(f"- [{datetime.fromtimestamp(record['ts']):%Y-%m-%d %H:%M}] {record['finding']}")
+        if record.get("session"):
+            self._by_session.setdefault(record["session"], []).append(position)
+        for tag in record.get("tags") or ():
+            self._by_tag.setdefault(tag, []).append(position)
+        self._bm25.add(position, " ".join([record["finding"], *(record.get("tags") or ())]))
+
+    def add(self, finding, session=None, user=None, tags=None):
+        """Append an insight and index it; return its record.
+
+        The record is written to the log but not yet fsynced; ``append``
+        also waits for durability.
+        """
+        self._ensure_loaded()
+        record = {
+            "ts": time.time(),
+            "session": session,
+            "user": user,
+            "tags": sorted({str(tag).strip().lower() for tag in tags or () if str(tag).strip()}),
+            "finding": finding,
+        }
+        with self._lock:
+            self._index(record)
+            if self._file is not None:
+                line = json.dumps(record) + "\n"
+                self._file.write(line)
+                self.counters["bytes"] += len(line.encode())
+            self._written = len(self._records)
+            self.counters["appends"] += 1
+        return record
+
+    async def append(self, finding, session=None, user=None, tags=None):
+        """Append an insight and wait until it is durable; return its record."""
+        record = self.add(finding, session=session, user=user, tags=tags)
+        await self.sync()
+        return record
+
+    async def sync(self):
+        """Wait until every record written so far has been flushed and fsynced.
+
+        Callers that arrive while an fsync runs wait for it and, if it did
+        not cover their records, share the next one.
+        """
+        if self._file is None:
+            return
+        target = self._written
+        while self._synced < target:
+            if self._syncing is None:
+                self._syncing = asyncio.ensure_future(self._sync_once())
+            await asyncio.shield(self._syncing)
+
+    async def _sync_once(self):
+        try:
+            with self._lock:
+                self._file.flush()
+                covered = self._written
+            if self.fsync:
+                await asyncio.to_thread(os.fsync, self._file.fileno())
+                self.counters["fsyncs"] += 1
+            self._synced = max(self._synced, covered)
+        finally:
+            self._syncing = None
+
+    def _positions(self, session=None, tag=None, since=None, until=None):
+        """Return the positions of matching records, oldest first."""
+        self._ensure_loaded()
+        if session is not None and tag is not None:
+            tagged = set(self._by_tag.get(tag.lower(), ()))
+            positions = [p for p in self._by_session.get(session, ()) if p in tagged]
+        elif session is not None:
+            positions = self._by_session.get(session, [])
+        elif tag is not None:
+            positions = self._by_tag.get(tag.lower(), [])
+        else:
+            positions = None
+        start = bisect.bisect_left(self._times, since) if since is not None else 0
+        end = bisect.bisect_right(self._times, until) if until is not None else len(self._times)
+        if positions is None:
+            return range(start, end)
+        if start or end < len(self._times):
+            positions = positions[bisect.bisect_left(positions, start):bisect.bisect_left(positions, end)]
+        return positions
+
+    def query(self, session=None, tag=None, since=None, until=None, offset=0, limit=None):
+        """Return matching records, oldest first.
+
+        Args:
+            session: Only insights from this session.
+            tag: Only insights with this tag.
+            since: Only insights added at or after this Unix time.
+            until: Only insights added at or before this Unix time.
+            offset: Matching records to skip.
+            limit: Maximum number of records.
+        """
+        positions = self._positions(session, tag, since, until)
+        end = None if limit is None else offset + limit
+        return [self._records[p] for p in positions[offset:end]]
+
+    def count(self, session=None, tag=None, since=None, until=None):
+        """Return the number of matching insights."""
+        return len(self._positions(session, tag, since, until))
+
+    def search(self, query, k=5, session=None, tag=None):
+        """Return up to ``k`` ``(record, score)`` pairs for ``query``, best first.
+
+        Findings and tags are ranked with BM25; ``session`` and ``tag``
+        restrict the candidates.
+        """
+        self._ensure_loaded()
+        candidates = None
+        if session is not None or tag is not None:
+            candidates = set(self._positions(session, tag))
+            if not candidates:
+                return []
+        with self._lock:
+            ranked = self._bm25.search(query, k=k, candidates=candidates)
+        return [(self._records[position], score) for position, score in ranked]
+
+    def memo(self, page=None, page_size=50, session=None, tag=None):
+        """Render insights as a markdown memo.
+
+        Args:
+            page: 1-based page number; None renders every matching insight.
+                Negative pages count from the end, so -1 is the most recent.
+            page_size: Insights per page.
+            session: Only insights from this session.
+            tag: Only insights with this tag.
+        """
+        positions = self._positions(session, tag)
+        if not positions:
+            return EMPTY_MEMO
+        if page is None:
+            if session is None and tag is None:
+                return self._full_memo()
+            return "\n".join(["# Insights Memo", ""] + [self._lines[p] for p in positions])
+        pages = max(1, -(-len(positions) // page_size))
+        if page < 0:
+            page = pages + 1 + page
+        page = min(max(page, 1), pages)
+        chunk = positions[(page - 1) * page_size:page * page_size]
+        header = f"# Insights Memo (page {page} of {pages}, {len(positions)} insights)"
+        return "\n".join([header, ""] + [self._lines[p] for p in chunk])
+
+    def _full_memo(self):
+        """The memo of every insight, extended with the lines added since the last call."""
+        with self._lock:
+            count = len(self._lines)
+            if self._memo is None:
+                self._memo = "\n".join(["# Insights Memo", ""] + self._lines[:count])
+            elif self._memo_count < count:
+                self._memo += "\n" + "\n".join(self._lines[self._memo_count:count])
+            self._memo_count = count
+            return self._memo
+
+    def stats(self):
+        """Return record counts and append, fsync and byte counters."""
+        self._ensure_loaded()
+        return {
+            "insights": len(self._records),
+            "sessions": len(self._by_session),
+            "tags": len(self._by_tag),
+            **self.counters,
+        }
+
+    def close(self):
+        """Flush and close the log file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
@@ -0,0 +1,329 @@
+"""Pipelined JSON-RPC client for MCP servers over stdio.
+
+``JsonRpcClient`` writes newline-delimited JSON-RPC 2.0 messages to a server
+and matches responses to requests by id in a background reader task, so many
+requests can be outstanding on one pipe at once:
+
+* backpressure: at most ``max_in_flight`` requests are outstanding; further
+  callers wait for a slot, and writes wait for the pipe to drain;
+* timeouts: each request has a deadline (``timeout``, overridable per call);
+* cancellation: a request that times out or whose caller is cancelled is
+  withdrawn, and the server is told with an MCP ``notifications/cancelled``.
+
+Requests from the server (``ping``) are answered; notifications go to the
+optional ``on_notification`` callback. When the server exits, outstanding
+requests fail with ``ConnectionError``.
+
+``call_tool`` returns the MCP ``CallToolResult`` as a dict, which
+``mcp_pool.pool_tools`` accepts, so one multiplexed server can back the
+agent's tools::
+
+    client = await JsonRpcClient.spawn("uvx", ["mcp-server-aact"], cwd=..., env=...)
+    await client.initialize()
+    tools = pool_tools(client)
+"""
+
+import asyncio
+import collections
+import contextlib
+import itertools
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# MCP protocol revision offered in initialize; servers answer with the one
+# they speak.
+PROTOCOL_VERSION = "2025-06-18"
+
+# Tool results arrive as one line each, so the line limit bounds result size.
+MAX_LINE_BYTES = 64 * 1024 * 1024
+
+# Server stderr lines kept for diagnostics.
+STDERR_LINES = 200
+
+
+class JsonRpcError(Exception):
+    """Error response from the server.
+
+    Attributes:
+        code: JSON-RPC error code.
+        data: Optional error data.
+    """
+
+    def __init__(self, code, message, data=None):
+        super().__init__(f"{message} (code {code})")
+        self.code = code
+        self.data = data
+
+
+class JsonRpcClient:
+    """Multiplexed JSON-RPC client over a pair of asyncio streams.
+
+    Args:
+        reader: ``asyncio.StreamReader`` with the server's output.
+        writer: Stream writer for the server's input (``write``, ``drain``
+            and ``close``).
+        max_in_flight: Requests outstanding at once.
+        timeout: Default per-request deadline in seconds; None waits forever.
+        process: The server process, when started by ``spawn``.
+        on_notification: Optional callable receiving each notification dict
+            sent by the server.
+    """
+
+    def __init__(self, reader, writer, max_in_flight=32, timeout=30.0, process=None, on_notification=None):
+        self.reader = reader
+        self.writer = writer
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.process = process
+        self.on_notification = on_notification
+        self.server_info = None
+        self.stderr_lines = collections.deque(maxlen=STDERR_LINES)
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._write_lock = asyncio.Lock()
+        self._reader_task = None
+        self._stderr_task = None
+        self._closed = False
+        self._error = None
+        self.counters = {
+            "sent": 0,
+            "completed": 0,
+            "errors": 0,
+            "timeouts": 0,
+            "cancelled": 0,
+            "unmatched": 0,
+            "max_in_flight_seen": 0,
+        }
+
+    @classmethod
+    async def spawn(cls, command, args=(), cwd=None, env=None, **kwargs):
+        """Start a server process and return a client connected to it.
+
+        Args:
+            command: Server executable (e.g. ``uvx``).
+            args: Its arguments (e.g. ``["mcp-server-aact"]``).
+            cwd: Working directory for the server.
+            env: Extra environment variables, added to this process's.
+            **kwargs: Passed to ``JsonRpcClient``.
+        """
+        process = await asyncio.create_subprocess_exec(
+            command, *args,
+            cwd=cwd,
+            env={**os.environ, **(env or {})},
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=MAX_LINE_BYTES
+        )
+        client = cls(process.stdout, process.stdin, process=process, **kwargs)
+        client._stderr_task = asyncio.create_task(client._drain_stderr(process.stderr))
+        client.start()
+        return client
+
+    def start(self):
+        """Start matching responses; ``spawn`` does this already."""
+        if self._reader_task is None:
+            self._reader_task = asyncio.create_task(self._read_loop())
+
+    @property
+    def in_flight(self):
+        """Number of requests awaiting a response."""
+        return len(self._pending)
+
+    @property
+    def alive(self):
+        """Whether the connection can still carry requests."""
+        return not self._closed and self._error is None and self._reader_task is not None and not self._reader_task.done()
+
+    async def request(self, method, params=None, timeout=None):
+        """Send a request and return its result.
+
+        Waits for a free slot when ``max_in_flight`` requests are outstanding.
+
+        Args:
+            method: JSON-RPC method.
+            params: Optional params object.
+            timeout: Deadline in seconds; defaults to the client's ``timeout``.
+
+        Raises:
+            JsonRpcError: The server answered with an error.
+            TimeoutError: No response within the deadline.
+            ConnectionError: The connection closed before the response.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        async with self._slots:
+            if not self.alive:
+                raise ConnectionError(str(self._error or "JSON-RPC connection is closed"))
+            request_id = next(self._ids)
+            future = asyncio.get_running_loop().create_future()
+            self._pending[request_id] = future
+            self.counters["max_in_flight_seen"] = max(self.counters["max_in_flight_seen"], len(self._pending))
+            message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+            if params is not None:
+                message["params"] = params
+            try:
+                await self._send(message)
+                self.counters["sent"] += 1
+                return await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                self.counters["timeouts"] += 1
+                await self._cancel(request_id, f"Timed out after {timeout}s")
+                raise TimeoutError(f"{method} timed out after {timeout}s") from None
+            except asyncio.CancelledError:
+                self.counters["cancelled"] += 1
+                await asyncio.shield(self._cancel(request_id, "Cancelled by the client"))
+                raise
+            finally:
+                self._pending.pop(request_id, None)
+
+    async def notify(self, method, params=None):
+        """Send a notification (no response)."""
+        message = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        await self._send(message)
+
+    async def _cancel(self, request_id, reason):
+        if request_id in self._pending and self.alive:
+            with contextlib.suppress(Exception):
+                await self.notify("notifications/cancelled", {"requestId": request_id, "reason": reason})
+
+    async def _send(self, message):
+        data = json.dumps(message).encode() + b"\n"
+        async with self._write_lock:
+            self.writer.write(data)
+            # Waits while the pipe buffer is full
+            await self.writer.drain()
+
+    async def _read_loop(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    logger.debug("Ignoring non-JSON output: %r", line[:200])
+                    continue
+                if isinstance(message, list):
+                    for item in message:
+                        await self._dispatch(item)
+                else:
+                    await self._dispatch(message)
+            self._error = ConnectionError("Server closed the connection")
+        except Exception as e:
+            self._error = ConnectionError(f"Reading from server failed: {e}")
+        finally:
+            if self._error is None:
+                self._error = ConnectionError("JSON-RPC connection is closed")
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(self._error)
+
+    async def _dispatch(self, message):
+        if not isinstance(message, dict):
+            return
+        if "method" in message:
+            if "id" in message:
+                await self._answer(message)
+            elif self.on_notification is not None:
+                self.on_notification(message)
+            return
+        future = self._pending.get(message.get("id"))
+        if future is None or future.done():
+            # A late response to a request that timed out or was cancelled
+            self.counters["unmatched"] += 1
+            return
+        if "error" in message:
+            self.counters["errors"] += 1
+            error = message["error"] or {}
+            future.set_exception(JsonRpcError(error.get("code"), error.get("message", "Unknown error"), error.get("data")))
+        else:
+            self.counters["completed"] += 1
+            future.set_result(message.get("result"))
+
+    async def _answer(self, message):
+        """Answer a request from the server."""
+        reply = {"jsonrpc": "2.0", "id": message["id"]}
+        if message["method"] == "ping":
+            reply["result"] = {}
+        else:
+            reply["error"] = {"code": -32601, "message": f"Method not found: {message['method']}"}
+        with contextlib.suppress(Exception):
+            await self._send(reply)
+
+    async def _drain_stderr(self, stream):
+        """Keep the server's stderr flowing; its last lines are kept for diagnostics."""
+        with contextlib.suppress(Exception):
+            while line := await stream.readline():
+                self.stderr_lines.append(line.decode("utf-8", "replace").rstrip())
+
+    async def initialize(self, client_name="aact-jsonrpc-client", timeout=None):
+        """Complete the MCP initialize handshake; return the server's result."""
+        self.server_info = await self.request("initialize", {
+            "protocolVersion": PROTOCOL_VERSION,
+            "capabilities": {},
+            "clientInfo": {"name": client_name, "version": "1.0"},
+        }, timeout=timeout)
+        await self.notify("notifications/initialized")
+        return self.server_info
+
+    async def ping(self, timeout=None):
+        """Send an MCP ping."""
+        return await self.request("ping", timeout=timeout)
+
+    async def list_tools(self, timeout=None):
+        """Return the server's tool definitions."""
+        return (await self.request("tools/list", {}, timeout=timeout)).get("tools", [])
+
+    async def call_tool(self, name, arguments=None, timeout=None, meta=None):
+        """Call a tool; return the ``CallToolResult`` dict.
+
+        Args:
+            name: Tool name.
+            arguments: Tool arguments.
+            timeout: Deadline in seconds; defaults to the client's ``timeout``.
+            meta: Optional ``_meta`` for the request, e.g. a trace context.
+        """
+        params = {"name": name, "arguments": arguments or {}}
+        if meta:
+            params["_meta"] = meta
+        return await self.request("tools/call", params, timeout=timeout)
+
+    def stats(self):
+        """Return request counters and the current in-flight count."""
+        return {**self.counters, "in_flight": self.in_flight}
+
+    async def close(self, timeout=5.0):
+        """Close the connection and stop the server process, if spawned."""
+        if self._closed:
+            return
+        self._closed = True
+        with contextlib.suppress(Exception):
+            self.writer.close()
+        if self.process is not None:
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout)
+            except asyncio.TimeoutError:
+                self.process.terminate()
+                try:
+                    await asyncio.wait_for(self.process.wait(), timeout)
+                except asyncio.TimeoutError:
+                    self.process.kill()
+                    await self.process.wait()
+        for task in (self._reader_task, self._stderr_task):
+            if task is not None:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
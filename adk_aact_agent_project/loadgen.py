@@ -0,0 +1,378 @@
+"""Replay recorded questions against the agent to measure the AACT tool path.
+
+Each line of the replay file is a JSON object holding a question under
+``question``, ``prompt``, ``text`` or ``title`` (the first present is used).
+A line may also script the tool calls the model makes for it, as
+``"tools": [{"name": "read_query", "args": {"query": "..."}}]``, or just the
+SQL to run as ``"sql"``. Every question is sent as a turn to a ``Runner``
+with ``root_agent``, its runner plugins and the in-process tools.
+
+No network is needed:
+
+* the model is ``StubLlm``, which plays each question's tool plan with a
+  fixed latency per call and then answers;
+* the database is a synthetic DuckDB mirror built in a temporary directory
+  (``--db stand-in``, the default), or the configured database
+  (``--db configured``).
+
+Load is either closed loop (``--concurrency`` workers, each sending its next
+turn when the previous one finishes) or open loop (``--rate`` arrivals per
+second, Poisson distributed, at most ``--concurrency`` in flight). In open
+loop, latency is measured from the scheduled arrival, so queueing counts.
+Turns for the same session run one at a time.
+
+Reports p50/p95/p99 turn latency, throughput, and model and tool call counts.
+With ``--max-p95-ms`` it exits with status 1 when p95 latency exceeds the
+threshold.
+
+Usage (from the repository root):
+    python -m adk_aact_agent_project.loadgen requests.jsonl --requests 500 --concurrency 8
+    python -m adk_aact_agent_project.loadgen requests.jsonl --rate 20 --llm-ms 200
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import zlib
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from .compaction import BYTES_PER_TOKEN, _content_size
+
+# Nothing that reads the configuration is imported at module level: the
+# environment is set up first, in _configure.
+
+QUESTION_KEYS = ("question", "prompt", "text", "title")
+
+# Queries the stub plays for questions without a scripted plan; all of them
+# run on the stand-in mirror.
+DEFAULT_QUERIES = [
+    "SELECT phase, count(*) AS studies FROM ctgov.studies GROUP BY phase ORDER BY studies DESC",
+    "SELECT overall_status, avg(enrollment) AS mean_enrollment FROM ctgov.studies GROUP BY overall_status",
+    "SELECT c.downcase_name, count(*) AS studies FROM ctgov.conditions c "
+    "JOIN ctgov.studies s ON s.nct_id = c.nct_id WHERE s.phase = 'PHASE3' "
+    "GROUP BY c.downcase_name ORDER BY studies DESC LIMIT 10",
+    "SELECT intervention_type, count(DISTINCT nct_id) AS studies FROM ctgov.interventions GROUP BY intervention_type",
+    "SELECT country, count(*) AS facilities FROM ctgov.facilities GROUP BY country ORDER BY facilities DESC LIMIT 10",
+]
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def load_records(path):
+    """Read replay records; return ``[(question, plan)]``.
+
+    ``plan`` is a list of ``(tool_name, args)`` pairs, or None for the
+    default plan.
+    """
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            question = next((record[key] for key in QUESTION_KEYS if record.get(key)), None)
+            if question is None:
+                raise ValueError(f"{path}:{number}: no question field ({', '.join(QUESTION_KEYS)})")
+            plan = None
+            if record.get("tools"):
+                plan = [(tool["name"], tool.get("args", {})) for tool in record["tools"]]
+            elif record.get("sql"):
+                plan = [("read_query", {"query": record["sql"]})]
+            records.append((str(question), plan))
+    if not records:
+        raise ValueError(f"{path} holds no records")
+    return records
+
+
+def default_plan(question):
+    """Describe ``studies`` and run one of the default queries, chosen by the question."""
+    query = DEFAULT_QUERIES[zlib.crc32(question.encode()) % len(DEFAULT_QUERIES)]
+    return [("describe_table", {"table_name": "studies"}), ("read_query", {"query": query})]
+
+
+def _turn_state(contents):
+    """Return the question of the current turn and how many tool results it has."""
+    step = 0
+    for content in reversed(contents):
+        for part in content.parts or ():
+            if part.function_response is not None:
+                step += 1
+            elif content.role == "user" and part.text:
+                return part.text, step
+    return "", step
+
+
+class StubLlm(BaseLlm):
+    """Scripted stand-in for Gemini.
+
+    For each turn it calls the tools of the question's plan one per model
+    call, then answers with a short text. Each call sleeps ``latency``
+    seconds to stand for model time and reports the prompt size, estimated
+    at 4 bytes per token, as its token usage.
+    """
+
+    model: str = "aact-stub"
+    latency: float = 0.0
+    plans: dict = {}
+    calls: int = 0
+    prompt_tokens: int = 0
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.calls += 1
+        question, step = _turn_state(llm_request.contents)
+        plan = self.plans.get(question) or default_plan(question)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if step < len(plan):
+            name, args = plan[step]
+            part = types.Part(function_call=types.FunctionCall(name=name, args=args))
+        else:
+            part = types.Part(text=f"Stub answer after {step} tool call(s).")
+        prompt_tokens = sum(_content_size(content) for content in llm_request.contents) // BYTES_PER_TOKEN
+        self.prompt_tokens += prompt_tokens
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[part]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens, candidates_token_count=10, total_token_count=prompt_tokens + 10
+            )
+        )
+
+
+def build_stand_in(directory, studies=20000, seed=7):
+    """Build a synthetic AACT mirror under ``directory``; return the mirror path."""
+    from .duckdb_mirror import build_mirror
+
+    rng = random.Random(seed)
+    export = os.path.join(directory, "export")
+    os.makedirs(export, exist_ok=True)
+    phases = ["PHASE1", "PHASE2", "PHASE3", "PHASE4", "NA"]
+    statuses = ["COMPLETED", "RECRUITING", "TERMINATED", "WITHDRAWN", "ACTIVE_NOT_RECRUITING"]
+    conditions = ["breast cancer", "diabetes", "asthma", "hypertension", "covid-19", "depression", "obesity"]
+    interventions = ["DRUG", "DEVICE", "BEHAVIORAL", "BIOLOGICAL", "PROCEDURE"]
+    countries = ["United States", "China", "France", "Germany", "Canada", "Japan"]
+    tables = {
+        "studies": ["nct_id|brief_title|overall_status|phase|study_type|enrollment|start_date"],
+        "conditions": ["nct_id|name|downcase_name"],
+        "browse_conditions": ["nct_id|mesh_term|downcase_mesh_term|mesh_type"],
+        "interventions": ["nct_id|intervention_type|name"],
+        "facilities": ["nct_id|name|city|country"],
+        "countries": ["nct_id|name|removed"],
+    }
+    for i in range(studies):
+        nct_id = f"NCT{i:08d}"
+        tables["studies"].append(
+            f"{nct_id}|Study {i}|{rng.choice(statuses)}|{rng.choice(phases)}|INTERVENTIONAL|"
+            f"{rng.randint(10, 5000)}|20{rng.randint(10, 24)}-{rng.randint(1, 12):02d}-01"
+        )
+        for condition in rng.sample(conditions, rng.randint(1, 3)):
+            tables["conditions"].append(f"{nct_id}|{condition.title()}|{condition}")
+            tables["browse_conditions"].append(f"{nct_id}|{condition.title()}|{condition}|mesh-list")
+        tables["interventions"].append(f"{nct_id}|{rng.choice(interventions)}|Intervention {i % 500}")
+        sites = [rng.choice(countries) for _ in range(rng.randint(1, 4))]
+        for site, country in enumerate(sites):
+            tables["facilities"].append(f"{nct_id}|Site {site}|City {i % 97}|{country}")
+        for country in sorted(set(sites)):
+            tables["countries"].append(f"{nct_id}|{country}|false")
+    for table, lines in tables.items():
+        with open(os.path.join(export, f"{table}.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+    mirror = os.path.join(directory, "mirror")
+    build_mirror(export, mirror, snapshot="stand-in")
+    return mirror
+
+
+class LoadStats:
+    """Per-turn latencies and call counts of a load run."""
+
+    def __init__(self):
+        self.latencies = []
+        self.tool_calls = collections.Counter()
+        self.tool_errors = collections.Counter()
+        self.failed = 0
+
+    def record_event(self, event):
+        for call in event.get_function_calls():
+            self.tool_calls[call.name] += 1
+        for response in event.get_function_responses():
+            if isinstance(response.response, dict) and "error" in response.response:
+                self.tool_errors[response.name] += 1
+
+
+class LoadGenerator:
+    """Sends replayed questions to a runner as closed- or open-loop load.
+
+    Args:
+        runner: The ADK ``Runner`` to drive.
+        records: ``[(question, plan)]`` to replay, cycled as needed.
+        requests: Number of turns to send.
+        concurrency: Workers in closed loop; cap on turns in flight in open loop.
+        rate: Arrivals per second for open loop; 0 for closed loop.
+        sessions: Number of sessions turns are spread over; 0 for one
+            session per turn.
+        seed: Seed for open-loop arrival times.
+    """
+
+    def __init__(self, runner, records, requests, concurrency=4, rate=0.0, sessions=0, seed=0):
+        self.runner = runner
+        self.records = records
+        self.requests = requests
+        self.concurrency = concurrency
+        self.rate = rate
+        self.sessions = sessions
+        self.random = random.Random(seed)
+        self.stats = LoadStats()
+        self._locks = collections.defaultdict(asyncio.Lock)
+        self._created = set()
+
+    def _session(self, index):
+        number = index % self.sessions if self.sessions else index
+        return f"load_user_{number}", f"load_session_{number}"
+
+    async def turn(self, index, start=None):
+        """Send turn ``index``; latency counts from ``start`` if given."""
+        question, _ = self.records[index % len(self.records)]
+        user_id, session_id = self._session(index)
+        async with self._locks[session_id]:
+            start = time.perf_counter() if start is None else start
+            try:
+                if session_id not in self._created:
+                    await self.runner.session_service.create_session(
+                        app_name=self.runner.app_name, user_id=user_id, session_id=session_id
+                    )
+                    self._created.add(session_id)
+                message = types.Content(role="user", parts=[types.Part(text=question)])
+                async for event in self.runner.run_async(user_id=user_id, session_id=session_id, new_message=message):
+                    self.stats.record_event(event)
+            except Exception as e:
+                self.stats.failed += 1
+                print(f"Turn {index} failed: {e}", file=sys.stderr)
+                return
+            self.stats.latencies.append(time.perf_counter() - start)
+
+    async def _closed_loop(self):
+        next_index = iter(range(self.requests))
+
+        async def worker():
+            for index in next_index:
+                await self.turn(index)
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+
+    async def _open_loop(self):
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def arrival(index, scheduled):
+            async with semaphore:
+                await self.turn(index, start=scheduled)
+
+        tasks = []
+        arrival_time = time.perf_counter()
+        for index in range(self.requests):
+            delay = arrival_time - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(arrival(index, arrival_time)))
+            arrival_time += self.random.expovariate(self.rate)
+        await asyncio.gather(*tasks)
+
+    async def run(self):
+        """Send all turns; return the elapsed wall time in seconds."""
+        start = time.perf_counter()
+        await (self._open_loop() if self.rate > 0 else self._closed_loop())
+        return time.perf_counter() - start
+
+
+def _configure(args, directory):
+    """Point the configuration at the in-process tools and the chosen database."""
+    os.environ["AACT_TOOL_TRANSPORT"] = "inprocess"
+    os.environ.setdefault("AACT_SESSION_BACKEND", "memory")
+    if args.db == "stand-in":
+        print(f"Building stand-in database ({args.studies} studies)...")
+        os.environ["AACT_DB_ENGINE"] = "duckdb"
+        os.environ["AACT_MIRROR_DIR"] = build_stand_in(directory, studies=args.studies)
+        os.environ.pop("AACT_CUBES_DIR", None)
+        from .aggregate_cubes import build_cubes
+        build_cubes(os.environ["AACT_MIRROR_DIR"])
+
+
+async def run(args, records):
+    # Imported after _configure so the configuration sees the environment.
+    from google.adk.runners import Runner
+
+    from .aact_query_agent import root_agent
+    from .aact_tools import get_database
+    from .config import APP_NAME
+    from .plugins import runner_plugins
+    from .sessions import close_session_service, session_service
+
+    llm = StubLlm(latency=args.llm_ms / 1000, plans={question: plan for question, plan in records if plan})
+    root_agent.model = llm
+    runner = Runner(agent=root_agent, app_name=APP_NAME, session_service=session_service, plugins=runner_plugins)
+    generator = LoadGenerator(
+        runner, records, args.requests or len(records),
+        concurrency=args.concurrency, rate=args.rate, sessions=args.sessions, seed=args.seed
+    )
+    try:
+        elapsed = await generator.run()
+    finally:
+        await close_session_service()
+        await get_database().close()
+    return generator.stats, llm, elapsed
+
+
+def report(args, stats, llm, elapsed):
+    """Print the run summary; return True if it passes the latency threshold."""
+    turns = len(stats.latencies)
+    mode = f"open loop, {args.rate:g}/s" if args.rate > 0 else "closed loop"
+    print(f"\n{turns} turns ({stats.failed} failed) in {elapsed:.2f}s: {turns / elapsed:.1f} turns/s "
+          f"[{mode}, concurrency {args.concurrency}, stub LLM {args.llm_ms:g} ms, db {args.db}]")
+    if not turns:
+        return False
+    p95 = _percentile(stats.latencies, 95) * 1000
+    print(f"  latency p50 {_percentile(stats.latencies, 50) * 1000:.1f} ms, p95 {p95:.1f} ms, "
+          f"p99 {_percentile(stats.latencies, 99) * 1000:.1f} ms, max {max(stats.latencies) * 1000:.1f} ms")
+    total_tools = sum(stats.tool_calls.values())
+    print(f"  model calls {llm.calls} ({llm.calls / turns:.2f}/turn), "
+          f"tool calls {total_tools} ({total_tools / turns:.2f}/turn), "
+          f"~{llm.prompt_tokens // turns} prompt tokens/turn")
+    for name, count in stats.tool_calls.most_common():
+        print(f"    {name:<20}{count:>8}  errors {stats.tool_errors[name]}")
+    if args.max_p95_ms is not None and p95 > args.max_p95_ms:
+        print(f"  REGRESSION: p95 {p95:.1f} ms exceeds the {args.max_p95_ms:g} ms threshold")
+        return False
+    return not stats.failed
+
+
+def main(args):
+    records = load_records(args.replay)
+    with tempfile.TemporaryDirectory() as directory:
+        _configure(args, directory)
+        stats, llm, elapsed = asyncio.run(run(args, records))
+    return 0 if report(args, stats, llm, elapsed) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("replay", nargs="?", default="requests.jsonl", help="JSONL file of recorded questions")
+    parser.add_argument("--requests", type=int, default=0, help="Turns to send; defaults to one per record")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=0.0, help="Open-loop arrivals per second; 0 for closed loop")
+    parser.add_argument("--sessions", type=int, default=0, help="Sessions to spread turns over; 0 for one per turn")
+    parser.add_argument("--llm-ms", type=float, default=50.0, help="Stub model latency per call")
+    parser.add_argument("--db", choices=["stand-in", "configured"], default="stand-in")
+    parser.add_argument("--studies", type=int, default=20000, help="Studies in the stand-in database")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-p95-ms", type=float, help="Fail if p95 turn latency exceeds this")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,557 @@
+"""Warm pool of AACT MCP server processes.
+
+Starting ``uvx mcp-server-aact`` costs uvx resolution, interpreter startup and
+a fresh database connection before the first tool call. The pool keeps a set
+of pre-started, initialized and health-checked server processes and hands them
+out to runners and sessions, so that cost is paid ahead of time instead of in
+the user-visible path. A new server joins the pool once it is ready: it has
+completed the MCP handshake and answered a database ping (see ``health``).
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from .batch_query import run_batch
+from .health import NotReadyError, wait_ready
+from .metrics import MCP_READY_SECONDS
+from .supervisor import error_result, short_circuit_message
+from .tracing import inject_meta, tracer
+
+logger = logging.getLogger(__name__)
+
+
+class PooledServer:
+    """A single pre-started MCP server process and its initialized session.
+
+    The stdio transport and client session are entered and exited inside one
+    dedicated owner task, as required by the underlying anyio task groups.
+    Other tasks only send requests over the session.
+    """
+
+    def __init__(self, params, start_timeout=60.0, ready_db_ping=True):
+        self.params = params
+        self.start_timeout = start_timeout
+        self.ready_db_ping = ready_db_ping
+        self.ready_seconds = None
+        self.session = None
+        self.requests_served = 0
+        self.started_at = None
+        self.last_used = None
+        self.last_checked = None
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._task = None
+        self._error = None
+
+    @property
+    def alive(self):
+        """Whether the server process and session are still usable."""
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Launch the server process and wait until it is ready.
+
+        Ready means the MCP initialize handshake completed and, with
+        ``ready_db_ping``, the server answered a database ping, all within
+        ``start_timeout``; the time taken is kept in ``ready_seconds``.
+        """
+        started = time.monotonic()
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=self.start_timeout)
+        except asyncio.TimeoutError:
+            # close() cancels the owner task, which may be stuck in the handshake
+            await self.close()
+            raise TimeoutError(
+                f"MCP server did not initialize within {self.start_timeout}s"
+            )
+        except asyncio.CancelledError:
+            await self.close()
+            raise
+        if self._error is not None:
+            raise self._error
+        try:
+            await wait_ready(
+                self,
+                deadline=self.start_timeout - (time.monotonic() - started),
+                check_db=self.ready_db_ping
+            )
+        except (NotReadyError, asyncio.CancelledError):
+            await self.close()
+            raise
+        # The readiness ping does not count towards recycling
+        self.requests_served = 0
+        self.started_at = self.last_used = self.last_checked = time.monotonic()
+        self.ready_seconds = self.started_at - started
+
+    async def _run(self):
+        try:
+            async with stdio_client(self.params) as (read_stream, write_stream):
+                async with ClientSession(read_stream, write_stream) as session:
+                    await session.initialize()
+                    self.session = session
+                    self._ready.set()
+                    await self._stop.wait()
+        except Exception as e:
+            self._error = e
+            logger.warning("MCP server process exited with error: %s", e)
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def health_check(self, timeout=5.0):
+        """Ping the server; return True if it answered within ``timeout``."""
+        if not self.alive:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout=timeout)
+        except Exception as e:
+            logger.info("MCP server failed health check: %s", e)
+            return False
+        self.last_checked = time.monotonic()
+        return True
+
+    async def call_tool(self, name, arguments=None):
+        """Call a tool on this server and count the request.
+
+        The current trace context travels with the request in ``_meta``.
+        """
+        if not self.alive:
+            raise RuntimeError("MCP server process is not running")
+        self.requests_served += 1
+        self.last_used = time.monotonic()
+        attributes = {"rpc.system": "jsonrpc", "rpc.method": "tools/call", "mcp.tool.name": name}
+        with tracer.start_as_current_span("mcp.call_tool", attributes=attributes):
+            return await self.session.call_tool(name, arguments or {}, meta=inject_meta())
+
+    async def close(self):
+        """Stop the owner task, which shuts down the session and process.
+
+        A server that is not ready yet never waits for the stop signal, so
+        its owner task is cancelled instead.
+        """
+        self._stop.set()
+        if self._task is not None:
+            if not self._ready.is_set():
+                self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+class MCPServerPool:
+    """Pool of pre-started AACT MCP server processes.
+
+    Args:
+        command: Command used to launch the server (e.g. ``uvx``).
+        args: Arguments for the command (e.g. ``["mcp-server-aact"]``).
+        cwd: Working directory for the server process.
+        env: Extra environment variables for the server process.
+        min_size: Number of servers kept warm at all times.
+        max_size: Upper bound on concurrently running servers.
+        idle_timeout: Seconds an idle server above ``min_size`` is kept before
+            it is reaped.
+        max_requests: Number of tool calls after which a server is recycled.
+        health_check_interval: Idle servers not checked for this many seconds
+            are pinged before being handed out.
+        health_check_timeout: Seconds to wait for a ping reply.
+        start_timeout: Seconds to wait for a new server to become ready.
+        ready_db_ping: Whether a new server must answer a database ping, and
+            not only the MCP handshake, before it is handed out.
+        call_timeout: Seconds a tool call may take before its server counts
+            as stalled and is replaced; None waits forever.
+        breaker: Optional ``CircuitBreaker``; while it is open, tool calls
+            fail at once instead of waiting for servers that cannot start.
+    """
+
+    def __init__(self, command, args, cwd=None, env=None, min_size=1, max_size=4,
+                 idle_timeout=300.0, max_requests=500, health_check_interval=30.0,
+                 health_check_timeout=5.0, start_timeout=60.0, ready_db_ping=True,
+                 call_timeout=None, breaker=None):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+        self.params = StdioServerParameters(command=command, args=list(args), cwd=cwd, env=env)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_requests = max_requests
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+        self.start_timeout = start_timeout
+        self.ready_db_ping = ready_db_ping
+        self.call_timeout = call_timeout
+        self.breaker = breaker
+
+        self._idle = []
+        self._size = 0
+        self._cond = None
+        self._reaper = None
+        # Background refills, and starts left by cancelled acquires,
+        # referenced until done
+        self._fills = set()
+        self._started = False
+        self._closed = False
+        self.stats = {
+            "started": 0,
+            "start_failures": 0,
+            "recycled": 0,
+            "reaped": 0,
+            "unhealthy": 0,
+            "checkouts": 0,
+            "stalls": 0,
+            "short_circuited": 0,
+            "last_ready_seconds": 0.0,
+        }
+
+    @property
+    def size(self):
+        """Number of running (idle or checked-out) servers."""
+        return self._size
+
+    @property
+    def idle_count(self):
+        """Number of servers waiting to be checked out."""
+        return len(self._idle)
+
+    async def start(self):
+        """Pre-start ``min_size`` servers and begin idle reaping."""
+        if self._started:
+            return
+        self._started = True
+        self._closed = False
+        self._cond = asyncio.Condition()
+        await self._fill()
+        self._reaper = asyncio.create_task(self._reap_loop())
+
+    async def _spawn(self):
+        server = PooledServer(self.params, start_timeout=self.start_timeout, ready_db_ping=self.ready_db_ping)
+        try:
+            await server.start()
+        except BaseException:
+            self.stats["start_failures"] += 1
+            raise
+        self.stats["started"] += 1
+        self.stats["last_ready_seconds"] = server.ready_seconds
+        MCP_READY_SECONDS.observe(server.ready_seconds)
+        logger.info("MCP server ready in %.2fs", server.ready_seconds)
+        return server
+
+    async def _fill(self):
+        """Start servers until ``min_size`` is reached."""
+        missing = self.min_size - self._size
+        if missing <= 0:
+            return
+        self._size += missing
+        results = await asyncio.gather(
+            *(self._spawn() for _ in range(missing)), return_exceptions=True
+        )
+        async with self._cond:
+            for result in results:
+                if isinstance(result, BaseException):
+                    self._size -= 1
+                    logger.error("Failed to pre-start MCP server: %s", result)
+                else:
+                    self._idle.append(result)
+            self._cond.notify_all()
+
+    async def acquire(self):
+        """Check out a healthy server, starting one if the pool has room.
+
+        Waits for a server to be released when ``max_size`` servers are busy.
+        """
+        if self._closed:
+            raise RuntimeError("MCP server pool is closed")
+        if not self._started:
+            await self.start()
+
+        while True:
+            spawn = False
+            async with self._cond:
+                while not self._idle and self._size >= self.max_size:
+                    await self._cond.wait()
+                if self._idle:
+                    # LIFO keeps the most recently used servers hot and lets
+                    # the others age out through idle reaping.
+                    server = self._idle.pop()
+                else:
+                    self._size += 1
+                    spawn = True
+
+            if spawn:
+                spawning = asyncio.ensure_future(self._spawn())
+                try:
+                    server = await asyncio.shield(spawning)
+                except asyncio.CancelledError:
+                    # The caller gave up; the server still starts and joins
+                    # the idle list instead of being killed half-started.
+                    self._track(self._adopt(spawning))
+                    raise
+                except BaseException:
+                    await self._discard_slot()
+                    raise
+            else:
+                stale = time.monotonic() - server.last_checked > self.health_check_interval
+                try:
+                    healthy = server.alive and (
+                        not stale or await server.health_check(self.health_check_timeout)
+                    )
+                except asyncio.CancelledError:
+                    await self.release(server)
+                    raise
+                if not healthy:
+                    self.stats["unhealthy"] += 1
+                    await server.close()
+                    await self._discard_slot()
+                    continue
+
+            self.stats["checkouts"] += 1
+            return server
+
+    async def release(self, server, discard=False):
+        """Return a server to the pool, recycling it if it is worn out or broken."""
+        if discard or self._closed or not server.alive or server.requests_served >= self.max_requests:
+            if server.requests_served >= self.max_requests:
+                self.stats["recycled"] += 1
+            await server.close()
+            await self._discard_slot()
+            if not self._closed:
+                self._track(self._fill())
+            return
+        async with self._cond:
+            self._idle.append(server)
+            self._cond.notify()
+
+    def _track(self, coro):
+        task = asyncio.create_task(coro)
+        self._fills.add(task)
+        task.add_done_callback(self._fills.discard)
+
+    async def _adopt(self, spawning):
+        """Release the server a cancelled ``acquire`` was starting once it is up."""
+        try:
+            server = await spawning
+        except asyncio.CancelledError:
+            await self._discard_slot()
+            raise
+        except Exception as e:
+            await self._discard_slot()
+            logger.error("Failed to start MCP server: %s", e)
+            return
+        await self.release(server)
+
+    async def _discard_slot(self):
+        async with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    @contextlib.asynccontextmanager
+    async def checkout(self):
+        """Async context manager yielding a server from the pool.
+
+        The server is discarded instead of returned if the body raises. A
+        cancelled body returns it: the session sends ``notifications/cancelled``
+        for the abandoned request, so the server stays usable.
+        """
+        server = await self.acquire()
+        failed = False
+        try:
+            yield server
+        except asyncio.CancelledError:
+            raise
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            await self.release(server, discard=failed)
+
+    async def call_tool(self, name, arguments=None):
+        """Call a tool on any pooled server.
+
+        A call that outlives ``call_timeout`` counts as a stall: its server
+        is discarded and replaced, and an error result is returned. Stalls
+        and failures feed the ``breaker``; while it is open, calls return an
+        error result at once.
+        """
+        breaker = self.breaker
+        if breaker is not None and not breaker.allow():
+            self.stats["short_circuited"] += 1
+            return error_result(short_circuit_message(breaker))
+        try:
+            async with self.checkout() as server:
+                result = await asyncio.wait_for(server.call_tool(name, arguments), self.call_timeout)
+        except asyncio.TimeoutError:
+            self.stats["stalls"] += 1
+            if breaker is not None:
+                breaker.record_failure()
+            logger.warning("MCP call %s stalled for %gs; replacing the server", name, self.call_timeout)
+            return error_result(f"{name} got no answer within {self.call_timeout:g}s; the server was restarted")
+        except asyncio.CancelledError:
+            # Cancelled by the caller: no outcome, so free the trial slot
+            if breaker is not None:
+                breaker.release()
+            raise
+        except Exception:
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+        if breaker is not None:
+            breaker.record_success()
+        return result
+
+    async def _reap_loop(self):
+        interval = max(1.0, min(self.idle_timeout, self.health_check_interval) / 2)
+        while not self._closed:
+            await asyncio.sleep(interval)
+            try:
+                await self._reap_once()
+            except Exception as e:
+                logger.warning("MCP pool reaper error: %s", e)
+
+    async def _reap_once(self):
+        """Close idle servers beyond ``min_size`` and drop unhealthy ones."""
+        now = time.monotonic()
+        to_close = []
+        async with self._cond:
+            keep = []
+            # Oldest idle servers sit at the front of the list.
+            for server in self._idle:
+                surplus = self._size - len(to_close) > self.min_size
+                if surplus and now - server.last_used > self.idle_timeout:
+                    to_close.append(server)
+                    self.stats["reaped"] += 1
+                else:
+                    keep.append(server)
+            self._idle = keep
+            self._size -= len(to_close)
+
+        for server in to_close:
+            await server.close()
+
+        for server in list(self._idle):
+            if now - server.last_checked > self.health_check_interval:
+                if not await server.health_check(self.health_check_timeout):
+                    async with self._cond:
+                        if server not in self._idle:
+                            continue
+                        self._idle.remove(server)
+                    self.stats["unhealthy"] += 1
+                    await server.close()
+                    await self._discard_slot()
+
+        await self._fill()
+
+    async def close(self):
+        """Stop the reaper and shut down every idle server."""
+        self._closed = True
+        if self._reaper is not None:
+            self._reaper.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._reaper
+            self._reaper = None
+        fills = list(self._fills)
+        for task in fills:
+            task.cancel()
+        await asyncio.gather(*fills, return_exceptions=True)
+        idle, self._idle = self._idle, []
+        self._size -= len(idle)
+        await asyncio.gather(*(server.close() for server in idle))
+        self._started = False
+
+
+def _tool_output(result):
+    """Flatten an MCP ``CallToolResult`` into what ADK function tools return.
+
+    Accepts the ``mcp`` result object or the raw dict returned by
+    ``JsonRpcClient.call_tool``.
+    """
+    if isinstance(result, dict):
+        text = "\n".join(item.get("text", "") for item in result.get("content", []) if item.get("type") == "text")
+        is_error = result.get("isError")
+    else:
+        text = "\n".join(
+            getattr(item, "text", "") for item in result.content if getattr(item, "type", None) == "text"
+        )
+        # ``isError`` was renamed to ``is_error`` in newer mcp releases.
+        is_error = getattr(result, "isError", None) or getattr(result, "is_error", False)
+    if is_error:
+        return {"error": text}
+    return text
+
+
+def pool_tools(pool, schema_index=None, batch_timeout=30.0, batch_max_queries=8):
+    """Build ADK function tools that route the AACT tools through ``pool``.
+
+    The functions keep the names and arguments of the AACT MCP server tools,
+    so the agent instructions apply unchanged.
+
+    Args:
+        pool: The ``MCPServerPool`` to check servers out from, or a single
+            ``JsonRpcClient`` that multiplexes every call over one server.
+        schema_index: Optional zero-argument callable returning a loaded
+            ``SchemaIndex`` (or None); when it returns an index,
+            ``list_tables`` and ``describe_table`` are answered from memory.
+        batch_timeout: Deadline in seconds for ``batch_read_query``.
+        batch_max_queries: Maximum number of queries in one batch.
+
+    Returns:
+        A list of async functions usable as ``Agent(tools=...)``.
+    """
+
+    async def list_tables():
+        """Shows all available tables in the AACT database."""
+        index = schema_index() if schema_index else None
+        if index is not None:
+            return index.list_tables()
+        return _tool_output(await pool.call_tool("list_tables", {}))
+
+    async def describe_table(table_name: str):
+        """Shows the columns and data types for a specific table.
+
+        Args:
+            table_name: Name of the table to describe.
+        """
+        index = schema_index() if schema_index else None
+        if index is not None:
+            columns = index.describe_table(table_name.removeprefix("ctgov."))
+            if columns is not None:
+                return columns
+        return _tool_output(await pool.call_tool("describe_table", {"table_name": table_name}))
+
+    async def read_query(query: str, max_rows: int = 25):
+        """Executes a SELECT SQL query to fetch data. Only SELECT queries are allowed.
+
+        Args:
+            query: The SELECT statement to execute.
+            max_rows: Maximum number of rows to return.
+        """
+        return _tool_output(
+            await pool.call_tool("read_query", {"query": query, "max_rows": max_rows})
+        )
+
+    async def batch_read_query(queries: dict[str, str], max_rows: int = 25):
+        """Executes several independent SELECT queries concurrently and returns all results.
+
+        Args:
+            queries: Object mapping a short name for each result to its SELECT statement.
+            max_rows: Maximum number of rows to return per query.
+        """
+        # Each query checks out its own server, so the batch spreads over the pool.
+        return await run_batch(
+            lambda query: read_query(query, max_rows),
+            queries,
+            timeout=batch_timeout,
+            max_queries=batch_max_queries
+        )
+
+    async def append_insight(finding: str):
+        """Saves a key finding or observation from your analysis.
+
+        Args:
+            finding: The insight to record.
+        """
+        return _tool_output(await pool.call_tool("append_insight", {"finding": finding}))
+
+    return [list_tables, describe_table, read_query, batch_read_query, append_insight]
@@ -0,0 +1,383 @@
+"""Operational metrics in the Prometheus text format.
+
+A small registry of counters, gauges and histograms with labels, plus
+collectors that read the counters the other components already keep in
+``stats()`` (caches, pools, the session service) at scrape time. Values are
+recorded by:
+
+* ``MetricsPlugin``: turn latency, turns in flight, active sessions, and per
+  tool call counts, latency, result rows and serialized bytes;
+* the in-process database backends: query time and rows returned;
+* the MCP server pool: time for a new server to become ready.
+
+``start_metrics_server`` serves ``GET /metrics`` from a background thread,
+for Prometheus to scrape.
+"""
+
+import asyncio
+import bisect
+import collections
+import http.server
+import json
+import logging
+import math
+import threading
+import time
+
+from google.adk.plugins.base_plugin import BasePlugin
+
+from .compaction import _rows_and_columns
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TURN_BUCKETS = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} takes labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def samples(self):
+        """Return ``[(suffix, labels, value)]`` for the exposition."""
+        with self._lock:
+            return [("", tuple(zip(self.label_names, key)), value) for key, value in self._values.items()]
+
+
+class Counter(_Metric):
+    """Monotonic counter."""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed bucket upper bounds."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0, 0.0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state[0][index] += 1
+            state[1] += 1
+            state[2] += value
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, count, total) in self._values.items():
+                labels = tuple(zip(self.label_names, key))
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    samples.append(("_bucket", labels + (("le", _format_value(float(bound))),), cumulative))
+                samples.append(("_bucket", labels + (("le", "+Inf"),), count))
+                samples.append(("_count", labels, count))
+                samples.append(("_sum", labels, total))
+        return samples
+
+
+class Registry:
+    """Metrics and scrape-time collectors rendered together."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._register(Counter(name, help_text, labels))
+
+    def gauge(self, name, help_text, labels=()):
+        return self._register(Gauge(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def add_collector(self, collector):
+        """Register ``collector()``, called at each scrape.
+
+        It returns an iterable of ``(name, kind, help, samples)`` where
+        ``samples`` is a list of ``(labels_dict, value)``.
+        """
+        self._collectors.append(collector)
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            samples = metric.samples()
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        for collector in self._collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                logger.warning("Metrics collector %s failed: %s", getattr(collector, "__name__", collector), e)
+                continue
+            for name, kind, help_text, samples in families:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+TURN_SECONDS = registry.histogram(
+    "aact_turn_duration_seconds", "Wall time of an agent turn.", buckets=TURN_BUCKETS
+)
+TURNS = registry.counter("aact_turns_total", "Agent turns by outcome.", ("outcome",))
+TURNS_IN_FLIGHT = registry.gauge("aact_turns_in_flight", "Agent turns currently running.")
+TOOL_CALLS = registry.counter("aact_tool_calls_total", "Tool calls by tool and outcome.", ("tool", "outcome"))
+TOOL_SECONDS = registry.histogram("aact_tool_duration_seconds", "Tool call latency.", ("tool",))
+TOOL_RESULT_ROWS = registry.counter("aact_tool_result_rows_total", "Rows returned by tool calls.", ("tool",))
+TOOL_RESULT_BYTES = registry.counter(
+    "aact_tool_result_bytes_total", "JSON bytes of tool results sent to the model.", ("tool",)
+)
+DB_QUERY_SECONDS = registry.histogram(
+    "aact_db_query_duration_seconds", "Database query time, including the wait for a connection.", ("engine",)
+)
+DB_ROWS = registry.counter("aact_db_rows_returned_total", "Rows returned by the database.", ("engine",))
+MCP_READY_SECONDS = registry.histogram(
+    "aact_mcp_server_ready_seconds", "Time from launching an MCP server to its first successful database ping.",
+    buckets=TURN_BUCKETS
+)
+
+
+def observe_query(engine, seconds, rows):
+    """Record one database call of the in-process backends."""
+    DB_QUERY_SECONDS.observe(seconds, engine=engine)
+    DB_ROWS.inc(rows, engine=engine)
+
+
+def _result_rows(result):
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict) and isinstance(result.get("results"), dict):
+        # batch_read_query: one result per named query
+        return sum(_result_rows(value) for value in result["results"].values())
+    rows, _ = _rows_and_columns(result)
+    return len(rows) if rows is not None else 0
+
+
+class MetricsPlugin(BasePlugin):
+    """Runner plugin recording turn and tool metrics.
+
+    Args:
+        active_window: Seconds since its last turn for which a session counts
+            as active.
+    """
+
+    def __init__(self, active_window=300.0, name="aact_metrics"):
+        super().__init__(name=name)
+        self.active_window = active_window
+        self._turns = {}
+        self._tools = {}
+        self._last_seen = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def active_sessions(self):
+        """Number of sessions with a turn in the last ``active_window`` seconds."""
+        cutoff = time.monotonic() - self.active_window
+        with self._lock:
+            while self._last_seen and next(iter(self._last_seen.values())) < cutoff:
+                self._last_seen.popitem(last=False)
+            return len(self._last_seen)
+
+    def _seen(self, invocation_context):
+        key = (invocation_context.user_id, invocation_context.session.id)
+        with self._lock:
+            self._last_seen[key] = time.monotonic()
+            self._last_seen.move_to_end(key)
+
+    async def before_run_callback(self, *, invocation_context):
+        # A cancelled turn gets neither after_run_callback nor
+        # on_run_error_callback; it ends when the task running it finishes.
+        task = asyncio.current_task()
+        on_done = None
+        if task is not None:
+            def on_done(_):
+                self._end_turn(invocation_context, "cancelled")
+            task.add_done_callback(on_done)
+        self._turns[invocation_context.invocation_id] = (time.perf_counter(), task, on_done)
+        TURNS_IN_FLIGHT.inc()
+        self._seen(invocation_context)
+        return None
+
+    def _end_turn(self, invocation_context, outcome):
+        turn = self._turns.pop(invocation_context.invocation_id, None)
+        if turn is None:
+            return
+        start, task, on_done = turn
+        if task is not None and outcome != "cancelled":
+            task.remove_done_callback(on_done)
+        TURNS_IN_FLIGHT.dec()
+        TURN_SECONDS.observe(time.perf_counter() - start)
+        TURNS.inc(outcome=outcome)
+        self._seen(invocation_context)
+
+    async def after_run_callback(self, *, invocation_context):
+        self._end_turn(invocation_context, "ok")
+        return None
+
+    async def on_run_error_callback(self, *, invocation_context, error):
+        self._end_turn(invocation_context, "error")
+        return None
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context):
+        self._tools[tool_context.function_call_id] = time.perf_counter()
+        return None
+
+    def _end_tool(self, tool, tool_context, outcome):
+        start = self._tools.pop(tool_context.function_call_id, None)
+        if start is not None:
+            TOOL_SECONDS.observe(time.perf_counter() - start, tool=tool.name)
+        TOOL_CALLS.inc(tool=tool.name, outcome=outcome)
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result):
+        error = isinstance(result, dict) and "error" in result
+        self._end_tool(tool, tool_context, "error" if error else "ok")
+        TOOL_RESULT_ROWS.inc(_result_rows(result), tool=tool.name)
+        TOOL_RESULT_BYTES.inc(len(json.dumps(result, default=str)), tool=tool.name)
+        return None
+
+    async def on_tool_error_callback(self, *, tool, tool_args, tool_context, error):
+        self._end_tool(tool, tool_context, "exception")
+        return None
+
+    def collect(self):
+        """Collector for the active session count."""
+        yield (
+            "aact_active_sessions", "gauge",
+            f"Sessions with a turn in the last {self.active_window:g} seconds.",
+            [({}, self.active_sessions())]
+        )
+
+
+def stats_collector(prefix, stats, counters=(), help_text=""):
+    """Build a collector exposing a component's ``stats()`` dictionary.
+
+    Numeric entries named in ``counters`` become ``<prefix>_<name>_total``
+    counters; other numeric entries become ``<prefix>_<name>`` gauges.
+
+    Args:
+        prefix: Metric name prefix, e.g. ``aact_query_cache``.
+        stats: Zero-argument callable returning the stats dict, or None when
+            the component does not exist (yet).
+        counters: Names of the monotonic entries.
+        help_text: Component description used in the metric help.
+    """
+    def collect():
+        values = stats()
+        if not values:
+            return
+        for key, value in values.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            if key in counters:
+                yield f"{prefix}_{key}_total", "counter", f"{help_text}: {key}.", [({}, value)]
+            else:
+                yield f"{prefix}_{key}", "gauge", f"{help_text}: {key}.", [({}, value)]
+    collect.__name__ = prefix
+    return collect
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    registry = registry
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("metrics: " + format, *args)
+
+
+def start_metrics_server(port, host="127.0.0.1", metrics_registry=None):
+    """Serve ``/metrics`` on ``host:port`` from a daemon thread; return the server."""
+    handler = type("MetricsHandler", (_Handler,), {"registry": metrics_registry or registry})
+    server = http.server.ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="aact-metrics", daemon=True).start()
+    logger.info("Serving metrics on http://%s:%d/metrics", host, server.server_address[1])
+    return server
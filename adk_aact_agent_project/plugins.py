@@ -1,13 +1,196 @@
-"""Plugin configuration for the AACT Query Agent."""
-
-from google.adk.plugins.mcp_stdio_plugin import MCPStdioPlugin
-from .config import MCP_COMMAND, MCP_ARGS, MCP_SERVER_CWD, MCP_ENV
-
-# MCP Plugin Instance
-aact_mcp_plugin = MCPStdioPlugin(
-    name="aact_db_plugin",
-    command=MCP_COMMAND,
-    args=MCP_ARGS,
-    cwd=MCP_SERVER_CWD,
-    env=MCP_ENV
-) 
\ No newline at end of file
+"""Plugin configuration for the AACT Query Agent.
+
+The MCP plugin and the warm server pool are created on first access, so
+entry points that run the in-process tools never import the MCP client
+stack or start server processes.
+"""
+
+from .compaction import ContextCompactionPlugin, ContextCompactor, ResultStore
+from .config import (
+    MCP_COMMAND, MCP_ARGS, MCP_SERVER_CWD, MCP_ENV,
+    MCP_POOL_MIN_SIZE, MCP_POOL_MAX_SIZE, MCP_POOL_IDLE_TIMEOUT, MCP_POOL_MAX_REQUESTS,
+    MCP_READY_TIMEOUT, MCP_READY_DB_PING, MCP_CONNECTION, MCP_MAX_IN_FLIGHT,
+    MCP_CALL_TIMEOUT, MCP_BREAKER_FAILURES, MCP_BREAKER_RESET,
+    COMPACTION_ENABLED, COMPACTION_MAX_TOKENS, COMPACTION_MAX_PAYLOAD_BYTES,
+    COMPACTION_KEEP_TURNS, RESULT_STORE_MAX_BYTES, QUESTION_CACHE_MODE, QUESTION_CACHE_MAX_ENTRIES,
+    SESSION_BACKEND, TRACING, TRACE_FILE
+)
+from .metrics import MetricsPlugin, registry as metrics_registry, start_metrics_server, stats_collector
+from .question_cache import QuestionCache, QuestionCachePlugin
+from .tracing import setup_tracing
+
+# Export spans for turns, model calls, tool calls, MCP round trips and
+# database calls
+if TRACING != "off":
+    setup_tracing(TRACING, TRACE_FILE)
+
+# Full tool results behind the digests left by context compaction
+result_store = ResultStore(max_bytes=RESULT_STORE_MAX_BYTES)
+
+# Turn and tool metrics for the /metrics endpoint
+metrics_plugin = MetricsPlugin()
+
+# Runner plugins applied to every model request
+runner_plugins = [metrics_plugin]
+context_compactor = ContextCompactor(
+    result_store,
+    max_tokens=COMPACTION_MAX_TOKENS,
+    max_payload_bytes=COMPACTION_MAX_PAYLOAD_BYTES,
+    keep_recent_turns=COMPACTION_KEEP_TURNS
+)
+if COMPACTION_ENABLED:
+    runner_plugins.append(ContextCompactionPlugin(context_compactor))
+
+# Validated SQL of answered questions, invalidated when the schema changes
+question_cache = QuestionCache(max_entries=QUESTION_CACHE_MAX_ENTRIES)
+
+
+def _schema_version():
+    from .aact_tools import get_schema_index
+    index = get_schema_index()
+    return index.version if index is not None else None
+
+
+if QUESTION_CACHE_MODE in ("hint", "skip"):
+    runner_plugins.append(QuestionCachePlugin(
+        question_cache,
+        mode=QUESTION_CACHE_MODE,
+        schema_version=_schema_version,
+        result_store=result_store
+    ))
+
+# Commit the session store's queued writes when each invocation ends
+if SESSION_BACKEND != "memory":
+    from .session_store import SessionFlushPlugin
+    from .sessions import session_service
+    runner_plugins.append(SessionFlushPlugin(session_service))
+
+
+def _query_cache_stats():
+    from .aact_tools import query_cache
+    return query_cache.stats()
+
+
+def _db_pool_stats():
+    from . import aact_tools
+    pool = getattr(aact_tools._database, "pool", None)
+    return dict(pool.stats, size=pool.size) if pool is not None else None
+
+
+def _insights_stats():
+    from .aact_tools import insights_store
+    return insights_store.stats()
+
+
+def _aggregates_stats():
+    from .aact_tools import aggregate_cubes
+    return aggregate_cubes.counters
+
+
+def _session_stats():
+    from .sessions import session_service
+    return session_service.stats() if hasattr(session_service, "stats") else None
+
+
+def _mcp_pool_stats():
+    # Only report a pool that exists; reading the attribute would create it.
+    pool = globals().get("mcp_server_pool")
+    if pool is None:
+        return None
+    return dict(pool.stats, size=pool.size, **(pool.breaker.stats() if pool.breaker else {}))
+
+
+# Component counters read at scrape time
+metrics_registry.add_collector(metrics_plugin.collect)
+metrics_registry.add_collector(stats_collector(
+    "aact_query_cache", _query_cache_stats, ("hits", "misses", "evictions", "invalidations"), "read_query result cache"
+))
+metrics_registry.add_collector(stats_collector(
+    "aact_question_cache", question_cache.stats, ("hits", "misses", "evictions", "invalidations"), "Question cache"
+))
+metrics_registry.add_collector(stats_collector(
+    "aact_compaction", context_compactor.stats, ("requests", "compacted_requests", "digested_results", "bytes_saved"),
+    "Context compaction"
+))
+metrics_registry.add_collector(stats_collector(
+    "aact_insights", _insights_stats, ("appends", "fsyncs", "bytes", "skipped_lines"), "Insights store"
+))
+metrics_registry.add_collector(stats_collector(
+    "aact_aggregates", _aggregates_stats, ("lookups", "fallbacks"), "Aggregate cube lookups and read_query fallbacks"
+))
+metrics_registry.add_collector(stats_collector(
+    "aact_session_store", _session_stats, ("cache_hits", "cache_misses", "batches", "writes"), "Session service"
+))
+metrics_registry.add_collector(stats_collector(
+    "aact_db_pool", _db_pool_stats,
+    ("connections_opened", "connections_discarded", "health_check_failures", "acquire_timeouts", "queries"),
+    "Database connection pool"
+))
+metrics_registry.add_collector(stats_collector(
+    "aact_mcp_pool", _mcp_pool_stats,
+    ("started", "start_failures", "recycled", "reaped", "unhealthy", "checkouts", "restarts", "exits", "stalls",
+     "short_circuited", "calls", "circuit_trips"),
+    "MCP server pool or supervised connection (started counts every server process launch, including restarts)"
+))
+
+
+def _create_mcp_plugin():
+    from google.adk.plugins.mcp_stdio_plugin import MCPStdioPlugin
+    return MCPStdioPlugin(
+        name="aact_db_plugin",
+        command=MCP_COMMAND,
+        args=MCP_ARGS,
+        cwd=MCP_SERVER_CWD,
+        env=MCP_ENV
+    )
+
+
+def _create_mcp_server_pool():
+    # Shared MCP connection used by runners and sessions: a pool of warm
+    # server processes, or one supervised multiplexed server; both restart
+    # stalled servers and stop calling a server that keeps failing
+    from .supervisor import CircuitBreaker
+    breaker = CircuitBreaker(MCP_BREAKER_FAILURES, MCP_BREAKER_RESET)
+    if MCP_CONNECTION == "multiplexed":
+        from .supervisor import SupervisedClient
+        return SupervisedClient(
+            command=MCP_COMMAND,
+            args=MCP_ARGS,
+            cwd=MCP_SERVER_CWD,
+            env=MCP_ENV,
+            call_timeout=MCP_CALL_TIMEOUT,
+            ready_timeout=MCP_READY_TIMEOUT,
+            ready_db_ping=MCP_READY_DB_PING,
+            max_in_flight=MCP_MAX_IN_FLIGHT,
+            breaker=breaker
+        )
+    from .mcp_pool import MCPServerPool
+    return MCPServerPool(
+        command=MCP_COMMAND,
+        args=MCP_ARGS,
+        cwd=MCP_SERVER_CWD,
+        env=MCP_ENV,
+        min_size=MCP_POOL_MIN_SIZE,
+        max_size=MCP_POOL_MAX_SIZE,
+        idle_timeout=MCP_POOL_IDLE_TIMEOUT,
+        max_requests=MCP_POOL_MAX_REQUESTS,
+        start_timeout=MCP_READY_TIMEOUT,
+        ready_db_ping=MCP_READY_DB_PING,
+        call_timeout=MCP_CALL_TIMEOUT,
+        breaker=breaker
+    )
+
+
+_LAZY = {
+    "aact_mcp_plugin": _create_mcp_plugin,
+    "mcp_server_pool": _create_mcp_server_pool,
+}
+
+
+def __getattr__(name):
+    """Create ``aact_mcp_plugin`` and ``mcp_server_pool`` on first access."""
+    factory = _LAZY.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = factory()
+    return value
@@ -0,0 +1,156 @@
+"""Result cache for ``read_query``.
+
+Agents re-issue the same exploratory SELECTs (counts by phase, status, year)
+many times a day, and AACT only changes once per daily refresh. Results are
+cached under a fingerprint of the normalized SQL, bounded by entry count and
+total size, and the whole cache is dropped when the AACT snapshot changes.
+"""
+
+import hashlib
+import json
+import re
+from collections import OrderedDict
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<comment>--[^\n]*|/\*.*?\*/)
+    | (?P<string>[eE]?'(?:[^']|'')*')
+    | (?P<dollar>\$(?P<tag>[A-Za-z_][A-Za-z0-9_]*|)\$.*?\$(?P=tag)\$)
+    | (?P<quoted>"(?:[^"]|"")*")
+    | (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)
+    | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+    | (?P<space>\s+)
+    | (?P<op>::|<>|!=|<=|>=|\|\||.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+_SIMPLE_IDENTIFIER_RE = re.compile(r"[a-z_][a-z0-9_$]*\Z")
+
+
+def normalize_sql(query):
+    """Canonicalize SQL so trivially different spellings share a cache entry.
+
+    Comments and redundant whitespace are removed, unquoted keywords and
+    identifiers are lower-cased (Postgres folds them anyway), quoted
+    identifiers that need no quoting are unquoted, integer literals lose
+    leading zeros and trailing semicolons are dropped. String literal
+    contents, including dollar-quoted ones (``$$...$$``, ``$tag$...$tag$``),
+    are kept verbatim because they change the result.
+    """
+    tokens = []
+    for match in _TOKEN_RE.finditer(query):
+        kind = match.lastgroup
+        text = match.group()
+        if kind in ("comment", "space"):
+            continue
+        if kind == "word":
+            text = text.lower()
+        elif kind == "quoted":
+            inner = text[1:-1].replace('""', '"')
+            if _SIMPLE_IDENTIFIER_RE.match(inner):
+                text = inner
+        elif kind == "number" and text.isdigit():
+            text = str(int(text))
+        elif kind == "string" and text[0] in "eE":
+            text = "E" + text[1:]
+        tokens.append(text)
+    while tokens and tokens[-1] == ";":
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def fingerprint(query):
+    """Return a stable hash of the normalized query."""
+    return hashlib.sha256(normalize_sql(query).encode("utf-8")).hexdigest()
+
+
+class _Entry:
+    __slots__ = ("rows", "max_rows", "complete", "size")
+
+    def __init__(self, rows, max_rows, complete, size):
+        self.rows = rows
+        self.max_rows = max_rows
+        self.complete = complete
+        self.size = size
+
+
+class QueryCache:
+    """LRU cache of query results bounded by entry count and size in bytes.
+
+    An entry fetched with ``max_rows=n`` serves any later request for at most
+    ``n`` rows, and any request at all once it holds the complete result.
+
+    Args:
+        max_entries: Maximum number of cached queries.
+        max_bytes: Maximum total JSON size of cached results.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.snapshot = None
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, query, max_rows):
+        """Return cached rows for ``query`` limited to ``max_rows``, or None."""
+        key = fingerprint(query)
+        entry = self._entries.get(key)
+        if entry is None or not (entry.complete or (max_rows and max_rows <= entry.max_rows)):
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.rows[:max_rows] if max_rows else entry.rows
+
+    def put(self, query, max_rows, rows):
+        """Cache ``rows`` fetched for ``query`` with ``max_rows``."""
+        size = len(json.dumps(rows, default=str))
+        if size > self.max_bytes:
+            return
+        key = fingerprint(query)
+        complete = not max_rows or len(rows) < max_rows
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+        self._entries[key] = _Entry(rows, max_rows, complete, size)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self.evictions += 1
+
+    def check_snapshot(self, snapshot):
+        """Clear the cache if the AACT snapshot differs from the one cached against."""
+        if snapshot == self.snapshot:
+            return
+        if self.snapshot is not None:
+            self.invalidations += 1
+        self.clear()
+        self.snapshot = snapshot
+
+    def clear(self):
+        """Drop every cached result."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self):
+        """Return hit/miss/eviction counters and current occupancy."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "snapshot": self.snapshot,
+        }
@@ -0,0 +1,162 @@
+"""Planner-based cost guard for ``read_query``.
+
+Agent-written SQL often joins ``studies``, ``facilities`` and
+``outcome_measurements`` without filters, and such queries run for minutes on
+the shared AACT database. Before a query runs, ``QueryGuard`` asks Postgres
+for its plan with ``EXPLAIN (FORMAT JSON)`` and compares the estimated total
+cost and row count against budgets. Over-budget queries are rejected with a
+hint naming the scans that make them expensive, so the agent can add filters
+or aggregate instead. Every estimate and decision is logged to help tune the
+budgets.
+
+Queries without a top-level LIMIT also get one from ``max_rows``, so the
+database stops producing rows the tool would discard anyway.
+"""
+
+import json
+import logging
+
+from .query_cache import _TOKEN_RE, normalize_sql
+
+logger = logging.getLogger(__name__)
+
+_LIMIT_KEYWORDS = ("limit", "fetch")
+
+
+def _significant_tokens(query):
+    """Yield ``(kind, text, start, end)`` for tokens other than comments and whitespace."""
+    for match in _TOKEN_RE.finditer(query):
+        if match.lastgroup not in ("comment", "space"):
+            yield match.lastgroup, match.group(), match.start(), match.end()
+
+
+def ensure_limit(query, max_rows):
+    """Return ``query`` with ``LIMIT max_rows`` appended if it has no top-level limit.
+
+    A ``LIMIT`` or ``FETCH FIRST`` inside parentheses (a subquery or CTE) does
+    not bound the outer result and does not count. Trailing semicolons and
+    comments are dropped before the clause is appended.
+
+    Returns:
+        ``(query, injected)``.
+    """
+    if not max_rows:
+        return query, False
+    depth = 0
+    end = 0
+    for kind, text, _, token_end in _significant_tokens(query):
+        if text == "(":
+            depth += 1
+        elif text == ")":
+            depth -= 1
+        elif depth == 0 and kind == "word" and text.lower() in _LIMIT_KEYWORDS:
+            return query, False
+        if text != ";":
+            end = token_end
+    return f"{query[:end]}\nLIMIT {int(max_rows)}", True
+
+
+def _walk(plan):
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from _walk(child)
+
+
+def _largest_scans(plan, count=3):
+    """Return the sequential scans with the most estimated rows."""
+    scans = [
+        {"table": node.get("Relation Name"), "estimated_rows": node.get("Plan Rows", 0)}
+        for node in _walk(plan)
+        if node.get("Node Type") == "Seq Scan"
+    ]
+    scans.sort(key=lambda scan: scan["estimated_rows"], reverse=True)
+    return scans[:count]
+
+
+class QueryGuard:
+    """Reject queries whose planner estimates exceed configured budgets.
+
+    Args:
+        max_cost: Budget for the plan's estimated total cost (Postgres cost units).
+        max_rows: Budget for the plan's estimated result rows.
+    """
+
+    def __init__(self, max_cost=5_000_000, max_rows=1_000_000):
+        self.max_cost = max_cost
+        self.max_rows = max_rows
+        self.checked = 0
+        self.rejected = 0
+        self.limits_injected = 0
+        self.explain_failures = 0
+
+    def apply_limit(self, query, max_rows):
+        """Return ``query`` bounded to ``max_rows`` rows; see ``ensure_limit``."""
+        query, injected = ensure_limit(query, max_rows)
+        if injected:
+            self.limits_injected += 1
+        return query
+
+    async def explain(self, database, query):
+        """Return the root plan node of ``query`` as reported by ``EXPLAIN (FORMAT JSON)``."""
+        rows = await database.execute_query(f"EXPLAIN (FORMAT JSON) {query}")
+        plan = next(iter(rows[0].values()))
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]["Plan"]
+
+    def _rejection(self, plan, cost, rows):
+        reasons = []
+        if self.max_cost and cost > self.max_cost:
+            reasons.append(f"estimated cost {cost:,.0f} exceeds the budget of {self.max_cost:,.0f}")
+        if self.max_rows and rows > self.max_rows:
+            reasons.append(f"estimated {rows:,} result rows exceed the budget of {self.max_rows:,}")
+        if not reasons:
+            return None
+        scans = _largest_scans(plan)
+        suggestions = []
+        if scans:
+            tables = ", ".join(dict.fromkeys(f"ctgov.{scan['table']}" for scan in scans if scan["table"]))
+            suggestions.append(f"Filter the full scans of {tables} with WHERE conditions (e.g. on nct_id, phase, status or dates).")
+        suggestions.append("Make sure every join has a condition, usually on nct_id.")
+        suggestions.append("Aggregate with COUNT/GROUP BY instead of returning individual rows.")
+        suggestions.append("Query a smaller sample first, e.g. a subquery over studies with a LIMIT.")
+        return {
+            "error": "Query rejected before execution: " + "; ".join(reasons),
+            "estimate": {"total_cost": cost, "rows": rows, "largest_scans": scans},
+            "hint": " ".join(suggestions),
+        }
+
+    async def check(self, database, query):
+        """Explain ``query`` and return None if it is within budget.
+
+        Returns:
+            None to let the query run, or a structured rejection for the agent.
+            If ``EXPLAIN`` itself fails the query is allowed through, so the
+            agent sees the database's own error when it runs.
+        """
+        self.checked += 1
+        try:
+            plan = await self.explain(database, query)
+        except Exception as e:
+            self.explain_failures += 1
+            logger.info("EXPLAIN failed, running query unchecked: %s", e)
+            return None
+        cost = plan.get("Total Cost", 0.0)
+        rows = plan.get("Plan Rows", 0)
+        rejection = self._rejection(plan, cost, rows)
+        if rejection is not None:
+            self.rejected += 1
+        logger.info(
+            "Query plan cost=%.1f rows=%d decision=%s sql=%.200s",
+            cost, rows, "rejected" if rejection else "allowed", normalize_sql(query)
+        )
+        return rejection
+
+    def stats(self):
+        """Return guard counters."""
+        return {
+            "checked": self.checked,
+            "rejected": self.rejected,
+            "limits_injected": self.limits_injected,
+            "explain_failures": self.explain_failures,
+        }
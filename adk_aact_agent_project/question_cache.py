@@ -0,0 +1,283 @@
+"""Cache of validated SQL for previously answered questions.
+
+Users keep asking near-identical questions ("how many phase 3 cancer trials
+completed in 2022"), and each one goes through the full model-driven loop of
+schema lookups and query attempts. ``QuestionCache`` maps a normalized
+question to the ``read_query`` call the answer was based on (its SQL and
+arguments), and to the result handle of that query's result. ``QuestionCachePlugin``
+fills the cache from completed turns and uses it in one of two modes:
+
+* ``hint``: the cached SQL is added to the instruction as a first guess;
+* ``skip``: the cached query is re-run with its original arguments and its
+  result returned directly, without calling the model.
+
+Entries are evicted least-recently-used and dropped when the schema version
+changes. Questions are matched exactly after normalization or, when an
+``embed`` function is given (any local sentence embedding model), by cosine
+similarity of their embeddings.
+"""
+
+import collections
+import json
+import logging
+import math
+import re
+import time
+
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+# Tools that look at the data or schema. A call to one of them after a
+# read_query means that query was not the last step towards the answer;
+# recording an insight or recalling a result does not.
+_QUERY_TOOLS = frozenset({
+    "read_query", "batch_read_query", "fetch_more", "query_aggregates", "list_tables", "describe_table"
+})
+
+_WORD_RE = re.compile(r"[a-z0-9_]+")
+
+
+def normalize_question(text):
+    """Canonicalize a question: case, punctuation and whitespace.
+
+    Every word is kept; dropping "with" or "without" would give questions
+    with different answers the same key.
+    """
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def _cosine(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class _Entry:
+    __slots__ = ("question", "sql", "arguments", "result_handle", "embedding", "created", "hits")
+
+    def __init__(self, question, sql, arguments, result_handle, embedding):
+        self.question = question
+        self.sql = sql
+        self.arguments = arguments
+        self.result_handle = result_handle
+        self.embedding = embedding
+        self.created = time.time()
+        self.hits = 0
+
+
+class QuestionCache:
+    """LRU map from normalized questions to validated SQL.
+
+    Args:
+        max_entries: Maximum number of cached questions.
+        embed: Optional callable mapping text to an embedding vector.
+        similarity: Minimum cosine similarity for an embedding match.
+    """
+
+    def __init__(self, max_entries=2048, embed=None, similarity=0.92):
+        self.max_entries = max_entries
+        self.embed = embed
+        self.similarity = similarity
+        self.schema_version = None
+        self._entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def check_schema_version(self, version):
+        """Drop every entry if ``version`` differs from the cached schema version."""
+        if version != self.schema_version:
+            if self._entries:
+                self.invalidations += 1
+                logger.info("Schema version changed to %s; clearing question cache", version)
+            self._entries.clear()
+            self.schema_version = version
+
+    def _embedding_match(self, embedding):
+        best, best_score = None, self.similarity
+        for key, entry in self._entries.items():
+            if entry.embedding is not None:
+                score = _cosine(embedding, entry.embedding)
+                if score >= best_score:
+                    best, best_score = key, score
+        return best
+
+    def lookup(self, question):
+        """Return the cached entry for ``question``, or None."""
+        key = normalize_question(question)
+        if key not in self._entries and self.embed is not None and self._entries:
+            key = self._embedding_match(self.embed(question))
+        entry = self._entries.get(key) if key else None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        entry.hits += 1
+        self.hits += 1
+        return entry
+
+    def store(self, question, sql, result_handle=None, arguments=None):
+        """Record ``sql`` as the validated query answering ``question``.
+
+        ``arguments`` are the full ``read_query`` arguments it ran with
+        (e.g. ``max_rows``); by default just the query.
+        """
+        key = normalize_question(question)
+        if not key:
+            return
+        embedding = self.embed(question) if self.embed is not None else None
+        arguments = dict(arguments) if arguments else {"query": sql}
+        self._entries[key] = _Entry(question, sql, arguments, result_handle, embedding)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def forget(self, question):
+        """Remove the entry for ``question``."""
+        self._entries.pop(normalize_question(question), None)
+
+    def stats(self):
+        """Return cache counters."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "schema_version": self.schema_version,
+        }
+
+
+def _text(content):
+    return " ".join(part.text for part in (content.parts or ()) if part.text) if content else ""
+
+
+def _is_error(result):
+    return isinstance(result, dict) and "error" in result
+
+
+def _user_turns(contents):
+    return sum(1 for content in contents if content.role == "user" and _text(content))
+
+
+def _is_follow_up(invocation_context):
+    """Whether the session had user messages before this invocation."""
+    session = invocation_context.session
+    return any(
+        event.author == "user" and event.invocation_id != invocation_context.invocation_id and _text(event.content)
+        for event in session.events
+    )
+
+
+class QuestionCachePlugin(BasePlugin):
+    """Runner plugin that fills and serves a ``QuestionCache``.
+
+    The cache is keyed by the question alone, so only the first turn of a
+    session is looked up or stored; a follow-up such as "what about 2023?"
+    depends on the conversation before it.
+
+    Args:
+        cache: The question cache.
+        mode: ``hint`` to offer cached SQL to the model, ``skip`` to answer
+            from it without calling the model.
+        schema_version: Zero-argument callable returning the current schema
+            version (or None).
+        result_store: Optional ``ResultStore`` that keeps validated results
+            under a handle.
+    """
+
+    def __init__(self, cache, mode="hint", schema_version=None, result_store=None,
+                 name="aact_question_cache"):
+        super().__init__(name=name)
+        self.cache = cache
+        self.mode = mode
+        self.schema_version = schema_version or (lambda: None)
+        self.result_store = result_store
+        # Arguments and result of the read_query each running invocation's
+        # answer is based on, if any.
+        self._validated = {}
+
+    async def before_model_callback(self, *, callback_context, llm_request):
+        contents = llm_request.contents
+        # Only the first model call of a turn ends with the user's question.
+        if not contents or contents[-1].role != "user" or not _text(contents[-1]):
+            return None
+        if _user_turns(contents) > 1:
+            return None
+        question = _text(contents[-1])
+        self.cache.check_schema_version(self.schema_version())
+        entry = self.cache.lookup(question)
+        if entry is None:
+            return None
+        if self.mode == "skip":
+            response = await self._answer(entry, llm_request)
+            if response is not None:
+                return response
+        llm_request.append_instructions([
+            "A near-identical question was answered before with this validated query; "
+            "use it as your first read_query if it fits the current question:\n"
+            f"```sql\n{entry.sql}\n```"
+            + (f"\nIts result is available as result_handle '{entry.result_handle}'." if entry.result_handle else "")
+        ])
+        return None
+
+    async def _answer(self, entry, llm_request):
+        """Re-run the cached query and return it as the model's answer, or None."""
+        tool = llm_request.tools_dict.get("read_query")
+        read_query = getattr(tool, "func", None)
+        if read_query is None:
+            return None
+        try:
+            result = await read_query(**entry.arguments)
+        except Exception as e:
+            result = {"error": str(e)}
+        if _is_error(result):
+            logger.info("Cached SQL failed, falling back to the model: %s", result)
+            self.cache.forget(entry.question)
+            return None
+        text = (
+            "This question was answered before; here is the current result of the validated query.\n\n"
+            f"```sql\n{entry.sql}\n```\n\n```json\n{json.dumps(result, default=str, indent=1)}\n```"
+        )
+        return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result):
+        # Only a successful read_query that no other lookup or query follows
+        # is the one the answer is based on; exploratory queries and failed
+        # attempts in between are superseded.
+        if tool.name not in _QUERY_TOOLS:
+            return None
+        if (tool.name == "read_query" and tool_args.get("query") and not _is_error(result)
+                and not tool_args.get("stream")):
+            self._validated[tool_context.invocation_id] = (dict(tool_args), result)
+        else:
+            self._validated.pop(tool_context.invocation_id, None)
+        return None
+
+    async def on_tool_error_callback(self, *, tool, tool_args, tool_context, error):
+        if tool.name in _QUERY_TOOLS:
+            self._validated.pop(tool_context.invocation_id, None)
+        return None
+
+    async def on_run_error_callback(self, *, invocation_context, error):
+        self._validated.pop(invocation_context.invocation_id, None)
+
+    async def after_run_callback(self, *, invocation_context):
+        validated = self._validated.pop(invocation_context.invocation_id, None)
+        question = _text(invocation_context.user_content)
+        if validated is None or not question or _is_follow_up(invocation_context):
+            return None
+        arguments, result = validated
+        handle = self.result_store.put(result) if self.result_store is not None else None
+        self.cache.store(question, arguments["query"], handle, arguments=arguments)
+        return None
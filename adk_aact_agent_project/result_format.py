@@ -0,0 +1,170 @@
+"""Compact columnar encoding for AACT tool results.
+
+The default result shape is a list of row objects that repeats every column
+name in every row. The compact shape sends the column names once, rows as
+arrays, a type tag per column so dates and Decimals survive a round trip, and
+optionally replaces repeated strings (``phase``, ``overall_status``, ...) with
+indexes into a per-column dictionary::
+
+    {
+        "columns": ["nct_id", "phase", "start_date"],
+        "types": ["str", "str", "date"],
+        "rows": [["NCT00000102", 0, "1999-07-01"], ...],
+        "dictionaries": {"phase": ["Phase 1", "Phase 2"]}
+    }
+
+JSON and array columns are tagged ``json`` and sent as JSON text. The
+database layers return ``ResultRows``, which keep the column names of empty
+results.
+"""
+
+import datetime
+import decimal
+import json
+
+
+class ResultRows(list):
+    """Row dictionaries that remember the result's column names.
+
+    Slices keep the column names, so an empty page of a result still has them.
+    """
+
+    def __init__(self, rows=(), columns=()):
+        super().__init__(rows)
+        self.columns = list(columns)
+
+    def __getitem__(self, index):
+        item = super().__getitem__(index)
+        return ResultRows(item, self.columns) if isinstance(index, slice) else item
+
+
+_TYPE_TAGS = (
+    (bool, "bool"),
+    (int, "int"),
+    (float, "float"),
+    (decimal.Decimal, "decimal"),
+    (datetime.datetime, "datetime"),
+    (datetime.date, "date"),
+    (datetime.time, "time"),
+    (str, "str"),
+    ((dict, list), "json"),
+)
+
+
+def _type_tag(value):
+    for python_type, tag in _TYPE_TAGS:
+        if isinstance(value, python_type):
+            return tag
+    return "str"
+
+
+def _column_type(values):
+    tags = {_type_tag(value) for value in values if value is not None}
+    if not tags:
+        return "null"
+    if len(tags) == 1:
+        return tags.pop()
+    # Booleans from a mixed column are sent as 0 and 1
+    if tags <= {"bool", "int", "float", "decimal"}:
+        if "decimal" in tags:
+            return "decimal"
+        return "float" if "float" in tags else "int"
+    return "str"
+
+
+def _encode_value(value, tag):
+    if value is None:
+        return None
+    if tag == "decimal":
+        value = decimal.Decimal(value)
+        # Integral Decimals (counts, enrollment) are sent as plain numbers.
+        if value == value.to_integral_value() and abs(value) < 2 ** 53:
+            return int(value)
+        return str(value)
+    if tag in ("date", "datetime", "time"):
+        return value.isoformat()
+    if tag == "int" and isinstance(value, bool):
+        return int(value)
+    if tag == "float" and not isinstance(value, float):
+        return float(value)
+    if tag == "json" or (tag == "str" and isinstance(value, (dict, list))):
+        return json.dumps(value, default=str)
+    if tag == "str" and not isinstance(value, str):
+        return str(value)
+    return value
+
+
+def _decode_value(value, tag):
+    if value is None:
+        return None
+    if tag == "decimal":
+        return decimal.Decimal(str(value))
+    if tag == "date":
+        return datetime.date.fromisoformat(value)
+    if tag == "datetime":
+        return datetime.datetime.fromisoformat(value)
+    if tag == "time":
+        return datetime.time.fromisoformat(value)
+    if tag == "json":
+        return json.loads(value)
+    return value
+
+
+def encode_compact(rows, dictionary=True, min_rows_for_dictionary=8, max_distinct_ratio=0.5):
+    """Encode a list of row dictionaries into the compact columnar shape.
+
+    Args:
+        rows: Rows as returned by the database layer; column names of an
+            empty result come from ``ResultRows.columns``.
+        dictionary: Dictionary-encode string columns with many repeats.
+        min_rows_for_dictionary: Smallest result worth dictionary-encoding.
+        max_distinct_ratio: A string column is dictionary-encoded when its
+            distinct values are at most this fraction of the rows.
+
+    Returns:
+        A JSON-serializable dictionary.
+    """
+    columns = list(rows[0].keys()) if rows else list(getattr(rows, "columns", []))
+    types = [_column_type(row[column] for row in rows) for column in columns]
+    encoded = [
+        [_encode_value(row[column], tag) for column, tag in zip(columns, types)]
+        for row in rows
+    ]
+    result = {"columns": columns, "types": types, "rows": encoded}
+
+    if dictionary and len(rows) >= min_rows_for_dictionary:
+        dictionaries = {}
+        for position, (column, tag) in enumerate(zip(columns, types)):
+            if tag != "str":
+                continue
+            distinct = {}
+            for row in encoded:
+                value = row[position]
+                if value is not None and value not in distinct:
+                    distinct[value] = len(distinct)
+            if not distinct or len(distinct) > max_distinct_ratio * len(rows):
+                continue
+            for row in encoded:
+                if row[position] is not None:
+                    row[position] = distinct[row[position]]
+            dictionaries[column] = list(distinct)
+        if dictionaries:
+            result["dictionaries"] = dictionaries
+    return result
+
+
+def decode_compact(payload):
+    """Decode the compact columnar shape back into typed row dictionaries."""
+    columns = payload["columns"]
+    types = payload["types"]
+    dictionaries = payload.get("dictionaries", {})
+    lookups = [dictionaries.get(column) for column in columns]
+    rows = []
+    for encoded in payload["rows"]:
+        row = {}
+        for column, tag, lookup, value in zip(columns, types, lookups, encoded):
+            if lookup is not None and value is not None:
+                value = lookup[value]
+            row[column] = _decode_value(value, tag)
+        rows.append(row)
+    return rows
@@ -1,70 +1,111 @@
-"""Console runner for the AACT Query Agent."""
+"""Console runner for the AACT Query Agent.
 
+Modes:
+    console  Interactive prompt for one user (default).
+    socket   Concurrent conversations as JSON lines on a local TCP socket.
+    batch    Concurrent conversations as JSON lines from stdin to stdout.
+
+Usage (from the repository root):
+    python -m adk_aact_agent_project.run_agent [--mode console|socket|batch]
+"""
+
+import argparse
 import asyncio
+import functools
 import sys
-from google.adk.runners import Runner
-from google.genai import types
 
-from aact_query_agent import root_agent
-from config import APP_NAME
-from plugins import aact_mcp_plugin
-from sessions import session_service, get_or_create_session
+from .config import (
+    APP_NAME, TOOL_TRANSPORT, RUNNER_MAX_CONCURRENT_TURNS, RUNNER_MAX_TURNS_PER_USER,
+    RUNNER_HOST, RUNNER_PORT, METRICS_PORT, METRICS_HOST
+)
+
+async def main(args):
+    """Run the AACT Query Agent in the selected mode."""
+    # In batch mode stdout carries the replies, so progress goes to stderr
+    log = functools.partial(print, file=sys.stderr) if args.mode == "batch" else print
+    log("Initializing ADK Agent for AACT Database...")
+
+    # The ADK runtime, the agent and its tools are imported after the
+    # banner, so the console shows progress while they load
+    from google.adk.runners import Runner
+    from .aact_query_agent import root_agent
+    from .plugins import runner_plugins, metrics_registry, start_metrics_server, stats_collector
+    from .sessions import session_service, close_session_service
+    from .conversations import ConversationManager, serve_socket, serve_stdin
+
+    # Pre-start the MCP servers so the first tool call doesn't pay for startup
+    if TOOL_TRANSPORT == "stdio":
+        from .plugins import mcp_server_pool
+        await mcp_server_pool.start()
+        log(f"MCP server pool ready ({mcp_server_pool.size} warm server(s)).")
+    else:
+        log("Using in-process AACT tools.")
 
-async def main():
-    """Run the AACT Query Agent in console mode."""
-    print("Initializing ADK Agent for AACT Database...")
-    
-    # Set up the Runner with our agent, plugin, and session service
+    # Set up the Runner with our agent and session service; the agent's
+    # tools come from the configured transport, and the runner plugins
+    # compact old tool results out of each model request
     runner = Runner(
         agent=root_agent,
         app_name=APP_NAME,
         session_service=session_service,
-        plugins=[aact_mcp_plugin]
+        plugins=runner_plugins
     )
-    print("Runner initialized with agent and MCP plugin.")
-    
-    # Default user for console mode
-    user_id = "console_user"
-    session_id = f"session_{user_id}"
-    
-    # Get or create session
-    get_or_create_session(user_id, session_id)
-    
-    # Interaction Loop
+    # All conversations share the runner, and with it the tool backend
+    manager = ConversationManager(runner, args.max_concurrent, args.max_per_user)
+    metrics_registry.add_collector(stats_collector(
+        "aact_conversation_turns", manager.stats, ("completed", "failed"),
+        "Conversation turns run by run_agent.py"
+    ))
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT, METRICS_HOST, metrics_registry)
+    log("Runner initialized with agent and AACT tools.")
+
+    try:
+        if args.mode == "socket":
+            await serve_socket(manager, args.host, args.port)
+        elif args.mode == "batch":
+            await serve_stdin(manager)
+        else:
+            await console(manager)
+    finally:
+        if TOOL_TRANSPORT == "stdio":
+            await mcp_server_pool.close()
+        await close_session_service()
+
+async def console(manager, user_id="console_user"):
+    """Interactive loop for one user."""
     print("\nAgent ready. Type 'exit' to quit.")
     while True:
-        user_input = input("You: ")
+        # Read in a worker thread so the event loop keeps running tool and
+        # pool housekeeping tasks while waiting for the user
+        try:
+            user_input = await asyncio.to_thread(input, "You: ")
+        except EOFError:
+            break
         if user_input.lower() == 'exit':
             print("Exiting...")
             break
-
-        new_message = types.Content(role="user", parts=[types.Part(text=user_input)])
+        if not user_input.strip():
+            continue
 
         print("Agent is thinking...")
-        final_response_text = ""
         try:
-            async for event in runner.run_async(
-                user_id=user_id, 
-                session_id=session_id, 
-                new_message=new_message
-            ):
-                if event.type == "error":
-                    print(f"Error: {event.error}")
-                    break
-                
-                if event.type == "intermediate_response":
-                    # For streaming responses (optional)
-                    if event.text:
-                        print(f"(Thinking): {event.text}")
-                
-                if event.type == "final_response":
-                    final_response_text = event.response.text()
-            
+            final_response_text = await manager.ask(user_id, user_input)
             if final_response_text:
                 print(f"\nAgent: {final_response_text}")
-            
         except Exception as e:
             print(f"Error: {e}")
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the AACT Query Agent.")
+    parser.add_argument("--mode", choices=["console", "socket", "batch"], default="console")
+    parser.add_argument("--host", default=RUNNER_HOST)
+    parser.add_argument("--port", type=int, default=RUNNER_PORT)
+    parser.add_argument("--max-concurrent", type=int, default=RUNNER_MAX_CONCURRENT_TURNS,
+                        help="Turns running at once across all users")
+    parser.add_argument("--max-per-user", type=int, default=RUNNER_MAX_TURNS_PER_USER,
+                        help="Turns running at once for one user")
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,285 @@
+"""Memory-resident index of the AACT schema resource.
+
+``describe_table`` and ``list_tables`` are called before almost every query.
+Instead of querying ``information_schema`` each time, they are answered from
+the ``database_schema.json`` resource generated by the AACT_MCP server's
+``scripts/generate_json_schema.py``.
+
+The file is memory-mapped and indexed by the byte span of each table; a
+table's JSON is decoded the first time it is described. The spans are saved
+next to the schema in a small ``.idx`` sidecar, so once a given version of the
+file has been indexed, startup only reads the sidecar and maps the file.
+
+Without a sidecar, the spans of an indented file (as written by
+``json.dump(..., indent=n)``) are found from its line structure alone, without
+decoding any table; other files are scanned with the JSON decoder.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+_CONTAINER_KEYS = ("tables", "ctgov")
+_DECODER = json.JSONDecoder()
+# An object whose first member is on its own line: json.dump(..., indent=n)
+_INDENT_RE = re.compile(r"\{\n( +)\"")
+_CLOSING = {"{": "}", "[": "]"}
+
+
+def _skip_whitespace(text, pos):
+    return _WHITESPACE_RE.match(text, pos).end()
+
+
+def _indented_spans(text, pos, indent="", descend=False):
+    """Like ``_object_spans``, but from the line structure of an indented file.
+
+    JSON strings cannot contain a raw newline, so in a file written with
+    ``indent`` every line of the member indentation followed by a quote is a
+    member key, and the object closes at the first line holding ``}`` at its
+    own indentation ``indent``. No value is decoded. Returns None if the
+    object at ``pos`` is not laid out that way.
+    """
+    match = _INDENT_RE.match(text, pos)
+    if match is None or len(match.group(1)) <= len(indent):
+        return None
+    member = match.group(1)
+    spans = {}
+    previous = None
+    for match in re.compile("\n(?:" + member + '"|' + indent + "})").finditer(text, pos + 1):
+        if previous is not None:
+            key, start = previous
+            end = match.start()
+            while text[end - 1] in " \r\n,":
+                end -= 1
+            if text[start] in "{[":
+                if text[end - 1] != _CLOSING[text[start]]:
+                    return None
+                spans[key] = (start, end)
+        if text[match.end() - 1] == "}":
+            return spans
+        key, end = json.decoder.scanstring(text, match.end())
+        if not text.startswith(": ", end):
+            return None
+        if descend and key in _CONTAINER_KEYS and text[end + 2] == "{":
+            return _indented_spans(text, end + 2, member)
+        previous = (key, end + 2)
+    return None
+
+
+def _object_spans(text, pos, descend=False):
+    """Return ``({key: (start, end)}, end)`` for the JSON object at ``pos``.
+
+    Each value is run through the C decoder only to find where it ends and is
+    then dropped. With ``descend``, a container key such as ``tables`` is
+    indexed recursively instead, and its entries are returned.
+    """
+    if text[pos] != "{":
+        raise ValueError(f"Expected a JSON object at offset {pos}")
+    spans = {}
+    nested = None
+    pos = _skip_whitespace(text, pos + 1)
+    if text[pos] == "}":
+        return spans, pos + 1
+    while True:
+        if text[pos] != '"':
+            raise ValueError(f"Expected an object key at offset {pos}")
+        key, pos = json.decoder.scanstring(text, pos + 1)
+        pos = _skip_whitespace(text, pos)
+        if text[pos] != ":":
+            raise ValueError(f"Expected ':' at offset {pos}")
+        start = _skip_whitespace(text, pos + 1)
+        if descend and nested is None and key in _CONTAINER_KEYS and text[start] == "{":
+            nested, end = _object_spans(text, start)
+        else:
+            _, end = _DECODER.raw_decode(text, start)
+            if text[start] in "{[":
+                spans[key] = (start, end)
+        pos = _skip_whitespace(text, end)
+        if text[pos] == "}":
+            return (nested if nested is not None else spans), pos + 1
+        if text[pos] != ",":
+            raise ValueError(f"Expected ',' or '}}' at offset {pos}")
+        pos = _skip_whitespace(text, pos + 1)
+
+
+def _normalize_columns(info):
+    """Turn the generator's table entry into ``describe_table`` rows."""
+    columns = info.get("columns", info) if isinstance(info, dict) else info
+    rows = []
+    if isinstance(columns, dict):
+        columns = [
+            dict(value, name=name) if isinstance(value, dict) else {"name": name, "type": value}
+            for name, value in columns.items()
+        ]
+    for column in columns or []:
+        if not isinstance(column, dict):
+            continue
+        row = {
+            "name": column.get("name", column.get("column_name")),
+            "type": column.get("type", column.get("data_type")),
+            "nullable": column.get("nullable", column.get("is_nullable")),
+        }
+        description = column.get("description", column.get("comment"))
+        if description:
+            row["description"] = description
+        rows.append(row)
+    return rows
+
+
+def _table_name(table):
+    return table.get("name", table.get("table_name")) if isinstance(table, dict) else None
+
+
+def _decode_table_list(text):
+    """Decode a JSON list of tables; a list cannot be indexed by key, so it is decoded once."""
+    decoded = {}
+    for table in json.loads(text):
+        if _table_name(table):
+            decoded[_table_name(table)] = _normalize_columns(table)
+    return decoded
+
+
+class SchemaIndex:
+    """Lazily parsed, memory-mapped index of ``database_schema.json``.
+
+    Args:
+        path: Path to the schema resource.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.sidecar_path = self.path + ".idx"
+        self.version = None
+        # (buffer, spans, decoded, table names), swapped as one unit so a
+        # background reload never mixes offsets from two versions of the file.
+        self._state = (b"{}", {}, {}, [])
+        self._stat = None
+        self._refresh_task = None
+
+    @property
+    def loaded(self):
+        """Whether an index is available."""
+        return self._stat is not None
+
+    def _read_sidecar(self, stamp):
+        try:
+            with open(self.sidecar_path, "r", encoding="utf-8") as f:
+                sidecar = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if sidecar.get("stat") != list(stamp):
+            return None
+        return {name: tuple(span) for name, span in sidecar["spans"].items()}
+
+    def _write_sidecar(self, stamp, spans):
+        try:
+            with open(self.sidecar_path, "w", encoding="utf-8") as f:
+                json.dump({"stat": list(stamp), "spans": spans}, f)
+        except OSError as e:
+            logger.info("Could not write schema index sidecar: %s", e)
+
+    def load(self):
+        """Map the file and index table spans; replaces any previous index."""
+        with open(self.path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b"{}"
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        spans = self._read_sidecar(stamp)
+        decoded = {}
+
+        if spans is None:
+            raw = buf[:]
+            # json.dump escapes non-ASCII by default, so character offsets
+            # into the text are byte offsets into the mapped file.
+            ascii_only = raw.isascii()
+            text = raw.decode("utf-8")
+            del raw
+            start = _skip_whitespace(text, 0)
+            if text[start:start + 1] == "{":
+                spans = _indented_spans(text, start, descend=True)
+                if spans is None:
+                    spans, _ = _object_spans(text, start, descend=True)
+                container = next((key for key in _CONTAINER_KEYS if key in spans and text[spans[key][0]] == "["), None)
+                if container is not None:
+                    # {"tables": [...]} holds a list of tables like a top-level list
+                    container_start, container_end = spans[container]
+                    spans, decoded = {}, _decode_table_list(text[container_start:container_end])
+            elif text[start:start + 1] == "[":
+                spans = {}
+                decoded = _decode_table_list(text)
+            else:
+                raise ValueError("Schema file is not a JSON object or array")
+            if not ascii_only:
+                # Offsets do not line up with the bytes; keep the text instead.
+                buf = text
+            elif spans:
+                self._write_sidecar(stamp, spans)
+
+        self._state = (buf, spans, decoded, sorted(set(spans) | set(decoded)))
+        self._stat = stamp
+        self.version = hashlib.sha1(
+            f"{self.path}:{stat.st_mtime_ns}:{stat.st_size}".encode("utf-8")
+        ).hexdigest()[:12]
+        logger.info("Loaded schema index %s with %d tables", self.version, len(self._state[3]))
+
+    def ensure_loaded(self):
+        """Load the index if it has not been loaded; return whether it is available."""
+        if self._stat is None and os.path.exists(self.path):
+            try:
+                self.load()
+            except (OSError, ValueError) as e:
+                logger.warning("Could not load schema index from %s: %s", self.path, e)
+        return self.loaded
+
+    def list_tables(self):
+        """Return table names in alphabetical order."""
+        return list(self._state[3])
+
+    def describe_table(self, table_name):
+        """Return ``describe_table`` rows for ``table_name``, or None if unknown."""
+        buf, spans, decoded, _ = self._state
+        rows = decoded.get(table_name)
+        if rows is None and table_name in spans:
+            start, end = spans[table_name]
+            rows = _normalize_columns(json.loads(buf[start:end]))
+            decoded[table_name] = rows
+        return rows
+
+    def raw_table(self, table_name):
+        """Return the table's entry as stored in the schema file, or None."""
+        buf, spans, _, _ = self._state
+        if table_name not in spans:
+            return None
+        start, end = spans[table_name]
+        return json.loads(buf[start:end])
+
+    def changed_on_disk(self):
+        """Whether the file was modified since it was indexed."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return (stat.st_mtime_ns, stat.st_size) != self._stat
+
+    async def refresh_forever(self, interval=60.0):
+        """Reload the index in a worker thread whenever the file changes."""
+        while True:
+            await asyncio.sleep(interval)
+            if self.changed_on_disk():
+                try:
+                    await asyncio.to_thread(self.load)
+                except (OSError, ValueError) as e:
+                    logger.warning("Schema index refresh failed: %s", e)
+
+    def start_refresh(self, interval=60.0):
+        """Start background refreshing on the running event loop, once per loop."""
+        loop = asyncio.get_running_loop()
+        if self._refresh_task is None or self._refresh_task.done() or self._refresh_task.get_loop() is not loop:
+            self._refresh_task = loop.create_task(self.refresh_forever(interval))
@@ -0,0 +1,150 @@
+"""Inject the schema of the tables relevant to each question.
+
+Without schema context the agent starts most questions with ``list_tables``
+and one ``describe_table`` per table, and each of those is a model round
+trip. ``SchemaRetriever`` ranks the AACT tables against the latest user
+message with BM25 over table names, column names, descriptions and sample
+values from the schema resource. Before each model call it appends the
+definitions of the top-k tables to the system instruction, and points step 2
+of the instruction at them. Requests it adds no tables to, e.g. while the
+schema resource is missing, keep the exploratory step.
+"""
+
+import logging
+
+from .bm25 import BM25Index, tokenize
+from .config import SCHEMA_RETRIEVAL_STEP, SCHEMA_STEP
+
+logger = logging.getLogger(__name__)
+
+_SAMPLE_KEYS = ("sample_values", "samples", "examples", "values")
+_DESCRIPTION_KEYS = ("description", "comment")
+
+
+def _latest_user_text(contents):
+    for content in reversed(contents):
+        if content.role == "user":
+            text = " ".join(part.text for part in content.parts or () if part.text)
+            if text:
+                return text
+    return ""
+
+
+def _describe(raw, keys):
+    if isinstance(raw, dict):
+        for key in keys:
+            if raw.get(key):
+                return raw[key]
+    return None
+
+
+def _raw_columns(raw):
+    """Map column name to its raw entry for sample values and descriptions."""
+    columns = raw.get("columns", raw) if isinstance(raw, dict) else raw
+    if isinstance(columns, dict):
+        return {name: value for name, value in columns.items() if isinstance(value, dict)}
+    return {
+        column.get("name", column.get("column_name")): column
+        for column in columns or ()
+        if isinstance(column, dict)
+    }
+
+
+class SchemaRetriever:
+    """BM25 ranking of schema tables for a question.
+
+    Args:
+        schema_index: Zero-argument callable returning a loaded
+            ``SchemaIndex`` or None.
+        top_k: Number of tables injected per question.
+        always_include: Tables injected for every question (``studies`` is the
+            hub every AACT query joins through).
+        max_columns: Columns listed per table.
+    """
+
+    def __init__(self, schema_index, top_k=5, always_include=("studies",), max_columns=40):
+        self.schema_index = schema_index
+        self.top_k = top_k
+        self.always_include = tuple(always_include)
+        self.max_columns = max_columns
+        self._bm25 = BM25Index()
+        self._version = None
+        self.requests = 0
+        self.injected_tables = 0
+
+    def _document(self, index, table):
+        """Return the terms indexed for ``table``; its name is weighted three times."""
+        terms = tokenize(table) * 3
+        raw = index.raw_table(table)
+        description = _describe(raw, _DESCRIPTION_KEYS)
+        if description:
+            terms += tokenize(str(description))
+        raw_columns = _raw_columns(raw) if raw is not None else {}
+        for column in index.describe_table(table) or ():
+            terms += tokenize(str(column["name"]))
+            if column.get("description"):
+                terms += tokenize(str(column["description"]))
+            samples = _describe(raw_columns.get(column["name"]), _SAMPLE_KEYS)
+            if samples:
+                terms += tokenize(" ".join(map(str, samples if isinstance(samples, list) else [samples])))
+        return terms
+
+    def _ensure_index(self):
+        index = self.schema_index()
+        if index is None:
+            return None
+        if index.version != self._version:
+            self._bm25 = BM25Index()
+            for table in index.list_tables():
+                self._bm25.add(table, self._document(index, table))
+            self._version = index.version
+            logger.info("Built schema retrieval index over %d tables", len(self._bm25))
+        return index
+
+    def relevant_tables(self, question, k=None):
+        """Return the names of the tables most relevant to ``question``."""
+        index = self._ensure_index()
+        if index is None:
+            return []
+        k = self.top_k if k is None else k
+        tables = [table for table in self.always_include if table in self._bm25]
+        for table, _ in self._bm25.search(question, k=k + len(tables)):
+            if len(tables) >= k:
+                break
+            if table not in tables:
+                tables.append(table)
+        return tables[:k]
+
+    def render(self, tables):
+        """Render table definitions for the system instruction."""
+        index = self.schema_index()
+        lines = [
+            "Relevant tables for this question (schema ctgov; columns as name type). "
+            "Use them directly; call describe_table only for tables not listed here:"
+        ]
+        for table in tables:
+            columns = index.describe_table(table) or []
+            listed = ", ".join(f"{column['name']} {column['type']}" for column in columns[:self.max_columns])
+            if len(columns) > self.max_columns:
+                listed += f", ... ({len(columns) - self.max_columns} more)"
+            lines.append(f"- ctgov.{table}: {listed}")
+        return "\n".join(lines)
+
+    def before_model_callback(self, callback_context, llm_request):
+        """Agent callback that appends the relevant table definitions to the instruction."""
+        self.requests += 1
+        question = _latest_user_text(llm_request.contents)
+        if not question:
+            return None
+        try:
+            tables = self.relevant_tables(question)
+        except Exception as e:
+            logger.warning("Schema retrieval failed: %s", e)
+            return None
+        if tables:
+            self.injected_tables += len(tables)
+            instruction = llm_request.config.system_instruction
+            if isinstance(instruction, str):
+                llm_request.config.system_instruction = instruction.replace(SCHEMA_STEP, SCHEMA_RETRIEVAL_STEP)
+            llm_request.append_instructions([self.render(tables)])
+        return None
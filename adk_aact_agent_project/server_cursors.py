@@ -0,0 +1,200 @@
+"""Server-side cursors for paged ``read_query`` results.
+
+Fetching a whole result and truncating it to ``max_rows`` moves every row of
+a wide ``ctgov.outcomes`` or ``ctgov.facilities`` query over the wire and into
+memory. A streamed query instead opens a named (server-side) cursor, returns
+the first page with an opaque continuation token, and hands out further pages
+through ``fetch_more``. Only one page is ever held in memory.
+
+Each open cursor holds a pooled connection inside a transaction, so the number
+of open cursors is capped and idle ones are closed after a timeout.
+"""
+
+import asyncio
+import contextlib
+import logging
+import secrets
+import time
+
+from .result_format import ResultRows
+from .tracing import db_span
+
+logger = logging.getLogger(__name__)
+
+
+class CursorNotFound(Exception):
+    """Raised for unknown, exhausted or expired continuation tokens."""
+
+
+class _OpenCursor:
+    __slots__ = ("conn", "cursor", "pending", "last_used", "lock")
+
+    def __init__(self, conn, cursor, pending):
+        self.conn = conn
+        self.cursor = cursor
+        self.pending = pending
+        self.last_used = time.monotonic()
+        self.lock = asyncio.Lock()
+
+
+class CursorRegistry:
+    """Named server-side cursors keyed by continuation token.
+
+    Args:
+        pool: ``AsyncConnectionPool`` to borrow connections from.
+        idle_timeout: Seconds after which an unused cursor is closed.
+        max_cursors: Maximum number of cursors open at once.
+    """
+
+    def __init__(self, pool, idle_timeout=300.0, max_cursors=4):
+        self.pool = pool
+        self.idle_timeout = idle_timeout
+        self.max_cursors = max_cursors
+        self._cursors = {}
+        self._reaper = None
+        self.expired = 0
+
+    def __len__(self):
+        return len(self._cursors)
+
+    @staticmethod
+    def _declare(conn, query, params, n):
+        import psycopg2.extras
+        # Named cursors need a transaction; pooled connections run in autocommit.
+        conn.autocommit = False
+        cursor = conn.cursor(
+            name=f"aact_{secrets.token_hex(8)}",
+            cursor_factory=psycopg2.extras.RealDictCursor
+        )
+        try:
+            with db_span("db.execute", "postgresql", query):
+                cursor.execute(query, params)
+            # One row of look-ahead tells whether another page exists.
+            with db_span("db.fetch", "postgresql") as span:
+                rows = cursor.fetchmany(n + 1)
+                span.set_attribute("db.rows", len(rows))
+        except Exception:
+            cursor.close()
+            conn.rollback()
+            conn.autocommit = True
+            raise
+        return cursor, ResultRows((dict(row) for row in rows), [column[0] for column in cursor.description])
+
+    @staticmethod
+    def _fetch(cursor, n):
+        with db_span("db.fetch", "postgresql") as span:
+            rows = cursor.fetchmany(n)
+            span.set_attribute("db.rows", len(rows))
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def _finish(conn, cursor):
+        with contextlib.suppress(Exception):
+            cursor.close()
+        with contextlib.suppress(Exception):
+            conn.rollback()
+            conn.autocommit = True
+
+    async def open(self, query, page_size, params=None):
+        """Execute ``query`` on a server-side cursor and return its first page.
+
+        Returns:
+            ``(rows, token)`` where ``token`` is None if the result fits in one page.
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        await self.expire_idle()
+        if len(self._cursors) >= self.max_cursors:
+            raise RuntimeError(
+                f"Too many open result cursors ({self.max_cursors}); "
+                "page through or let earlier results expire first"
+            )
+        conn = await self.pool.acquire()
+        task = asyncio.ensure_future(asyncio.to_thread(self._declare, conn, query, params, page_size))
+        try:
+            cursor, rows = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # As in AsyncConnectionPool.run: stop the statement on the server
+            # and wait for the thread before the connection is dropped.
+            cancel = getattr(conn, "cancel", None)
+            if cancel is not None:
+                with contextlib.suppress(Exception):
+                    cancel()
+            with contextlib.suppress(BaseException):
+                await task
+            await self.pool.release(conn, discard=True)
+            raise
+        except BaseException:
+            await self.pool.release(conn, discard=getattr(conn, "closed", False))
+            raise
+        if len(rows) <= page_size:
+            await asyncio.to_thread(self._finish, conn, cursor)
+            await self.pool.release(conn)
+            return rows, None
+        token = secrets.token_urlsafe(16)
+        self._cursors[token] = _OpenCursor(conn, cursor, rows[page_size:])
+        self._ensure_reaper()
+        return rows[:page_size], token
+
+    async def fetch(self, token, n):
+        """Return the next ``n`` rows for ``token``.
+
+        Returns:
+            ``(rows, token)`` where ``token`` is None once the cursor is exhausted.
+        """
+        if n < 1:
+            raise ValueError("n must be at least 1")
+        entry = self._cursors.get(token)
+        if entry is None:
+            raise CursorNotFound("Unknown or expired continuation token")
+        async with entry.lock:
+            entry.last_used = time.monotonic()
+            try:
+                rows = entry.pending + await asyncio.to_thread(
+                    self._fetch, entry.cursor, n + 1 - len(entry.pending)
+                )
+            except Exception:
+                # The transaction is aborted; the cursor cannot be resumed.
+                await self.close(token)
+                raise
+            entry.pending = rows[n:]
+        if len(rows) <= n:
+            await self.close(token)
+            return rows, None
+        return rows[:n], token
+
+    async def close(self, token):
+        """Close the cursor for ``token`` and return its connection to the pool."""
+        entry = self._cursors.pop(token, None)
+        if entry is None:
+            return
+        await asyncio.to_thread(self._finish, entry.conn, entry.cursor)
+        await self.pool.release(entry.conn, discard=getattr(entry.conn, "closed", False))
+
+    async def expire_idle(self):
+        """Close cursors unused for longer than ``idle_timeout``."""
+        now = time.monotonic()
+        stale = [
+            token for token, entry in self._cursors.items()
+            if now - entry.last_used > self.idle_timeout and not entry.lock.locked()
+        ]
+        for token in stale:
+            self.expired += 1
+            await self.close(token)
+
+    def _ensure_reaper(self):
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.get_running_loop().create_task(self._reap_loop())
+
+    async def _reap_loop(self):
+        while self._cursors:
+            await asyncio.sleep(max(1.0, self.idle_timeout / 4))
+            try:
+                await self.expire_idle()
+            except Exception as e:
+                logger.warning("Cursor reaper error: %s", e)
+
+    async def close_all(self):
+        """Close every open cursor."""
+        for token in list(self._cursors):
+            await self.close(token)
@@ -0,0 +1,480 @@
+"""Durable session service with a write-behind event log.
+
+``InMemorySessionService`` loses every conversation on restart and keeps all
+of them in memory forever. ``EventLogSessionService`` stores sessions in a
+pluggable backend (SQLite by default) as an append-only log of events plus
+each session's current state:
+
+* Hot sessions live in a bounded LRU cache; a miss loads that one session
+  from the backend, so startup does not replay the whole store.
+* ``append_event`` updates the cached session and queues the write. A
+  background task commits queued writes in batches, one transaction per
+  batch, so a turn never waits on disk.
+* ``flush()`` and ``close()`` commit anything still queued;
+  ``SessionFlushPlugin`` calls ``flush()`` when each invocation ends.
+"""
+
+import asyncio
+import collections
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+
+from google.adk.events import Event
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import ListSessionsResponse
+from google.adk.sessions.state import State
+
+logger = logging.getLogger(__name__)
+
+
+def _split_state(state):
+    """Split a state mapping into ``(app, user, session)`` deltas; drops temp keys."""
+    app, user, session = {}, {}, {}
+    for key, value in (state or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            app[key.removeprefix(State.APP_PREFIX)] = value
+        elif key.startswith(State.USER_PREFIX):
+            user[key.removeprefix(State.USER_PREFIX)] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session[key] = value
+    return app, user, session
+
+
+def _dump_event(event):
+    return event.model_dump_json(exclude_none=True)
+
+
+class SessionBackend:
+    """Storage interface for ``EventLogSessionService``.
+
+    Methods are synchronous; the service calls them from worker threads.
+    ``write`` receives operations in the order they happened:
+
+    * ``("create", app, user, session_id, state_json, time)``
+    * ``("event", app, user, session_id, event_json, state_json, time)``
+    * ``("app_state", app, state_json)``
+    * ``("user_state", app, user, state_json)``
+    * ``("delete", app, user, session_id)``
+    """
+
+    def load_session(self, app_name, user_id, session_id):
+        """Return ``(state_json, [event_json, ...], update_time)`` or None."""
+        raise NotImplementedError
+
+    def load_app_state(self, app_name):
+        """Return the app state as a JSON string, or None."""
+        raise NotImplementedError
+
+    def load_user_state(self, app_name, user_id):
+        """Return the user state as a JSON string, or None."""
+        raise NotImplementedError
+
+    def list_sessions(self, app_name, user_id=None):
+        """Return ``[(user_id, session_id, state_json, update_time), ...]`` oldest first."""
+        raise NotImplementedError
+
+    def write(self, operations):
+        """Apply a batch of operations atomically."""
+        raise NotImplementedError
+
+    def count_sessions(self):
+        """Return the number of stored sessions."""
+        raise NotImplementedError
+
+    def close(self):
+        """Release the backend's resources."""
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """SQLite storage: one row per session and one row per event.
+
+    Args:
+        path: Database file; ``":memory:"`` keeps it in memory.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            app_name TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            session_id TEXT NOT NULL,
+            state TEXT NOT NULL,
+            create_time REAL NOT NULL,
+            update_time REAL NOT NULL,
+            PRIMARY KEY (app_name, user_id, session_id)
+        );
+        CREATE TABLE IF NOT EXISTS events (
+            app_name TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            session_id TEXT NOT NULL,
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            event TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS events_by_session ON events (app_name, user_id, session_id, seq);
+        CREATE TABLE IF NOT EXISTS app_states (
+            app_name TEXT PRIMARY KEY,
+            state TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS user_states (
+            app_name TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            state TEXT NOT NULL,
+            PRIMARY KEY (app_name, user_id)
+        );
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self._SCHEMA)
+
+    def load_session(self, app_name, user_id, session_id):
+        key = (app_name, user_id, session_id)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state, update_time FROM sessions "
+                "WHERE app_name = ? AND user_id = ? AND session_id = ?", key
+            ).fetchone()
+            if row is None:
+                return None
+            events = [
+                event for (event,) in self._conn.execute(
+                    "SELECT event FROM events "
+                    "WHERE app_name = ? AND user_id = ? AND session_id = ? ORDER BY seq", key
+                )
+            ]
+        return row[0], events, row[1]
+
+    def load_app_state(self, app_name):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM app_states WHERE app_name = ?", (app_name,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def load_user_state(self, app_name, user_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?",
+                (app_name, user_id)
+            ).fetchone()
+        return row[0] if row else None
+
+    def list_sessions(self, app_name, user_id=None):
+        query = "SELECT user_id, session_id, state, update_time FROM sessions WHERE app_name = ?"
+        params = [app_name]
+        if user_id is not None:
+            query += " AND user_id = ?"
+            params.append(user_id)
+        with self._lock:
+            return self._conn.execute(query + " ORDER BY update_time, user_id, session_id", params).fetchall()
+
+    def write(self, operations):
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN")
+            try:
+                for operation in operations:
+                    kind = operation[0]
+                    if kind == "create":
+                        _, app_name, user_id, session_id, state, created = operation
+                        cursor.execute(
+                            "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?)",
+                            (app_name, user_id, session_id, state, created, created)
+                        )
+                    elif kind == "event":
+                        _, app_name, user_id, session_id, event, state, updated = operation
+                        cursor.execute(
+                            "INSERT INTO events (app_name, user_id, session_id, event) VALUES (?, ?, ?, ?)",
+                            (app_name, user_id, session_id, event)
+                        )
+                        cursor.execute(
+                            "UPDATE sessions SET state = ?, update_time = ? "
+                            "WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                            (state, updated, app_name, user_id, session_id)
+                        )
+                    elif kind == "app_state":
+                        cursor.execute("INSERT OR REPLACE INTO app_states VALUES (?, ?)", operation[1:])
+                    elif kind == "user_state":
+                        cursor.execute("INSERT OR REPLACE INTO user_states VALUES (?, ?, ?)", operation[1:])
+                    elif kind == "delete":
+                        cursor.execute(
+                            "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                            operation[1:]
+                        )
+                        cursor.execute(
+                            "DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                            operation[1:]
+                        )
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+
+    def count_sessions(self):
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM sessions").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class EventLogSessionService(BaseSessionService):
+    """ADK session service over a ``SessionBackend`` with an LRU of hot sessions.
+
+    Args:
+        backend: Where sessions are stored.
+        cache_size: Maximum number of sessions kept in memory.
+        flush_interval: Seconds queued writes may wait before being committed.
+        max_batch: Commit as soon as this many writes are queued.
+    """
+
+    def __init__(self, backend, cache_size=1000, flush_interval=0.05, max_batch=256):
+        self.backend = backend
+        self.cache_size = cache_size
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._sessions = collections.OrderedDict()
+        self._app_state = {}
+        self._user_state = {}
+        self._pending = []
+        # Created on the running loop; a service may outlive one event loop.
+        self._lock = None
+        self._lock_loop = None
+        self._flusher = None
+        self._wakeup = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.batches = 0
+        self.writes = 0
+
+    # Cache and state helpers
+
+    def _remember(self, key, session):
+        self._sessions[key] = session
+        self._sessions.move_to_end(key)
+        while len(self._sessions) > self.cache_size:
+            self._sessions.popitem(last=False)
+
+    async def _scoped_state(self, app_name, user_id):
+        if app_name not in self._app_state:
+            raw = await asyncio.to_thread(self.backend.load_app_state, app_name)
+            self._app_state[app_name] = json.loads(raw) if raw else {}
+        if (app_name, user_id) not in self._user_state:
+            raw = await asyncio.to_thread(self.backend.load_user_state, app_name, user_id)
+            self._user_state[(app_name, user_id)] = json.loads(raw) if raw else {}
+        return self._app_state[app_name], self._user_state[(app_name, user_id)]
+
+    async def _merged_copy(self, session, events=None):
+        """Copy ``session`` with app and user state merged in, as ADK expects."""
+        app_state, user_state = await self._scoped_state(session.app_name, session.user_id)
+        state = dict(session.state)
+        state.update({State.APP_PREFIX + key: value for key, value in app_state.items()})
+        state.update({State.USER_PREFIX + key: value for key, value in user_state.items()})
+        return session.model_copy(update={
+            "state": state,
+            "events": list(session.events if events is None else events),
+        })
+
+    # Write-behind queue
+
+    def _flush_lock(self):
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _enqueue(self, operation):
+        self._pending.append(operation)
+        if (self._flusher is None or self._flusher.done()
+                or self._flusher.get_loop() is not asyncio.get_running_loop()):
+            self._wakeup = asyncio.Event()
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+        if len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+
+    async def _flush_loop(self):
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error("Session write-behind flush failed: %s", e)
+                await asyncio.sleep(self.flush_interval)
+
+    async def flush(self):
+        """Commit every queued write."""
+        async with self._flush_lock():
+            while self._pending:
+                batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+                try:
+                    await asyncio.to_thread(self.backend.write, batch)
+                except BaseException:
+                    # Keep the batch so the next flush retries it in order.
+                    self._pending[:0] = batch
+                    raise
+                self.batches += 1
+                self.writes += len(batch)
+
+    async def close(self):
+        """Commit queued writes and close the backend."""
+        await self.flush()
+        if self._flusher is not None and self._flusher.get_loop() is asyncio.get_running_loop():
+            self._flusher.cancel()
+        await asyncio.to_thread(self.backend.close)
+
+    # BaseSessionService
+
+    async def create_session(self, *, app_name, user_id, state=None, session_id=None):
+        session_id = session_id.strip() if session_id else str(uuid.uuid4())
+        app_delta, user_delta, session_state = _split_state(state)
+        app_state, user_state = await self._scoped_state(app_name, user_id)
+        if app_delta:
+            app_state.update(app_delta)
+            self._enqueue(("app_state", app_name, json.dumps(app_state, default=str)))
+        if user_delta:
+            user_state.update(user_delta)
+            self._enqueue(("user_state", app_name, user_id, json.dumps(user_state, default=str)))
+        now = time.time()
+        session = Session(
+            id=session_id, app_name=app_name, user_id=user_id,
+            state=session_state, events=[], last_update_time=now
+        )
+        self._remember((app_name, user_id, session_id), session)
+        self._enqueue((
+            "create", app_name, user_id, session_id, json.dumps(session_state, default=str), now
+        ))
+        return await self._merged_copy(session)
+
+    async def _load(self, app_name, user_id, session_id):
+        """Return the canonical cached session, loading it on a miss."""
+        key = (app_name, user_id, session_id)
+        session = self._sessions.get(key)
+        if session is not None:
+            self._sessions.move_to_end(key)
+            self.cache_hits += 1
+            return session
+        self.cache_misses += 1
+        # The session may have been evicted with writes still queued.
+        await self.flush()
+        stored = await asyncio.to_thread(self.backend.load_session, app_name, user_id, session_id)
+        if stored is None:
+            return None
+        state, events, update_time = stored
+        session = Session(
+            id=session_id, app_name=app_name, user_id=user_id,
+            state=json.loads(state),
+            events=[Event.model_validate_json(event) for event in events],
+            last_update_time=update_time
+        )
+        self._remember(key, session)
+        return session
+
+    async def get_session(self, *, app_name, user_id, session_id, config=None):
+        session = await self._load(app_name, user_id, session_id.strip())
+        if session is None:
+            return None
+        events = session.events
+        if config is not None:
+            if config.num_recent_events is not None:
+                events = events[-config.num_recent_events:] if config.num_recent_events else []
+            if config.after_timestamp is not None:
+                events = [event for event in events if event.timestamp >= config.after_timestamp]
+        return await self._merged_copy(session, events)
+
+    async def list_sessions(self, *, app_name, user_id=None):
+        await self.flush()
+        rows = await asyncio.to_thread(self.backend.list_sessions, app_name, user_id)
+        sessions = []
+        for row_user_id, session_id, state, update_time in rows:
+            session = Session(
+                id=session_id, app_name=app_name, user_id=row_user_id,
+                state=json.loads(state), events=[], last_update_time=update_time
+            )
+            sessions.append(await self._merged_copy(session))
+        return ListSessionsResponse(sessions=sessions)
+
+    async def delete_session(self, *, app_name, user_id, session_id):
+        self._sessions.pop((app_name, user_id, session_id), None)
+        self._enqueue(("delete", app_name, user_id, session_id))
+
+    async def get_user_state(self, *, app_name, user_id):
+        _, user_state = await self._scoped_state(app_name, user_id)
+        return dict(user_state)
+
+    async def append_event(self, session, event):
+        if event.partial:
+            return event
+        stored = await self._load(session.app_name, session.user_id, session.id)
+        if stored is None:
+            raise ValueError(f"Session {session.id} not found.")
+
+        await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+        if stored is not session:
+            stored.events.append(event)
+            stored.last_update_time = event.timestamp
+
+        if event.actions and event.actions.state_delta:
+            app_delta, user_delta, session_delta = _split_state(event.actions.state_delta)
+            app_state, user_state = await self._scoped_state(session.app_name, session.user_id)
+            if app_delta:
+                app_state.update(app_delta)
+                self._enqueue(("app_state", session.app_name, json.dumps(app_state, default=str)))
+            if user_delta:
+                user_state.update(user_delta)
+                self._enqueue((
+                    "user_state", session.app_name, session.user_id,
+                    json.dumps(user_state, default=str)
+                ))
+            stored.state.update(session_delta)
+
+        self._enqueue((
+            "event", session.app_name, session.user_id, session.id, _dump_event(event),
+            json.dumps(stored.state, default=str), event.timestamp
+        ))
+        return event
+
+    def stats(self):
+        """Return cache and write-behind counters."""
+        return {
+            "cached_sessions": len(self._sessions),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "pending_writes": len(self._pending),
+            "batches": self.batches,
+            "writes": self.writes,
+        }
+
+
+class SessionFlushPlugin(BasePlugin):
+    """Runner plugin that commits a service's queued session writes after each invocation.
+
+    Args:
+        service: The ``EventLogSessionService`` to flush.
+    """
+
+    def __init__(self, service, name="aact_session_flush"):
+        super().__init__(name=name)
+        self.service = service
+
+    async def after_run_callback(self, *, invocation_context):
+        try:
+            await self.service.flush()
+        except Exception as e:
+            # The write-behind task retries the queued writes.
+            logger.error("Session flush after invocation failed: %s", e)
+        return None
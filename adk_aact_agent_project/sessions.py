@@ -1,12 +1,27 @@
 """Session management for the AACT Query Agent."""
 
 from google.adk.sessions import InMemorySessionService
-from .config import APP_NAME
+from .config import (
+    APP_NAME, SESSION_BACKEND, SESSION_DB_PATH, SESSION_CACHE_SIZE, SESSION_FLUSH_INTERVAL
+)
+
+
+def _create_session_service():
+    """Create the session service selected by ``SESSION_BACKEND``."""
+    if SESSION_BACKEND == "memory":
+        return InMemorySessionService()
+    from .session_store import EventLogSessionService, SQLiteSessionBackend
+    return EventLogSessionService(
+        SQLiteSessionBackend(SESSION_DB_PATH),
+        cache_size=SESSION_CACHE_SIZE,
+        flush_interval=SESSION_FLUSH_INTERVAL
+    )
+
 
 # Session service instance
-session_service = InMemorySessionService()
+session_service = _create_session_service()
 
-def get_or_create_session(user_id, session_id=None):
+async def get_or_create_session(user_id, session_id=None):
     """Get an existing session or create a new one.
     
     Args:
@@ -19,14 +34,22 @@ def get_or_create_session(user_id, session_id=None):
     if session_id is None:
         session_id = f"session_{user_id}"
         
-    try:
-        session = session_service.get_session(APP_NAME, user_id, session_id)
-    except KeyError:
-        session_service.create_session(
+    session = await session_service.get_session(
+        app_name=APP_NAME, user_id=user_id, session_id=session_id
+    )
+    if session is None:
+        session = await session_service.create_session(
             app_name=APP_NAME,
             user_id=user_id,
             session_id=session_id,
             state={}
         )
         
-    return session_service.get_session(APP_NAME, user_id, session_id) 
\ No newline at end of file
+    return session
+
+
+async def close_session_service():
+    """Commit pending session writes; call on shutdown."""
+    close = getattr(session_service, "close", None)
+    if close is not None:
+        await close()
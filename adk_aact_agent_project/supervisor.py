@@ -0,0 +1,308 @@
+"""Crash recovery and circuit breaking for AACT MCP servers.
+
+``SupervisedClient`` keeps one multiplexed MCP server connection
+(``JsonRpcClient``) usable for the life of the runner:
+
+* it restarts the server with exponential backoff when the process exits,
+  and replays the initialize handshake and readiness check (``health``);
+* a tool call that gets no answer within ``call_timeout`` counts as a stall,
+  usually a hung database socket, and the server is restarted;
+* a ``CircuitBreaker`` opens after consecutive failures (stalls, lost
+  connections, failed restarts), so while AACT is down tool calls fail at
+  once with an error the model can report instead of each waiting out a
+  timeout. After ``reset_timeout`` one trial call is let through.
+
+It has the same ``start``, ``close``, ``call_tool``, ``size`` and ``stats``
+interface as ``MCPServerPool``, which uses the same breaker and stall
+timeout, so either can back the agent's tools (``MCP_CONNECTION``).
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+
+from .health import backoff_delays, wait_ready
+from .jsonrpc_client import JsonRpcClient, JsonRpcError
+from .tracing import inject_meta, tracer
+
+logger = logging.getLogger(__name__)
+
+# Breaker states as exported in metrics
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+def error_result(message):
+    """Return an MCP ``CallToolResult`` dict carrying an error."""
+    return {"content": [{"type": "text", "text": message}], "isError": True}
+
+
+class CircuitBreaker:
+    """Fail fast after repeated failures, probing again after a cool-down.
+
+    Args:
+        failure_threshold: Consecutive failures that open the circuit.
+        reset_timeout: Seconds the circuit stays open before one trial call
+            is allowed (half-open).
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.trips = 0
+        self._trial = False
+
+    def allow(self):
+        """Return whether a call may proceed now."""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = HALF_OPEN
+            self._trial = False
+        # Half-open: one trial call at a time decides the state
+        if self._trial:
+            return False
+        self._trial = True
+        return True
+
+    def retry_after(self):
+        """Seconds until an open circuit lets a trial call through."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def release(self):
+        """Give back the trial slot of a call that ended without an outcome.
+
+        A cancelled call says nothing about the server; the next call may
+        probe instead.
+        """
+        self._trial = False
+
+    def record_success(self):
+        if self.state != CLOSED:
+            logger.info("Circuit closed")
+        self.state = CLOSED
+        self.failures = 0
+        self._trial = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial = False
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+            if self.state == CLOSED:
+                self.trips += 1
+                logger.warning("Circuit opened after %d consecutive failures", self.failures)
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self):
+        """Return the state (0 closed, 1 half-open, 2 open), failures and trips."""
+        return {
+            "circuit_state": STATE_VALUES[self.state],
+            "consecutive_failures": self.failures,
+            "circuit_trips": self.trips,
+        }
+
+
+def short_circuit_message(breaker):
+    return (
+        "The AACT MCP server is unavailable after repeated failures; "
+        f"tool calls are paused for {breaker.retry_after():.0f}s. Tell the user the database is unavailable."
+    )
+
+
+class SupervisedClient:
+    """One MCP server connection, restarted on exit or stall.
+
+    Args:
+        command: Command used to launch the server (e.g. ``uvx``).
+        args: Arguments for the command.
+        cwd: Working directory for the server process.
+        env: Extra environment variables for the server process.
+        call_timeout: Seconds a tool call may take before the server counts
+            as stalled and is restarted.
+        ready_timeout: Seconds a (re)started server has to become ready.
+        ready_db_ping: Whether readiness includes a database ping.
+        max_in_flight: Requests outstanding at once on the connection.
+        breaker: ``CircuitBreaker``; a default one is created if omitted.
+        initial_backoff: First delay between failed restarts, in seconds.
+        max_backoff: Largest delay between failed restarts, in seconds.
+    """
+
+    def __init__(self, command, args, cwd=None, env=None, call_timeout=120.0, ready_timeout=60.0,
+                 ready_db_ping=True, max_in_flight=16, breaker=None, initial_backoff=0.5, max_backoff=30.0):
+        self.command = command
+        self.args = list(args)
+        self.cwd = cwd
+        self.env = env
+        self.call_timeout = call_timeout
+        self.ready_timeout = ready_timeout
+        self.ready_db_ping = ready_db_ping
+        self.max_in_flight = max_in_flight
+        self.breaker = breaker or CircuitBreaker()
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.client = None
+        self._ready = asyncio.Event()
+        self._restart = asyncio.Event()
+        self._task = None
+        self._closed = False
+        self.stats = {
+            "started": 0,
+            "start_failures": 0,
+            "restarts": 0,
+            "exits": 0,
+            "stalls": 0,
+            "short_circuited": 0,
+            "calls": 0,
+            "last_ready_seconds": 0.0,
+        }
+
+    @property
+    def size(self):
+        """1 while a ready server is running, else 0."""
+        return 1 if self._ready.is_set() else 0
+
+    async def start(self):
+        """Start supervising and wait until the first server is ready.
+
+        Returns without raising when the first start fails; the supervisor
+        keeps retrying with backoff, calls wait for a ready server, and once
+        the breaker opens they fail at once.
+        """
+        if self._task is None:
+            self._closed = False
+            self._task = asyncio.create_task(self._supervise())
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._ready.wait(), self.ready_timeout)
+
+    async def _supervise(self):
+        delays = backoff_delays(self.initial_backoff, self.max_backoff)
+        first = True
+        while not self._closed:
+            if not first:
+                self.stats["restarts"] += 1
+            first = False
+            started = time.monotonic()
+            client = None
+            try:
+                client = await JsonRpcClient.spawn(
+                    self.command, self.args, cwd=self.cwd, env=self.env, max_in_flight=self.max_in_flight
+                )
+                await wait_ready(client, deadline=self.ready_timeout, check_db=self.ready_db_ping)
+            except asyncio.CancelledError:
+                if client is not None:
+                    await client.close(timeout=1.0)
+                raise
+            except Exception as e:
+                self.stats["start_failures"] += 1
+                self.breaker.record_failure()
+                if client is not None:
+                    await client.close(timeout=1.0)
+                delay = next(delays)
+                logger.warning("MCP server failed to start (%s); retrying in %.1fs", e, delay)
+                await asyncio.sleep(delay)
+                continue
+
+            self.client = client
+            self.stats["started"] += 1
+            self.stats["last_ready_seconds"] = time.monotonic() - started
+            self.breaker.record_success()
+            delays = backoff_delays(self.initial_backoff, self.max_backoff)
+            self._restart.clear()
+            self._ready.set()
+
+            # Run until the process exits or a stall asks for a restart
+            exited = asyncio.create_task(client.process.wait())
+            restart = asyncio.create_task(self._restart.wait())
+            try:
+                await asyncio.wait({exited, restart}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                self._ready.clear()
+                restart.cancel()
+                if exited.done():
+                    self.stats["exits"] += 1
+                    logger.warning("MCP server exited with code %s; restarting", client.process.returncode)
+                exited.cancel()
+                self.client = None
+                # A wedged server may not exit on its own
+                if client.process.returncode is None:
+                    client.process.kill()
+                await client.close(timeout=1.0)
+
+    async def call_tool(self, name, arguments=None):
+        """Call a tool on the supervised server; return a ``CallToolResult`` dict.
+
+        Errors from supervision (open circuit, stall, lost server) are
+        returned as error results rather than raised.
+        """
+        if not self.breaker.allow():
+            self.stats["short_circuited"] += 1
+            return error_result(short_circuit_message(self.breaker))
+        try:
+            return await self._call_tool(name, arguments)
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+
+    async def _call_tool(self, name, arguments):
+        self.stats["calls"] += 1
+        client = await self._ready_client()
+        if client is None:
+            self.breaker.record_failure()
+            return error_result(f"The AACT MCP server did not become ready within {self.ready_timeout:g}s")
+        attributes = {"rpc.system": "jsonrpc", "rpc.method": "tools/call", "mcp.tool.name": name}
+        with tracer.start_as_current_span("mcp.call_tool", attributes=attributes):
+            try:
+                result = await client.call_tool(name, arguments, timeout=self.call_timeout, meta=inject_meta())
+            except TimeoutError:
+                self.stats["stalls"] += 1
+                self.breaker.record_failure()
+                logger.warning("MCP call %s stalled for %gs; restarting the server", name, self.call_timeout)
+                if self.client is client:
+                    self._ready.clear()
+                    self._restart.set()
+                return error_result(f"{name} got no answer within {self.call_timeout:g}s; the server was restarted")
+            except ConnectionError as e:
+                self.breaker.record_failure()
+                return error_result(f"The AACT MCP server connection was lost: {e}")
+            except JsonRpcError as e:
+                # The server is up and answered; the request itself was bad
+                self.breaker.record_success()
+                return error_result(str(e))
+        self.breaker.record_success()
+        return result
+
+    async def _ready_client(self):
+        """Return the running client once ready, or None after ``ready_timeout``."""
+        deadline = time.monotonic() + self.ready_timeout
+        while True:
+            try:
+                await asyncio.wait_for(self._ready.wait(), max(deadline - time.monotonic(), 0))
+            except asyncio.TimeoutError:
+                return None
+            client = self.client
+            if client is not None and client.alive:
+                return client
+            # The server just exited; wait for the supervisor to notice
+            await asyncio.sleep(0.01)
+
+    async def close(self):
+        """Stop supervising and shut the server down."""
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        self._ready.clear()
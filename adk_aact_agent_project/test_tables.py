@@ -2,7 +2,6 @@
 
 import os
 import sys
-import subprocess
 import asyncio
 from dotenv import load_dotenv
 
@@ -11,6 +10,11 @@ load_dotenv()
 
 # Import configuration
 from config import MCP_COMMAND, MCP_ARGS, MCP_SERVER_CWD, MCP_ENV
+from health import NotReadyError, wait_ready
+from jsonrpc_client import JsonRpcClient
+
+# Seconds to wait for the server to answer the handshake and a database ping
+READY_TIMEOUT = 60.0
 
 async def test_mcp_connection():
     """Test if we can connect to the MCP server and list tables."""
@@ -20,51 +24,45 @@ async def test_mcp_connection():
     
     # Start the MCP server as a subprocess
     try:
-        # Set up environment variables
-        env = os.environ.copy()
-        env.update(MCP_ENV)
-        
         # Start MCP server
-        process = subprocess.Popen(
-            [MCP_COMMAND] + MCP_ARGS,
+        client = await JsonRpcClient.spawn(
+            MCP_COMMAND, MCP_ARGS,
             cwd=MCP_SERVER_CWD,
-            env=env,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
+            env=MCP_ENV
         )
-        
+    except Exception as e:
+        print(f"Error during test: {e}")
+        return False
+    
+    try:
         print("MCP server started. Waiting for it to initialize...")
-        # Wait a moment for the server to start
-        await asyncio.sleep(2)
-        
-        # Check if the process is still running
-        if process.poll() is not None:
-            stdout, stderr = process.communicate()
-            print("Error: MCP server failed to start")
-            print(f"STDOUT: {stdout}")
-            print(f"STDERR: {stderr}")
+        # Wait for the handshake and a database ping instead of a fixed sleep
+        try:
+            report = await wait_ready(client, deadline=READY_TIMEOUT)
+        except NotReadyError as e:
+            print(f"Error: MCP server not ready after {e.report['seconds']:.2f}s: {e}")
+            print("STDERR: " + "\n".join(client.stderr_lines))
             return False
+        print(f"MCP server ready in {report['seconds']:.2f}s. Attempting to communicate...")
         
-        print("MCP server is running. Attempting to communicate...")
-        
-        # TODO: Here we would interact with the MCP server
-        # Since direct interaction requires the MCP plugin, which itself uses the ADK,
-        # we'll just verify that the server starts correctly for now
-        
-        # Terminate the process
-        process.terminate()
-        await asyncio.sleep(1)
-        
+        result = await client.call_tool("list_tables", {})
+        text = "\n".join(item.get("text", "") for item in result.get("content", []) if item.get("type") == "text")
+        if result.get("isError"):
+            print(f"Error: list_tables failed: {text}")
+            return False
+        print(f"Tables: {text[:500]}")
         return True
         
     except Exception as e:
         print(f"Error during test: {e}")
         return False
+    finally:
+        # Terminate the process
+        await client.close(timeout=1.0)
 
 if __name__ == "__main__":
     result = asyncio.run(test_mcp_connection())
     if result:
         print("MCP server test completed successfully.")
     else:
-        print("MCP server test failed.") 
\ No newline at end of file
+        print("MCP server test failed.") 
@@ -0,0 +1,253 @@
+"""Tracing of agent turns across the model, the MCP transport and the database.
+
+ADK records OpenTelemetry spans for every turn (``invocation``), model call
+(``call_llm``) and tool call (``execute_tool <name>``). This module adds the
+spans below the tool calls:
+
+* ``mcp.call_tool`` around the stdio JSON-RPC round trip to an AACT_MCP
+  server, which carries the trace context to the server as a W3C
+  ``traceparent`` in the request's ``_meta`` (``extract_context`` is the
+  server-side counterpart);
+* ``db.query`` around a database call, including the wait for a pooled
+  connection, with ``db.execute`` and ``db.fetch`` children for the
+  statement and the row transfer.
+
+``setup_tracing`` installs a tracer provider that writes finished spans to a
+JSON-lines file or the console, so traces can be collected offline, or to an
+OTLP collector when ``opentelemetry-exporter-otlp`` is installed. Without it
+the spans are no-ops.
+
+Summarize a trace file, per turn, into model, tool, MCP and database time
+(from the repository root):
+    python -m adk_aact_agent_project.tracing traces.jsonl
+"""
+
+import argparse
+import collections
+import json
+import logging
+import threading
+
+from opentelemetry import propagate, trace
+
+logger = logging.getLogger(__name__)
+
+tracer = trace.get_tracer("adk_aact_agent_project")
+
+# Statements are truncated in span attributes.
+MAX_STATEMENT_CHARS = 2000
+
+_provider = None
+
+
+class JsonLinesSpanExporter:
+    """Span exporter that appends one JSON object per finished span to a file.
+
+    Args:
+        path: File to append to.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def to_dict(span):
+        """Return the exported form of a finished span."""
+        context = span.get_span_context()
+        return {
+            "trace_id": format(context.trace_id, "032x"),
+            "span_id": format(context.span_id, "016x"),
+            "parent_id": format(span.parent.span_id, "016x") if span.parent else None,
+            "name": span.name,
+            "start_ns": span.start_time,
+            "end_ns": span.end_time,
+            "duration_ms": (span.end_time - span.start_time) / 1e6,
+            "status": span.status.status_code.name,
+            "attributes": dict(span.attributes or {}),
+        }
+
+    def export(self, spans):
+        from opentelemetry.sdk.trace.export import SpanExportResult
+
+        lines = "".join(json.dumps(self.to_dict(span), default=str) + "\n" for span in spans)
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError as e:
+            logger.warning("Could not write spans to %s: %s", self.path, e)
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        pass
+
+    def force_flush(self, timeout_millis=30000):
+        return True
+
+
+def _exporter(kind, path):
+    if kind == "file":
+        return JsonLinesSpanExporter(path)
+    if kind == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+        return ConsoleSpanExporter()
+    if kind == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError as e:
+            raise ImportError(
+                "The otlp trace exporter requires opentelemetry-exporter-otlp. "
+                "Install it with: pip install opentelemetry-exporter-otlp"
+            ) from e
+        return OTLPSpanExporter()
+    raise ValueError(f"Unknown trace exporter {kind!r}; expected file, console or otlp")
+
+
+def setup_tracing(exporter="file", path="traces.jsonl"):
+    """Install a tracer provider exporting spans; return it.
+
+    Called once per process; later calls return the installed provider.
+
+    Args:
+        exporter: ``file`` (JSON lines at ``path``), ``console`` or ``otlp``
+            (configured by the standard ``OTEL_EXPORTER_OTLP_*`` variables).
+        path: Trace file for the ``file`` exporter.
+    """
+    global _provider
+    if _provider is not None:
+        return _provider
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    provider = TracerProvider(resource=Resource.create({"service.name": "aact-query-agent"}))
+    provider.add_span_processor(BatchSpanProcessor(_exporter(exporter, path)))
+    trace.set_tracer_provider(provider)
+    _provider = provider
+    logger.info("Tracing enabled (%s exporter)", exporter)
+    return provider
+
+
+def shutdown_tracing():
+    """Flush and stop the installed tracer provider."""
+    if _provider is not None:
+        _provider.shutdown()
+
+
+def inject_meta(meta=None):
+    """Return ``meta`` with the current trace context added, for an MCP request's ``_meta``."""
+    meta = dict(meta or {})
+    propagate.inject(meta)
+    return meta
+
+
+def extract_context(meta):
+    """Return the trace context carried in an MCP request's ``_meta``.
+
+    For use by a server that wants its spans in the client's trace:
+    ``tracer.start_as_current_span(name, context=extract_context(meta))``.
+    """
+    return propagate.extract(meta or {})
+
+
+def db_span(name, system, statement=None):
+    """Start a database span as the current span.
+
+    Args:
+        name: ``db.query``, ``db.execute`` or ``db.fetch``.
+        system: Database engine (``postgresql`` or ``duckdb``).
+        statement: Optional SQL, truncated to ``MAX_STATEMENT_CHARS``.
+    """
+    attributes = {"db.system": system}
+    if statement:
+        attributes["db.statement"] = statement[:MAX_STATEMENT_CHARS]
+    return tracer.start_as_current_span(name, attributes=attributes)
+
+
+def _category(name):
+    if name == "call_llm":
+        return "model"
+    if name.startswith("execute_tool"):
+        return "tools"
+    if name.startswith("mcp."):
+        return "mcp"
+    if name.startswith("db."):
+        return "db"
+    return None
+
+
+def _overlap(intervals, others):
+    return sum(
+        max(0, min(end, other_end) - max(start, other_start))
+        for start, end in intervals
+        for other_start, other_end in others
+    )
+
+
+def summarize(spans):
+    """Break each traced turn down into model, tool, MCP and database time.
+
+    Only the outermost span of each category counts, so nested spans (a
+    ``db.execute`` inside a ``db.query``) are not counted twice. ADK keeps a
+    ``call_llm`` span open while the tools it requested run, so tool time is
+    subtracted from model time.
+
+    Returns:
+        A list of dicts, one per turn, with ``trace_id``, ``total_ms`` and
+        milliseconds per category; ``other`` is turn time outside model and
+        tool calls.
+    """
+    by_id = {span["span_id"]: span for span in spans}
+    intervals = collections.defaultdict(lambda: collections.defaultdict(list))
+    totals = {}
+    for span in spans:
+        if span["name"] == "invocation":
+            totals[span["trace_id"]] = span["duration_ms"]
+        category = _category(span["name"])
+        if category is None:
+            continue
+        parent = by_id.get(span["parent_id"])
+        while parent is not None and _category(parent["name"]) != category:
+            parent = by_id.get(parent["parent_id"])
+        if parent is None:
+            intervals[span["trace_id"]][category].append((span["start_ns"], span["end_ns"]))
+    summary = []
+    for trace_id, total in totals.items():
+        turn = intervals[trace_id]
+        ms = {category: sum(end - start for start, end in turn[category]) / 1e6 for category in ("model", "tools", "mcp", "db")}
+        ms["model"] -= _overlap(turn["model"], turn["tools"]) / 1e6
+        summary.append({
+            "trace_id": trace_id,
+            "total_ms": total,
+            **ms,
+            "other": max(0.0, total - ms["model"] - ms["tools"]),
+            "model_calls": len(turn["model"]),
+            "tool_calls": len(turn["tools"]),
+        })
+    return summary
+
+
+def load_spans(path):
+    """Read spans written by ``JsonLinesSpanExporter``."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a trace file into time per component for each turn.")
+    parser.add_argument("trace_file", nargs="?", default="traces.jsonl")
+    parser.add_argument("--last", type=int, default=20, help="Turns listed individually")
+    args = parser.parse_args()
+
+    turns = summarize(load_spans(args.trace_file))
+    columns = ("total_ms", "model", "tools", "mcp", "db", "other")
+    print(f"{'trace':<34}" + "".join(f"{column:>10}" for column in columns) + f"{'llm':>5}{'tool':>6}")
+    for turn in turns[-args.last:]:
+        print(f"{turn['trace_id']:<34}" + "".join(f"{turn[column]:>10.1f}" for column in columns)
+              + f"{turn['model_calls']:>5}{turn['tool_calls']:>6}")
+    if turns:
+        total = sum(turn["total_ms"] for turn in turns) or 1.0
+        print(f"\n{len(turns)} turns; share of turn time: " + ", ".join(
+            f"{column} {sum(turn[column] for turn in turns) / total:.0%}" for column in ("model", "tools", "mcp", "db", "other")
+        ))
@@ -4,18 +4,27 @@ This module provides the necessary configuration for running the agent
 with the 'adk web' command.
 """
 
-from aact_query_agent import root_agent
-from config import APP_NAME
-from plugins import aact_mcp_plugin
-from sessions import session_service
-
-# These objects are automatically discovered when running 'adk web'
-# No explicit functions needed - ADK Web framework handles everything
+# ADK Web loads the App from agent.py, which also starts the metrics server
+from .agent import app, metrics_server, root_agent, runner_plugins, session_service
+from .config import APP_NAME
 
 # Export required objects
 __all__ = [
+    'app',             # App with the root agent and runner plugins, loaded by 'adk web'
     'root_agent',      # Agent definition  
     'APP_NAME',        # Application name
     'aact_mcp_plugin', # Plugin instance
+    'mcp_server_pool', # Warm MCP server pool
+    'runner_plugins',  # Context compaction and other runner plugins
+    'metrics_server',  # /metrics endpoint (None unless AACT_METRICS_PORT is set)
     'session_service'  # Session service
-] 
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    # The MCP plugin and server pool are only created when something asks
+    # for them; the in-process transport never does.
+    if name in ("aact_mcp_plugin", "mcp_server_pool"):
+        from . import plugins
+        return getattr(plugins, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
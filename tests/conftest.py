@@ -0,0 +1,8 @@
+"""Make the repository packages importable when running ``pytest`` from the root."""
+
+import sys
+from pathlib import Path
+
+REPO_DIR = Path(__file__).parent.parent
+if str(REPO_DIR) not in sys.path:
+    sys.path.insert(0, str(REPO_DIR))
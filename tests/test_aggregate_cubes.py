@@ -0,0 +1,82 @@
+"""Tests for the aggregate cubes behind query_aggregates."""
+
+import asyncio
+
+import pytest
+
+from adk_aact_agent_project import aact_tools
+from adk_aact_agent_project.aggregate_cubes import AggregateCubes, answerable, build_cubes, fallback_sql
+from adk_aact_agent_project.duckdb_mirror import DuckDBDatabase
+from adk_aact_agent_project.loadgen import build_stand_in
+
+REQUESTS = [
+    ([], {}),
+    (["phase"], {}),
+    (["phase", "overall_status"], {}),
+    (["condition"], {"phase": ["PHASE3"]}),
+    (["start_year"], {"condition": ["diabetes"], "overall_status": ["COMPLETED"]}),
+    (["country"], {"overall_status": ["RECRUITING", "COMPLETED"]}),
+    ([], {"condition": ["asthma"], "country": ["France"], "start_year": (2015, None)}),
+    (["country", "condition"], {"phase": ["PHASE2"], "start_year": (2010, 2020)}),
+]
+
+
+@pytest.fixture(scope="module")
+def mirror(tmp_path_factory):
+    path = build_stand_in(str(tmp_path_factory.mktemp("aact")), studies=2000)
+    build_cubes(path)
+    return path
+
+
+def key(rows):
+    return sorted(tuple(str(value) for value in row.values()) for row in rows)
+
+
+@pytest.mark.parametrize("group_by, filters", REQUESTS)
+def test_cube_answers_match_fallback_sql(mirror, group_by, filters):
+    assert answerable(group_by, filters)
+    rows, total = AggregateCubes(mirror).lookup(group_by, filters, limit=10000)
+    database = DuckDBDatabase(mirror)
+    live = asyncio.run(database.execute_query(fallback_sql(group_by, filters)))
+    asyncio.run(database.close())
+    assert key(rows) == key(live)
+    assert total == len(live)
+
+
+@pytest.fixture
+def postgres_tools(mirror, monkeypatch):
+    """aact_tools on Postgres with the stand-in's cubes; read_query records its calls."""
+    calls = []
+
+    async def read_query(query, max_rows=25):
+        calls.append(query)
+        return {"data": []}
+
+    def start_probe():
+        pass
+
+    monkeypatch.setattr(aact_tools, "DB_ENGINE", "postgres")
+    monkeypatch.setattr(aact_tools, "aggregate_cubes", AggregateCubes(mirror))
+    monkeypatch.setattr(aact_tools, "read_query", read_query)
+    monkeypatch.setattr(aact_tools, "_start_snapshot_probe", start_probe)
+    monkeypatch.setattr(aact_tools.query_cache, "snapshot", None)
+    return calls
+
+
+def test_postgres_uses_cubes_of_the_live_snapshot(postgres_tools):
+    aact_tools.query_cache.snapshot = aact_tools.aggregate_cubes.snapshot
+    result = asyncio.run(aact_tools.query_aggregates(group_by=["phase"]))
+    assert result["source"] == "aggregates" and not postgres_tools
+
+
+@pytest.mark.parametrize("live_snapshot", [None, "1999-01-01"])
+def test_postgres_falls_back_without_a_matching_snapshot(postgres_tools, live_snapshot):
+    aact_tools.query_cache.snapshot = live_snapshot
+    result = asyncio.run(aact_tools.query_aggregates(group_by=["phase"]))
+    assert result["source"] == "read_query"
+    assert len(postgres_tools) == 1
+
+
+def test_max_rows_below_one_is_rejected():
+    result = asyncio.run(aact_tools.query_aggregates(group_by=["phase"], max_rows=0))
+    assert result == {"error": "max_rows must be at least 1"}
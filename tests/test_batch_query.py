@@ -0,0 +1,110 @@
+"""Tests for batch_read_query: the deadline, partial failures and pooled servers."""
+
+import asyncio
+
+import pytest
+
+from adk_aact_agent_project.batch_query import run_batch
+from adk_aact_agent_project.mcp_pool import MCPServerPool, pool_tools
+
+
+async def run_query(query):
+    if query == "slow":
+        await asyncio.sleep(60)
+    if query == "broken":
+        raise RuntimeError("relation does not exist")
+    if query == "cancelled":
+        raise asyncio.CancelledError()
+    return {"data": [{"query": query}]}
+
+
+def test_deadline_reports_unfinished_queries_and_keeps_the_rest():
+    started = {}
+
+    async def tracked(query):
+        started[query] = asyncio.current_task()
+        return await run_query(query)
+
+    async def main():
+        result = await run_batch(tracked, {"fast": "fast", "slow": "slow"}, timeout=0.05)
+        return result, started["slow"]
+
+    result, slow = asyncio.run(main())
+    assert result["results"]["fast"] == {"data": [{"query": "fast"}]}
+    assert "0.05s batch deadline" in result["results"]["slow"]["error"]
+    assert slow.cancelled()
+
+
+def test_failed_and_cancelled_queries_do_not_fail_the_batch():
+    queries = {"ok": "ok", "broken": "broken", "cancelled": "cancelled"}
+    result = asyncio.run(run_batch(run_query, queries, timeout=1))
+    assert result["results"]["ok"] == {"data": [{"query": "ok"}]}
+    assert result["results"]["broken"] == {"error": "relation does not exist"}
+    assert result["results"]["cancelled"] == {"error": "Query was cancelled"}
+
+
+def test_invalid_batches_are_rejected():
+    assert "non-empty" in asyncio.run(run_batch(run_query, {}))["error"]
+    assert "At most 2" in asyncio.run(run_batch(run_query, {"a": "1", "b": "2", "c": "3"}, max_queries=2))["error"]
+
+
+class SlowServer:
+    """Stands in for a pooled MCP server; ``slow`` queries never answer."""
+
+    alive = True
+    requests_served = 0
+    last_checked = float("inf")
+    closed = False
+
+    async def call_tool(self, name, arguments=None):
+        self.requests_served += 1
+        if arguments["query"] == "slow":
+            await asyncio.sleep(60)
+        return {"content": [{"type": "text", "text": arguments["query"]}]}
+
+    async def close(self):
+        self.closed = True
+
+
+def test_batch_deadline_returns_pooled_servers_intact():
+    pool = MCPServerPool("uvx", [], min_size=0, max_size=2, call_timeout=60.0)
+    servers = []
+
+    async def spawn():
+        await asyncio.sleep(0.01)
+        servers.append(SlowServer())
+        return servers[-1]
+
+    pool._spawn = spawn
+    batch_read_query = next(tool for tool in pool_tools(pool, batch_timeout=0.1) if tool.__name__ == "batch_read_query")
+
+    async def main():
+        # Three queries on two servers: "waiting" is still in checkout at the deadline
+        result = await batch_read_query({"slow": "slow", "other": "slow", "waiting": "fast"})
+        await asyncio.sleep(0.05)
+        return result
+
+    result = asyncio.run(main())
+    assert all("deadline" in result["results"][name]["error"] for name in ("slow", "other", "waiting"))
+    assert len(servers) == 2 and not any(server.closed for server in servers)
+    assert pool.size == 2 and len(pool._idle) == 2
+
+
+def test_cancelled_acquire_keeps_the_server_it_was_starting():
+    pool = MCPServerPool("uvx", [], min_size=0, max_size=1)
+    server = SlowServer()
+
+    async def spawn():
+        await asyncio.sleep(0.05)
+        return server
+
+    pool._spawn = spawn
+
+    async def main():
+        await pool.start()
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(pool.acquire(), 0.01)
+        await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+    assert not server.closed and pool._idle == [server] and pool.size == 1
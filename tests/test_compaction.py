@@ -0,0 +1,66 @@
+"""Tests for digests and recall of compacted tool results."""
+
+import asyncio
+
+from google.genai import types
+
+from adk_aact_agent_project.compaction import ContextCompactor, ResultStore, recall_tool
+from adk_aact_agent_project.result_format import encode_compact
+
+
+def compact_payload(n=40):
+    rows = [{"nct_id": f"NCT{i:08d}", "phase": ["PHASE1", "PHASE2", "PHASE3"][i % 3]} for i in range(n)]
+    payload = {"data": encode_compact(rows)}
+    assert "phase" in payload["data"]["dictionaries"]
+    return payload
+
+
+def turn(i, payload):
+    return [
+        types.Content(role="user", parts=[types.Part(text=f"question {i}")]),
+        types.Content(role="user", parts=[types.Part(function_response=types.FunctionResponse(
+            id=f"call_{i}", name="read_query", response=payload
+        ))]),
+    ]
+
+
+def test_digest_resolves_dictionary_codes():
+    digest = ContextCompactor(ResultStore()).digest("read_query", compact_payload())
+    assert digest["columns"] == ["nct_id", "phase"]
+    assert digest["types"] == ["str", "str"]
+    assert digest["sample"] == [["NCT00000000", "PHASE1"], ["NCT00000001", "PHASE2"]]
+
+
+def test_recall_pages_decoded_rows():
+    store = ResultStore()
+    payload = compact_payload()
+    handle = store.put(payload)
+    result = asyncio.run(recall_tool(store)(handle, offset=3, n=2))
+    assert result["rows"] == [["NCT00000003", "PHASE1"], ["NCT00000004", "PHASE2"]]
+    assert result["types"] == ["str", "str"]
+    assert result["total_rows"] == 40
+
+
+def test_plain_rows_have_no_types():
+    store = ResultStore()
+    handle = store.put({"data": [{"n": 1}, {"n": 2}]})
+    result = asyncio.run(recall_tool(store)(handle, n=1))
+    assert result == {"columns": ["n"], "rows": [{"n": 1}], "total_rows": 2, "offset": 0}
+
+
+def test_recall_rejects_negative_offsets_and_empty_pages():
+    store = ResultStore()
+    recall_result = recall_tool(store)
+    handle = store.put(compact_payload())
+    assert asyncio.run(recall_result(handle, n=0)) == {"error": "n must be at least 1"}
+    assert asyncio.run(recall_result(handle, offset=-2)) == {"error": "offset must be at least 0"}
+
+
+def test_digested_results_counts_each_result_once():
+    compactor = ContextCompactor(ResultStore(), max_payload_bytes=100, keep_recent_turns=1)
+    history = []
+    for i in range(5):
+        history += turn(i, compact_payload())
+        compactor.compact(history)
+    # Every turn but the last is digested, each exactly once.
+    assert compactor.stats()["digested_results"] == 4
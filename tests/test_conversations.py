@@ -0,0 +1,55 @@
+"""Tests for serving conversation requests from lines."""
+
+import asyncio
+import json
+
+from adk_aact_agent_project.conversations import ConversationManager
+
+
+class EchoManager(ConversationManager):
+    """Answers every question with the user's name once released."""
+
+    def __init__(self, **kwargs):
+        super().__init__(runner=None, **kwargs)
+        self.release = asyncio.Event()
+        self.running = 0
+
+    async def ask(self, user_id, text, session_id=None):
+        self.running += 1
+        await self.release.wait()
+        return f"{user_id}: {text}"
+
+
+def test_null_user_gets_the_default_user():
+    manager = ConversationManager(runner=None)
+    assert manager._parse('{"user": null, "text": "hi"}', "conn_1")["user"] == "conn_1"
+    assert manager._parse('{"text": "hi"}', "conn_1")["user"] == "conn_1"
+    assert manager._parse('{"user": "alice", "text": "hi"}', "conn_1")["user"] == "alice"
+
+
+def test_serve_lines_stops_reading_while_requests_are_pending():
+    async def main():
+        manager = EchoManager(max_concurrent=2)
+        lines = [json.dumps({"id": i, "text": f"q{i}"}) + "\n" for i in range(6)] + ["\n", ""]
+        read = 0
+        replies = []
+
+        async def read_line():
+            nonlocal read
+            read += 1
+            return lines[read - 1]
+
+        async def write(line):
+            replies.append(json.loads(line))
+
+        serving = asyncio.create_task(manager.serve_lines(read_line, write, "conn_1"))
+        for _ in range(20):
+            await asyncio.sleep(0)
+        # Two requests pending; the third line is not read yet
+        assert read == 2 and manager.running == 2
+        manager.release.set()
+        await serving
+        assert sorted(reply["id"] for reply in replies) == list(range(6))
+        assert replies[0]["text"].startswith("conn_1: ")
+
+    asyncio.run(main())
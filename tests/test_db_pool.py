@@ -0,0 +1,202 @@
+"""Tests for the async connection pool, with SQLite standing in for Postgres."""
+
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from adk_aact_agent_project.db_pool import AsyncConnectionPool, PoolTimeout
+
+
+class StandInConnection:
+    """DB-API connection backed by in-memory SQLite; ``fail_ping`` breaks health checks."""
+
+    def __init__(self):
+        self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.closed = False
+        self.fail_ping = False
+
+    def cursor(self):
+        if self.fail_ping:
+            raise sqlite3.OperationalError("server closed the connection unexpectedly")
+        return self._conn.cursor()
+
+    def close(self):
+        self.closed = True
+        self._conn.close()
+
+
+def make_pool(**kwargs):
+    connections = []
+
+    def connect():
+        conn = StandInConnection()
+        connections.append(conn)
+        return conn
+
+    return AsyncConnectionPool(connect, **kwargs), connections
+
+
+def select_one(conn):
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT 1")
+        return cur.fetchone()[0]
+    finally:
+        cur.close()
+
+
+def test_open_creates_min_size_connections():
+    async def main():
+        pool, connections = make_pool(min_size=2, max_size=4)
+        await pool.open()
+        assert pool.size == 2 and len(connections) == 2
+        await pool.close()
+
+    asyncio.run(main())
+
+
+def test_checkout_reuses_released_connection():
+    async def main():
+        pool, connections = make_pool(min_size=0, max_size=2)
+        first = await pool.acquire()
+        assert pool.in_use == 1
+        await pool.release(first)
+        second = await pool.acquire()
+        assert second is first and len(connections) == 1
+        await pool.release(second)
+        await pool.close()
+
+    asyncio.run(main())
+
+
+def test_run_executes_in_worker_thread():
+    async def main():
+        pool, _ = make_pool(min_size=1, max_size=2)
+        threads = []
+
+        def query(conn):
+            threads.append(threading.get_ident())
+            return select_one(conn)
+
+        assert await pool.run(query) == 1
+        assert threads[0] != threading.get_ident()
+        assert pool.stats["queries"] == 1 and pool.in_use == 0
+        await pool.close()
+
+    asyncio.run(main())
+
+
+def test_concurrent_checkouts_bounded_by_max_size():
+    async def main():
+        pool, connections = make_pool(min_size=0, max_size=3)
+        peak = 0
+
+        async def use():
+            nonlocal peak
+            async with pool.connection():
+                peak = max(peak, pool.in_use)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(use() for _ in range(10)))
+        assert peak == 3 and len(connections) == 3 and pool.size == 3
+        await pool.close()
+
+    asyncio.run(main())
+
+
+def test_acquire_times_out_when_exhausted():
+    async def main():
+        pool, _ = make_pool(min_size=1, max_size=1, acquire_timeout=0.05)
+        held = await pool.acquire()
+        with pytest.raises(PoolTimeout):
+            await pool.acquire()
+        assert pool.stats["acquire_timeouts"] == 1
+        await pool.release(held)
+        # The slot is usable again once released
+        await pool.release(await pool.acquire())
+        await pool.close()
+
+    asyncio.run(main())
+
+
+def test_failed_health_check_replaces_connection():
+    async def main():
+        pool, connections = make_pool(min_size=1, max_size=1, health_check_interval=0)
+        conn = await pool.acquire()
+        await pool.release(conn)
+        connections[0].fail_ping = True
+        replacement = await pool.acquire()
+        assert replacement is connections[1]
+        assert connections[0].closed
+        assert pool.stats["health_check_failures"] == 1
+        assert pool.stats["connections_discarded"] == 1
+        assert pool.size == 1
+        await pool.release(replacement)
+        await pool.close()
+
+    asyncio.run(main())
+
+
+def test_recent_connection_skips_health_check():
+    async def main():
+        pool, connections = make_pool(min_size=1, max_size=1, health_check_interval=60)
+        await pool.release(await pool.acquire())
+        connections[0].fail_ping = True
+        assert await pool.acquire() is connections[0]
+        assert pool.stats["health_check_failures"] == 0
+        await pool.close()
+
+    asyncio.run(main())
+
+
+def test_broken_error_discards_connection():
+    async def main():
+        pool, connections = make_pool(min_size=1, max_size=1, broken_errors=(sqlite3.OperationalError,))
+        with pytest.raises(sqlite3.OperationalError):
+            async with pool.connection():
+                raise sqlite3.OperationalError("connection reset")
+        assert connections[0].closed and pool.size == 0
+        async with pool.connection() as conn:
+            assert conn is connections[1]
+        await pool.close()
+
+    asyncio.run(main())
+
+
+def test_cancelled_run_returns_connection():
+    async def main():
+        pool, _ = make_pool(min_size=1, max_size=1)
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow(conn):
+            started.set()
+            release.wait(2)
+            return select_one(conn)
+
+        task = asyncio.create_task(pool.run(slow))
+        await asyncio.to_thread(started.wait, 2)
+        task.cancel()
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert pool.in_use == 0 and pool.size == 1
+        await pool.close()
+
+    asyncio.run(main())
+
+
+def test_pool_usable_from_successive_event_loops():
+    pool, _ = make_pool(min_size=1, max_size=1, acquire_timeout=0.05)
+
+    async def contend():
+        held = await pool.acquire()
+        waiter = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0)
+        await pool.release(held)
+        await pool.release(await waiter)
+
+    asyncio.run(contend())
+    asyncio.run(contend())
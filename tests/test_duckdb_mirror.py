@@ -0,0 +1,106 @@
+"""Tests for the DuckDB mirror engine."""
+
+import asyncio
+import os
+import threading
+
+import pytest
+
+from adk_aact_agent_project.duckdb_mirror import METADATA_FILE, DuckDBDatabase, build_mirror
+
+
+def write_export(directory, phases):
+    directory.mkdir(exist_ok=True)
+    lines = ["nct_id|phase"] + [f"NCT{i:08d}|{phase}" for i, phase in enumerate(phases)]
+    (directory / "studies.txt").write_text("\n".join(lines) + "\n")
+    return directory
+
+
+def count(database):
+    async def main():
+        rows = await database.execute_query("SELECT count(*) AS n FROM ctgov.studies")
+        return rows[0]["n"]
+    return asyncio.run(main())
+
+
+def test_rebuilt_mirror_is_picked_up(tmp_path):
+    mirror = tmp_path / "mirror"
+    build_mirror(write_export(tmp_path / "day1", ["PHASE1"]), mirror, snapshot="2025-01-01")
+    database = DuckDBDatabase(mirror)
+    assert database.snapshot == "2025-01-01" and count(database) == 1
+
+    build_mirror(write_export(tmp_path / "day2", ["PHASE1", "PHASE2"]), mirror, snapshot="2025-01-02")
+    # Make the rewrite visible even on filesystems with coarse timestamps
+    stat = (mirror / METADATA_FILE).stat()
+    os.utime(mirror / METADATA_FILE, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert database.snapshot == "2025-01-02" and count(database) == 2
+    asyncio.run(database.close())
+
+
+def test_concurrent_first_calls_share_one_connection(tmp_path):
+    mirror = tmp_path / "mirror"
+    build_mirror(write_export(tmp_path / "export", ["PHASE1"]), mirror, snapshot="s")
+    database = DuckDBDatabase(mirror)
+    barrier = threading.Barrier(8)
+    connections = []
+
+    def connect():
+        barrier.wait()
+        connections.append(database._connect())
+
+    threads = [threading.Thread(target=connect) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(con) for con in connections}) == 1
+    asyncio.run(database.close())
+
+
+def test_missing_mirror_raises(tmp_path):
+    with pytest.raises(FileNotFoundError, match="No AACT mirror"):
+        DuckDBDatabase(tmp_path).snapshot
+
+
+@pytest.fixture
+def database(tmp_path):
+    mirror = tmp_path / "mirror"
+    build_mirror(write_export(tmp_path / "export", ["PHASE1", "PHASE2"]), mirror, snapshot="s")
+    database = DuckDBDatabase(mirror)
+    yield database
+    asyncio.run(database.close())
+
+
+@pytest.mark.parametrize("query", [
+    "SELECT 1 AS a; COPY (SELECT 'pwned' AS x) TO '{out}'; SELECT 2 AS b LIMIT 1",
+    "COPY (SELECT 'pwned' AS x) TO '{out}'",
+])
+def test_only_single_selects_run(database, tmp_path, query):
+    out = tmp_path / "mirror" / "written.csv"
+    with pytest.raises(ValueError, match="single SELECT"):
+        asyncio.run(database.execute_query(query.format(out=out.as_posix())))
+    with pytest.raises(ValueError, match="single SELECT"):
+        asyncio.run(database.stream_query(query.format(out=out.as_posix()), 10))
+    assert not out.exists()
+
+
+def test_local_files_outside_the_mirror_are_not_readable(database, tmp_path):
+    secret = tmp_path / "secret.csv"
+    secret.write_text("a\n1\n")
+    with pytest.raises(Exception, match="Permission"):
+        asyncio.run(database.execute_query(f"SELECT * FROM read_csv('{secret.as_posix()}')"))
+    with pytest.raises(Exception):
+        asyncio.run(database.execute_query("SELECT current_setting('enable_external_access'); SET enable_external_access = true"))
+    assert count(database) == 2
+
+
+def test_queries_from_successive_event_loops(database):
+    # The concurrency limit is created for each running loop; contention
+    # would otherwise bind it to the first one
+    database.max_concurrency = 1
+
+    async def main():
+        return await asyncio.gather(*(database.execute_query("SELECT 1 AS n") for _ in range(4)))
+
+    for _ in range(2):
+        assert len(asyncio.run(main())) == 4
@@ -0,0 +1,123 @@
+"""Tests for the MCP server readiness probe."""
+
+import asyncio
+
+import pytest
+
+from adk_aact_agent_project import health
+from adk_aact_agent_project.health import NotReadyError, backoff_delays, wait_ready
+
+
+def ok():
+    return {"content": [{"type": "text", "text": '{"data": [{"ok": 1}]}'}]}
+
+
+class FakeServer:
+    """``call_tool`` that fails the first ``failures`` pings with ``error``; ``failures=None`` fails forever."""
+
+    def __init__(self, failures=0, error=None, alive=True):
+        self.failures = failures
+        self.error = error or OSError("connection refused")
+        self.alive = alive
+        self.calls = []
+
+    async def call_tool(self, name, arguments):
+        self.calls.append((name, arguments))
+        if self.failures is None or len(self.calls) <= self.failures:
+            raise self.error
+        return ok()
+
+
+class Uninitialized(FakeServer):
+    """Server that needs ``initialize`` first, like a fresh ``JsonRpcClient``."""
+
+    server_info = None
+
+    def __init__(self, initialize_error=None, **kwargs):
+        super().__init__(**kwargs)
+        self.initialize_error = initialize_error
+
+    async def initialize(self, timeout):
+        if self.initialize_error:
+            raise self.initialize_error
+        self.server_info = {"name": "aact"}
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record backoff sleeps instead of waiting them out."""
+    recorded = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay):
+        recorded.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(health.asyncio, "sleep", sleep)
+    return recorded
+
+
+def test_backoff_delays_grow_to_the_cap():
+    delays = backoff_delays(initial=0.05, maximum=0.3)
+    assert [next(delays) for _ in range(5)] == [0.05, 0.1, 0.2, 0.3, 0.3]
+
+
+def test_ready_after_retries(sleeps):
+    server = Uninitialized(failures=2)
+    report = asyncio.run(wait_ready(server, deadline=10, initial_delay=0.01))
+    assert report["ready"] and report["attempts"] == 3
+    assert report["initialize_seconds"] is not None and report["db_ping_seconds"] is not None
+    assert sleeps == [0.01, 0.02]
+    assert server.calls[0] == ("read_query", {"query": health.DB_PING_QUERY, "max_rows": 1})
+
+
+def test_backs_off_until_the_deadline():
+    server = FakeServer(failures=None)
+    with pytest.raises(NotReadyError) as error:
+        asyncio.run(wait_ready(server, deadline=0.2, initial_delay=0.01, max_delay=0.04))
+    report = error.value.report
+    assert not report["ready"]
+    # Delays 0.01, 0.02, 0.04, 0.04... stop once the next one would pass the deadline
+    assert 3 <= report["attempts"] <= 8
+    assert report["seconds"] < 0.2
+    assert report["error"].startswith("Not ready after 0.2s") and "connection refused" in report["error"]
+    assert isinstance(error.value, TimeoutError)
+
+
+def test_connection_error_fails_immediately(sleeps):
+    server = FakeServer(failures=None, error=ConnectionError("Server closed the connection"))
+    with pytest.raises(NotReadyError) as error:
+        asyncio.run(wait_ready(server, deadline=60))
+    assert len(server.calls) == 1 and sleeps == []
+    assert error.value.report["attempts"] == 1
+    assert error.value.report["error"] == "Server exited: Server closed the connection"
+    assert isinstance(error.value.__cause__, ConnectionError)
+
+
+def test_dead_server_fails_immediately(sleeps):
+    server = FakeServer(failures=None, alive=False)
+    with pytest.raises(NotReadyError, match="Server exited"):
+        asyncio.run(wait_ready(server, deadline=60))
+    assert len(server.calls) == 1 and sleeps == []
+
+
+def test_exit_during_initialize_is_reported():
+    server = Uninitialized(initialize_error=ConnectionError("Server closed the connection"))
+    with pytest.raises(NotReadyError) as error:
+        asyncio.run(wait_ready(server, deadline=60))
+    report = error.value.report
+    assert report["error"].startswith("Server exited before initializing")
+    assert report["initialize_seconds"] is None and report["attempts"] == 0
+    assert report["seconds"] is not None and not server.calls
+
+
+def test_tool_error_result_is_retried(sleeps):
+    class ErrorThenOk(FakeServer):
+        async def call_tool(self, name, arguments):
+            self.calls.append(name)
+            if len(self.calls) == 1:
+                return {"isError": True, "content": [{"type": "text", "text": "database is starting up"}]}
+            return ok()
+
+    report = asyncio.run(wait_ready(ErrorThenOk(), deadline=10))
+    assert report["ready"] and report["attempts"] == 2 and len(sleeps) == 1
@@ -0,0 +1,104 @@
+"""Tests for the append-only insights store."""
+
+import asyncio
+import json
+
+from adk_aact_agent_project import aact_tools
+from adk_aact_agent_project.insights_store import EMPTY_MEMO, InsightsStore
+
+
+def test_concurrent_appends_share_fsyncs(tmp_path):
+    path = tmp_path / "insights.jsonl"
+    store = InsightsStore(str(path))
+
+    async def main():
+        await asyncio.gather(*(store.append(f"finding {i}", session=f"s{i % 3}") for i in range(50)))
+
+    asyncio.run(main())
+    assert store.counters["appends"] == 50
+    assert 1 <= store.counters["fsyncs"] < 50
+    # Every appended record was flushed before its append returned
+    assert len(path.read_text().splitlines()) == 50
+    store.close()
+
+
+def test_sync_waits_for_records_written_during_an_fsync(tmp_path):
+    store = InsightsStore(str(tmp_path / "insights.jsonl"))
+
+    async def main():
+        first = asyncio.ensure_future(store.append("first"))
+        await asyncio.sleep(0)
+        # Written while the first fsync may be running; must not return early
+        await store.append("second")
+        await first
+
+    asyncio.run(main())
+    assert store._synced == store._written == 2
+    store.close()
+
+
+def test_replay_skips_a_torn_last_line(tmp_path):
+    path = tmp_path / "insights.jsonl"
+    store = InsightsStore(str(path))
+    asyncio.run(store.append("kept", session="a", tags=["Oncology"]))
+    store.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"ts": 1.0, "finding": "tor')
+
+    reopened = InsightsStore(str(path))
+    assert len(reopened) == 1
+    assert reopened.counters["skipped_lines"] == 1
+    asyncio.run(reopened.append("after the crash"))
+    reopened.close()
+
+    lines = path.read_text().splitlines()
+    assert json.loads(lines[-1])["finding"] == "after the crash"
+    assert [record["finding"] for record in InsightsStore(str(path)).query()] == ["kept", "after the crash"]
+
+
+def test_query_and_memo_by_session_and_tag():
+    store = InsightsStore()
+    assert store.memo() == EMPTY_MEMO
+    for i in range(5):
+        store.add(f"finding {i}", session="a" if i % 2 else "b", tags=["even"] if i % 2 == 0 else ["odd"])
+    assert [r["finding"] for r in store.query(session="a")] == ["finding 1", "finding 3"]
+    assert store.count(tag="EVEN") == 3
+    assert [r["finding"] for r in store.query(session="b", tag="even", offset=1)] == ["finding 2", "finding 4"]
+    page = store.memo(page=-1, page_size=2)
+    assert page.startswith("# Insights Memo (page 3 of 3, 5 insights)")
+    assert page.endswith("finding 4")
+    # The full memo is extended in place as insights are added
+    assert store.memo().count("\n- ") == 5
+    store.add("finding 5")
+    assert store.memo().endswith("finding 5")
+
+
+def test_search_ranks_findings_and_filters_by_tag():
+    store = InsightsStore()
+    store.add("Breast cancer trials are mostly phase 2", tags=["oncology"])
+    store.add("Asthma trials enroll children", tags=["respiratory"])
+    store.add("Melanoma cancer trials grew in 2020", tags=["oncology"])
+    results = store.search("cancer trials", k=2)
+    assert {record["finding"] for record, _ in results} == {
+        "Breast cancer trials are mostly phase 2", "Melanoma cancer trials grew in 2020"
+    }
+    assert store.search("asthma", tag="oncology") == []
+
+
+def test_memo_tool_pages_by_tag(monkeypatch):
+    store = InsightsStore()
+    monkeypatch.setattr(aact_tools, "insights_store", store)
+    monkeypatch.setattr(aact_tools, "INSIGHTS_MEMO_PAGE_SIZE", 2)
+    assert aact_tools.get_insights_memo in aact_tools.inprocess_tools()
+
+    async def main():
+        for i in range(5):
+            await store.append(f"finding {i}", tags=["oncology"] if i % 2 == 0 else [])
+        latest = await aact_tools.get_insights_memo()
+        first = await aact_tools.get_insights_memo(page=1, tag="oncology")
+        return latest["memo"], first["memo"]
+
+    latest, first = asyncio.run(main())
+    assert "page 3 of 3" in latest and "finding 4" in latest and "finding 3" not in latest
+    assert "page 1 of 2, 3 insights" in first
+    assert "finding 0" in first and "finding 2" in first and "finding 1" not in first
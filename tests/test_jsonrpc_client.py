@@ -0,0 +1,143 @@
+"""Tests for the pipelined JSON-RPC client over an in-memory stream pair."""
+
+import asyncio
+import json
+
+import pytest
+
+from adk_aact_agent_project.jsonrpc_client import JsonRpcClient, JsonRpcError
+
+
+class MemoryPipe:
+    """Both ends of a connection: the client's writer, and the server's side of its reader."""
+
+    def __init__(self):
+        self.reader = asyncio.StreamReader()
+        self.sent = asyncio.Queue()
+        self.closed = False
+
+    # Client writer
+    def write(self, data):
+        self.sent.put_nowait(json.loads(data))
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    # Server side
+    async def receive(self):
+        return await asyncio.wait_for(self.sent.get(), 1)
+
+    def reply(self, message):
+        self.reader.feed_data(json.dumps(message).encode() + b"\n")
+
+    def respond(self, request, result):
+        self.reply({"jsonrpc": "2.0", "id": request["id"], "result": result})
+
+
+def connect(**kwargs):
+    pipe = MemoryPipe()
+    client = JsonRpcClient(pipe.reader, pipe, **kwargs)
+    client.start()
+    return client, pipe
+
+
+def test_responses_are_matched_out_of_order():
+    async def main():
+        client, pipe = connect()
+        calls = [asyncio.create_task(client.call_tool("read_query", {"query": f"SELECT {i}"})) for i in range(3)]
+        requests = [await pipe.receive() for _ in calls]
+        for request in reversed(requests):
+            pipe.respond(request, {"content": [{"type": "text", "text": request["params"]["arguments"]["query"]}]})
+        results = await asyncio.gather(*calls)
+        assert [result["content"][0]["text"] for result in results] == ["SELECT 0", "SELECT 1", "SELECT 2"]
+        assert client.stats()["completed"] == 3 and client.in_flight == 0
+
+    asyncio.run(main())
+
+
+def test_error_responses_raise_and_server_pings_are_answered():
+    async def main():
+        client, pipe = connect()
+        call = asyncio.create_task(client.request("tools/call", {"name": "missing"}))
+        request = await pipe.receive()
+        pipe.reply({"jsonrpc": "2.0", "id": "srv-1", "method": "ping"})
+        assert await pipe.receive() == {"jsonrpc": "2.0", "id": "srv-1", "result": {}}
+        pipe.reply({"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32602, "message": "Unknown tool"}})
+        with pytest.raises(JsonRpcError) as error:
+            await call
+        assert error.value.code == -32602
+
+    asyncio.run(main())
+
+
+def test_timeout_sends_cancelled_notification():
+    async def main():
+        client, pipe = connect(timeout=0.05)
+        call = asyncio.create_task(client.ping())
+        request = await pipe.receive()
+        with pytest.raises(TimeoutError):
+            await call
+        cancelled = await pipe.receive()
+        assert cancelled["method"] == "notifications/cancelled"
+        assert cancelled["params"]["requestId"] == request["id"]
+        # The late response is dropped rather than matched to a newer request
+        pipe.respond(request, {})
+        await asyncio.sleep(0.01)
+        assert client.stats()["timeouts"] == 1 and client.stats()["unmatched"] == 1
+
+    asyncio.run(main())
+
+
+def test_cancelled_caller_withdraws_its_request():
+    async def main():
+        client, pipe = connect()
+        call = asyncio.create_task(client.ping())
+        request = await pipe.receive()
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        assert (await pipe.receive())["params"] == {"requestId": request["id"], "reason": "Cancelled by the client"}
+        assert client.in_flight == 0
+
+    asyncio.run(main())
+
+
+def test_max_in_flight_holds_back_further_requests():
+    async def main():
+        client, pipe = connect(max_in_flight=2)
+        calls = [asyncio.create_task(client.ping()) for _ in range(4)]
+        first = [await pipe.receive() for _ in range(2)]
+        await asyncio.sleep(0.01)
+        assert pipe.sent.empty() and client.in_flight == 2
+        pipe.respond(first[0], {})
+        third = await pipe.receive()
+        assert third["id"] not in {request["id"] for request in first}
+        pipe.respond(first[1], {})
+        pipe.respond(third, {})
+        pipe.respond(await pipe.receive(), {})
+        await asyncio.gather(*calls)
+        assert client.stats()["max_in_flight_seen"] == 2
+
+    asyncio.run(main())
+
+
+def test_server_exit_fails_pending_and_later_requests():
+    async def main():
+        client, pipe = connect()
+        calls = [asyncio.create_task(client.ping()) for _ in range(2)]
+        for _ in calls:
+            await pipe.receive()
+        pipe.reader.feed_eof()
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        assert all(isinstance(result, ConnectionError) for result in results)
+        assert "closed the connection" in str(results[0])
+        assert not client.alive
+        with pytest.raises(ConnectionError):
+            await client.ping()
+        await client.close()
+        assert pipe.closed
+
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+"""Tests for starting and releasing pooled MCP servers."""
+
+import asyncio
+import sys
+import time
+
+import pytest
+from mcp import StdioServerParameters
+
+from adk_aact_agent_project.mcp_pool import MCPServerPool, PooledServer
+
+
+def test_start_timeout_stops_a_server_stuck_in_the_handshake():
+    # A process that never answers the initialize request
+    params = StdioServerParameters(command=sys.executable, args=["-c", "import time; time.sleep(60)"])
+    server = PooledServer(params, start_timeout=0.5, ready_db_ping=False)
+
+    async def main():
+        started = time.monotonic()
+        with pytest.raises(TimeoutError, match="did not initialize"):
+            await asyncio.wait_for(server.start(), 15)
+        return time.monotonic() - started
+
+    assert asyncio.run(main()) < 10
+    assert server._task.done() and not server.alive
+
+
+class WornServer:
+    alive = False
+    requests_served = 0
+
+    async def close(self):
+        pass
+
+
+def test_release_keeps_the_refill_task():
+    pool = MCPServerPool("uvx", [], min_size=1)
+    refilled = asyncio.Event
+
+    async def main():
+        nonlocal refilled
+        refilled = asyncio.Event()
+        pool._cond = asyncio.Condition()
+        pool._size = 1
+
+        async def fill():
+            await asyncio.sleep(0)
+            refilled.set()
+
+        pool._fill = fill
+        await pool.release(WornServer())
+        assert pool.size == 0 and len(pool._fills) == 1
+        await asyncio.wait_for(refilled.wait(), 1)
+        await asyncio.sleep(0)
+        assert not pool._fills
+
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+"""Tests for the turn metrics of MetricsPlugin."""
+
+import asyncio
+from types import SimpleNamespace
+
+from adk_aact_agent_project.metrics import TURNS, TURNS_IN_FLIGHT, MetricsPlugin
+
+
+def in_flight():
+    return {labels: value for _, labels, value in TURNS_IN_FLIGHT.samples()}.get((), 0)
+
+
+def turns(outcome):
+    return {labels: value for _, labels, value in TURNS.samples()}.get((("outcome", outcome),), 0)
+
+
+def invocation(invocation_id):
+    return SimpleNamespace(invocation_id=invocation_id, user_id="u", session=SimpleNamespace(id="s"))
+
+
+def test_completed_turn_leaves_no_turn_in_flight():
+    plugin = MetricsPlugin()
+    before, ok = in_flight(), turns("ok")
+
+    async def turn():
+        await plugin.before_run_callback(invocation_context=invocation("done"))
+        assert in_flight() == before + 1
+        await plugin.after_run_callback(invocation_context=invocation("done"))
+
+    asyncio.run(turn())
+    assert in_flight() == before
+    assert turns("ok") == ok + 1
+
+
+def test_cancelled_turn_is_ended():
+    plugin = MetricsPlugin()
+    before, cancelled = in_flight(), turns("cancelled")
+    started = None
+
+    async def turn():
+        await plugin.before_run_callback(invocation_context=invocation("cancel"))
+        started.set()
+        await asyncio.sleep(60)
+
+    async def main():
+        nonlocal started
+        started = asyncio.Event()
+        task = asyncio.create_task(turn())
+        await started.wait()
+        assert in_flight() == before + 1
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(main())
+    assert in_flight() == before
+    assert turns("cancelled") == cancelled + 1
+    assert plugin._turns == {}
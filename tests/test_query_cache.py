@@ -0,0 +1,85 @@
+"""Tests for the read_query result cache and its snapshot probe."""
+
+import asyncio
+
+import pytest
+
+from adk_aact_agent_project import aact_tools
+from adk_aact_agent_project.query_cache import QueryCache, fingerprint, normalize_sql
+
+
+@pytest.mark.parametrize("a, b", [
+    ("SELECT count(*) FROM ctgov.studies;", "select COUNT(*)\n  from CTGOV.STUDIES -- total"),
+    ('SELECT "phase" FROM studies LIMIT 010', "SELECT phase /* col */ FROM studies LIMIT 10"),
+    ("SELECT e'a\\nb'", "SELECT E'a\\nb'"),
+])
+def test_trivially_different_spellings_share_a_fingerprint(a, b):
+    assert fingerprint(a) == fingerprint(b)
+
+
+@pytest.mark.parametrize("a, b", [
+    ("SELECT * FROM conditions WHERE name = 'Cancer'", "SELECT * FROM conditions WHERE name = 'cancer'"),
+    ("SELECT * FROM conditions WHERE name = $$Cancer$$", "SELECT * FROM conditions WHERE name = $$cancer$$"),
+    ("SELECT * FROM conditions WHERE name = $q$Cancer$q$", "SELECT * FROM conditions WHERE name = $q$cancer$q$"),
+    ('SELECT "Phase" FROM studies', "SELECT phase FROM studies"),
+])
+def test_literals_and_case_sensitive_identifiers_are_kept(a, b):
+    assert fingerprint(a) != fingerprint(b)
+
+
+def test_dollar_quoted_literals_are_kept_verbatim():
+    query = "SELECT 1 WHERE x = $tag$It's -- not a comment $$ ; $tag$ AND y = $$A$$;"
+    assert normalize_sql(query) == "select 1 where x = $tag$It's -- not a comment $$ ; $tag$ and y = $$A$$"
+    assert normalize_sql("SELECT $1, $2") == "select $ 1 , $ 2"
+
+
+def test_limited_entries_serve_smaller_requests_and_snapshot_change_clears():
+    cache = QueryCache()
+    cache.check_snapshot("2025-01-01")
+    rows = [{"n": i} for i in range(10)]
+    cache.put("SELECT n FROM t", 10, rows)
+    assert cache.get("select n from t", 5) == rows[:5]
+    assert cache.get("SELECT n FROM t", 20) is None
+    cache.put("SELECT n FROM t", 20, rows)
+    assert cache.get("SELECT n FROM t", 100) == rows
+    cache.check_snapshot("2025-01-02")
+    assert len(cache) == 0 and cache.invalidations == 1
+
+
+class SlowSnapshotDatabase:
+    """Answers queries at once, except the snapshot probe, which waits for ``release``."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.queries = []
+
+    async def execute_query(self, query, row_limit=None):
+        self.queries.append(query)
+        if query == aact_tools.SNAPSHOT_QUERY:
+            await self.release.wait()
+            return [{"snapshot": "2025-01-02"}]
+        return [{"n": 1}]
+
+
+def test_snapshot_probe_runs_off_the_request_path(monkeypatch):
+    monkeypatch.setattr(aact_tools, "DB_ENGINE", "postgres")
+    monkeypatch.setattr(aact_tools, "QUERY_CACHE_ENABLED", True)
+    monkeypatch.setattr(aact_tools, "QUERY_GUARD_ENABLED", False)
+    monkeypatch.setattr(aact_tools, "query_cache", QueryCache())
+    monkeypatch.setattr(aact_tools, "_snapshot_task", None)
+    database = SlowSnapshotDatabase()
+    monkeypatch.setattr(aact_tools, "get_database", lambda: database)
+
+    async def main():
+        result = await asyncio.wait_for(aact_tools.read_query("SELECT 1 AS n"), 1)
+        assert result["data"] == [{"n": 1}]
+        assert aact_tools.query_cache.snapshot is None
+        assert aact_tools.SNAPSHOT_QUERY in database.queries
+        database.release.set()
+        await asyncio.sleep(0.01)
+        assert aact_tools.query_cache.snapshot == "2025-01-02"
+        # One probe per interval, however many requests arrive
+        await aact_tools.read_query("SELECT 2 AS n")
+        assert database.queries.count(aact_tools.SNAPSHOT_QUERY) == 1
+
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+"""Tests for the LIMIT injection and EXPLAIN cost budget of read_query."""
+
+import asyncio
+import json
+
+import duckdb
+import pytest
+
+from adk_aact_agent_project import aact_tools
+from adk_aact_agent_project.query_guard import QueryGuard, ensure_limit
+
+
+@pytest.mark.parametrize("query, bounded", [
+    ("SELECT nct_id FROM ctgov.studies", "SELECT nct_id FROM ctgov.studies\nLIMIT 25"),
+    ("SELECT nct_id FROM ctgov.studies;  ;", "SELECT nct_id FROM ctgov.studies\nLIMIT 25"),
+    ("SELECT nct_id FROM ctgov.studies -- all of them\n", "SELECT nct_id FROM ctgov.studies\nLIMIT 25"),
+    ("SELECT nct_id FROM ctgov.studies ORDER BY nct_id OFFSET 100",
+     "SELECT nct_id FROM ctgov.studies ORDER BY nct_id OFFSET 100\nLIMIT 25"),
+    ("WITH recent AS (SELECT * FROM ctgov.studies ORDER BY start_date DESC LIMIT 500) SELECT * FROM recent;",
+     "WITH recent AS (SELECT * FROM ctgov.studies ORDER BY start_date DESC LIMIT 500) SELECT * FROM recent\nLIMIT 25"),
+    ("SELECT * FROM (SELECT nct_id FROM ctgov.studies FETCH FIRST 5 ROWS ONLY) s",
+     "SELECT * FROM (SELECT nct_id FROM ctgov.studies FETCH FIRST 5 ROWS ONLY) s\nLIMIT 25"),
+    ("SELECT 'no limit; here' AS note", "SELECT 'no limit; here' AS note\nLIMIT 25"),
+])
+def test_limit_is_appended_to_unbounded_queries(query, bounded):
+    assert ensure_limit(query, 25) == (bounded, True)
+
+
+@pytest.mark.parametrize("query", [
+    "SELECT nct_id FROM ctgov.studies LIMIT 10",
+    "select nct_id from ctgov.studies limit 10 offset 20;",
+    "SELECT nct_id FROM ctgov.studies OFFSET 5 ROWS FETCH FIRST 10 ROWS ONLY",
+    "WITH s AS (SELECT nct_id FROM ctgov.studies) SELECT * FROM s LIMIT 3",
+])
+def test_queries_with_a_top_level_limit_are_unchanged(query):
+    assert ensure_limit(query, 25) == (query, False)
+
+
+def test_injected_limit_after_offset_runs():
+    query, injected = ensure_limit("SELECT * FROM range(100) ORDER BY 1 OFFSET 95;", 3)
+    assert injected
+    assert duckdb.connect().execute(query).fetchall() == [(95,), (96,), (97,)]
+
+
+def test_apply_limit_counts_injections():
+    guard = QueryGuard()
+    guard.apply_limit("SELECT 1", 10)
+    guard.apply_limit("SELECT 1 LIMIT 1", 10)
+    assert guard.stats()["limits_injected"] == 1
+
+
+class ExplainDatabase:
+    """Returns a fixed plan for ``EXPLAIN (FORMAT JSON)``, as JSON text like psycopg2 may."""
+
+    def __init__(self, plan=None, error=None):
+        self.plan = plan
+        self.error = error
+        self.queries = []
+
+    async def execute_query(self, query):
+        self.queries.append(query)
+        if self.error is not None:
+            raise self.error
+        return [{"QUERY PLAN": json.dumps([{"Plan": self.plan}])}]
+
+
+PLAN = {
+    "Node Type": "Hash Join", "Total Cost": 9_500_000.0, "Plan Rows": 40_000,
+    "Plans": [
+        {"Node Type": "Seq Scan", "Relation Name": "facilities", "Plan Rows": 3_000_000, "Total Cost": 80_000.0},
+        {"Node Type": "Seq Scan", "Relation Name": "studies", "Plan Rows": 500_000, "Total Cost": 20_000.0},
+    ],
+}
+
+
+def test_over_budget_plan_is_rejected_with_a_hint():
+    guard = QueryGuard(max_cost=5_000_000, max_rows=1_000_000)
+    database = ExplainDatabase(PLAN)
+    rejection = asyncio.run(guard.check(database, "SELECT * FROM ctgov.studies JOIN ctgov.facilities USING (nct_id)"))
+    assert database.queries[0].startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert "estimated cost 9,500,000 exceeds the budget of 5,000,000" in rejection["error"]
+    assert [scan["table"] for scan in rejection["estimate"]["largest_scans"]] == ["facilities", "studies"]
+    assert "ctgov.facilities, ctgov.studies" in rejection["hint"]
+    assert guard.stats()["rejected"] == 1
+
+
+def test_row_budget_and_plans_within_budget():
+    guard = QueryGuard(max_cost=10_000_000, max_rows=10_000)
+    rejection = asyncio.run(guard.check(ExplainDatabase(PLAN), "SELECT 1"))
+    assert "estimated 40,000 result rows exceed the budget of 10,000" in rejection["error"]
+    guard.max_rows = 100_000
+    assert asyncio.run(guard.check(ExplainDatabase(PLAN), "SELECT 1")) is None
+    assert guard.stats() == {"checked": 2, "rejected": 1, "limits_injected": 0, "explain_failures": 0}
+
+
+def test_failed_explain_lets_the_query_through():
+    guard = QueryGuard(max_cost=1)
+    assert asyncio.run(guard.check(ExplainDatabase(error=RuntimeError("syntax error")), "SELEC 1")) is None
+    assert guard.stats()["explain_failures"] == 1
+
+
+def test_read_query_rejects_over_budget_queries_before_running_them(monkeypatch):
+    database = ExplainDatabase(PLAN)
+    monkeypatch.setattr(aact_tools, "DB_ENGINE", "postgres")
+    monkeypatch.setattr(aact_tools, "QUERY_GUARD_ENABLED", True)
+    monkeypatch.setattr(aact_tools, "QUERY_CACHE_ENABLED", False)
+    monkeypatch.setattr(aact_tools, "QUERY_INJECT_LIMIT", True)
+    monkeypatch.setattr(aact_tools, "query_guard", QueryGuard(max_cost=5_000_000))
+    monkeypatch.setattr(aact_tools, "get_database", lambda: database)
+    result = asyncio.run(aact_tools.read_query("SELECT * FROM ctgov.facilities;", max_rows=10))
+    assert result["error"].startswith("Query rejected before execution")
+    # Only the plan of the bounded query was asked for; the query itself never ran
+    assert database.queries == ["EXPLAIN (FORMAT JSON) SELECT * FROM ctgov.facilities\nLIMIT 10"]
@@ -0,0 +1,105 @@
+"""Tests for the question cache plugin."""
+
+import asyncio
+from types import SimpleNamespace
+
+from google.genai import types
+
+from adk_aact_agent_project.question_cache import QuestionCache, QuestionCachePlugin
+
+QUESTION = "How many phase 3 trials completed in 2022?"
+
+
+def call(plugin, name, result, invocation_id="inv", **args):
+    tool = SimpleNamespace(name=name)
+    context = SimpleNamespace(invocation_id=invocation_id)
+    asyncio.run(plugin.after_tool_callback(tool=tool, tool_args=args, tool_context=context, result=result))
+
+
+def user_message(text):
+    return types.Content(role="user", parts=[types.Part(text=text)])
+
+
+def finish(plugin, invocation_id="inv", question=QUESTION, earlier=()):
+    events = [SimpleNamespace(author="user", invocation_id=f"earlier{i}", content=user_message(text))
+              for i, text in enumerate(earlier)]
+    events.append(SimpleNamespace(author="user", invocation_id=invocation_id, content=user_message(question)))
+    invocation = SimpleNamespace(
+        invocation_id=invocation_id, user_content=user_message(question), session=SimpleNamespace(events=events)
+    )
+    asyncio.run(plugin.after_run_callback(invocation_context=invocation))
+
+
+def test_caches_the_query_the_answer_is_based_on():
+    cache = QuestionCache()
+    plugin = QuestionCachePlugin(cache)
+    call(plugin, "read_query", {"data": [{"phase": "PHASE3"}]}, query="SELECT DISTINCT phase FROM ctgov.studies")
+    call(plugin, "describe_table", {"columns": []}, table_name="studies")
+    call(plugin, "read_query", {"data": [{"count": 12}]}, query="SELECT count(*) FROM ctgov.studies", max_rows=5)
+    call(plugin, "append_insight", {"status": "ok"}, finding="12 trials")
+    finish(plugin)
+    entry = cache.lookup(QUESTION)
+    assert entry.sql == "SELECT count(*) FROM ctgov.studies"
+    assert entry.arguments == {"query": "SELECT count(*) FROM ctgov.studies", "max_rows": 5}
+
+
+def test_failed_final_query_is_not_replaced_by_an_earlier_one():
+    cache = QuestionCache()
+    plugin = QuestionCachePlugin(cache)
+    call(plugin, "read_query", {"data": []}, query="SELECT * FROM ctgov.studies LIMIT 1")
+    call(plugin, "read_query", {"error": "syntax error"}, query="SELECT count(* FROM ctgov.studies")
+    finish(plugin)
+    assert len(cache) == 0
+
+
+def test_run_error_clears_the_invocation():
+    plugin = QuestionCachePlugin(QuestionCache())
+    call(plugin, "read_query", {"data": []}, query="SELECT 1")
+    asyncio.run(plugin.on_run_error_callback(
+        invocation_context=SimpleNamespace(invocation_id="inv"), error=RuntimeError("model failed")
+    ))
+    assert plugin._validated == {}
+
+
+def test_skip_mode_reruns_with_the_original_arguments():
+    cache = QuestionCache()
+    cache.store(QUESTION, "SELECT nct_id FROM ctgov.studies", arguments={"query": "SELECT nct_id FROM ctgov.studies", "max_rows": 500})
+    calls = []
+
+    async def read_query(query, max_rows=25):
+        calls.append((query, max_rows))
+        return {"data": []}
+
+    plugin = QuestionCachePlugin(cache, mode="skip")
+    llm_request = SimpleNamespace(
+        contents=[types.Content(role="user", parts=[types.Part(text=QUESTION)])],
+        tools_dict={"read_query": SimpleNamespace(func=read_query)},
+    )
+    response = asyncio.run(plugin.before_model_callback(callback_context=None, llm_request=llm_request))
+    assert calls == [("SELECT nct_id FROM ctgov.studies", 500)]
+    assert "answered before" in response.content.parts[0].text
+
+
+def test_follow_up_turns_are_neither_stored_nor_answered():
+    cache = QuestionCache()
+    plugin = QuestionCachePlugin(cache, mode="skip")
+    call(plugin, "read_query", {"data": []}, query="SELECT count(*) FROM ctgov.studies WHERE start_date >= '2023-01-01'")
+    finish(plugin, question="What about 2023?", earlier=[QUESTION])
+    assert len(cache) == 0
+
+    cache.store("What about 2023?", "SELECT 1")
+    llm_request = SimpleNamespace(
+        contents=[user_message(QUESTION), types.Content(role="model", parts=[types.Part(text="12")]),
+                  user_message("What about 2023?")],
+        tools_dict={},
+    )
+    assert asyncio.run(plugin.before_model_callback(callback_context=None, llm_request=llm_request)) is None
+    assert cache.hits == 0 and not hasattr(llm_request, "append_instructions")
+
+
+def test_questions_differing_in_filler_words_do_not_share_a_key():
+    cache = QuestionCache()
+    cache.store("Trials with results", "SELECT 1")
+    assert cache.lookup("trials without results") is None
+    assert cache.lookup("Trials WITH results?").sql == "SELECT 1"
+    assert cache.lookup("trials results") is None
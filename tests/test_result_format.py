@@ -0,0 +1,68 @@
+"""Tests for the compact columnar result encoding."""
+
+import asyncio
+import datetime
+import decimal
+import json
+
+from adk_aact_agent_project.duckdb_mirror import DuckDBDatabase, build_mirror
+from adk_aact_agent_project.result_format import ResultRows, decode_compact, encode_compact
+
+
+def roundtrip(rows, **kwargs):
+    return decode_compact(json.loads(json.dumps(encode_compact(rows, **kwargs))))
+
+
+def test_typed_values_survive_roundtrip():
+    rows = [
+        {"nct_id": f"NCT{i:08d}", "phase": ["PHASE1", "PHASE2"][i % 2], "start_date": datetime.date(2020, 1, i + 1),
+         "enrollment": decimal.Decimal(100 + i), "ratio": decimal.Decimal("0.25"), "has_results": i % 2 == 0}
+        for i in range(10)
+    ]
+    payload = encode_compact(rows)
+    assert payload["dictionaries"] == {"phase": ["PHASE1", "PHASE2"]}
+    assert roundtrip(rows) == rows
+
+
+def test_json_columns_are_json_text():
+    rows = [{"id": 1, "meta": {"source": "ctgov", "tags": ["a"]}}, {"id": 2, "meta": [1, 2]}]
+    payload = encode_compact(rows)
+    assert payload["types"] == ["int", "json"]
+    assert payload["rows"][0][1] == '{"source": "ctgov", "tags": ["a"]}'
+    assert roundtrip(rows) == rows
+
+
+def test_dicts_in_mixed_columns_are_json_text():
+    payload = encode_compact([{"value": "text"}, {"value": {"a": "b"}}])
+    assert payload["types"] == ["str"]
+    assert payload["rows"][1] == ['{"a": "b"}']
+
+
+def test_bool_and_int_column_stays_numeric():
+    payload = encode_compact([{"flag": True}, {"flag": 0}, {"flag": None}])
+    assert payload["types"] == ["int"]
+    assert payload["rows"] == [[1], [0], [None]]
+
+
+def test_empty_result_keeps_columns():
+    rows = ResultRows([], ["nct_id", "phase"])
+    assert encode_compact(rows)["columns"] == ["nct_id", "phase"]
+    assert encode_compact(rows[:5])["columns"] == ["nct_id", "phase"]
+    assert encode_compact([])["columns"] == []
+
+
+def test_duckdb_empty_result_keeps_columns(tmp_path):
+    export = tmp_path / "export"
+    export.mkdir()
+    (export / "studies.txt").write_text("nct_id|phase\nNCT00000001|PHASE1\n")
+    build_mirror(export, tmp_path / "mirror", snapshot="test")
+
+    async def main():
+        database = DuckDBDatabase(tmp_path / "mirror")
+        try:
+            return await database.execute_query("SELECT nct_id, phase FROM ctgov.studies WHERE phase = 'PHASE9'")
+        finally:
+            await database.close()
+
+    rows = asyncio.run(main())
+    assert rows == [] and encode_compact(rows)["columns"] == ["nct_id", "phase"]
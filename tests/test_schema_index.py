@@ -0,0 +1,95 @@
+"""Tests for the memory-mapped schema index."""
+
+import json
+
+import pytest
+
+from adk_aact_agent_project import schema_index as schema_index_module
+from adk_aact_agent_project.schema_index import SchemaIndex
+
+TABLES = {
+    "studies": {"columns": [
+        {"name": "nct_id", "type": "character varying", "nullable": False, "description": 'Trial "NCT" id'},
+        {"name": "phase", "type": "character varying", "nullable": True},
+    ]},
+    "conditions": {"columns": [{"name": "name", "type": "character varying", "nullable": True}]},
+    "facilities": {"columns": {"country": "character varying", "city": {"type": "text", "nullable": True}}},
+}
+
+
+def write(tmp_path, data, **dump_args):
+    path = tmp_path / "database_schema.json"
+    path.write_text(json.dumps(data, **dump_args), encoding="utf-8")
+    return path
+
+
+def describe_all(index):
+    return {name: index.describe_table(name) for name in index.list_tables()}
+
+
+@pytest.mark.parametrize("data, dump_args", [
+    ({"tables": TABLES}, {"indent": 2}),
+    ({"version": "1", "ctgov": TABLES}, {"indent": 4}),
+    (TABLES, {"indent": 1}),
+    ({"tables": TABLES}, {}),
+    (TABLES, {"separators": (",", ":")}),
+])
+def test_layouts_and_formatting_give_the_same_index(tmp_path, data, dump_args):
+    index = SchemaIndex(write(tmp_path, data, **dump_args))
+    index.load()
+    (tmp_path / "expected").mkdir()
+    expected = SchemaIndex(write(tmp_path / "expected", TABLES, indent=2))
+    expected.load()
+    assert index.list_tables() == ["conditions", "facilities", "studies"]
+    assert describe_all(index) == describe_all(expected)
+    assert index.raw_table("studies") == TABLES["studies"]
+
+
+def test_indented_files_are_indexed_without_decoding_tables(tmp_path, monkeypatch):
+    path = write(tmp_path, {"tables": TABLES}, indent=2)
+
+    def decode(*args):
+        raise AssertionError("table decoded while indexing")
+
+    monkeypatch.setattr(schema_index_module, "_DECODER", type("Decoder", (), {"raw_decode": decode})())
+    index = SchemaIndex(path)
+    index.load()
+    assert index.list_tables() == ["conditions", "facilities", "studies"]
+
+
+def test_tables_list_layout_is_indexed_by_table_name(tmp_path):
+    tables = [dict(info, name=name) for name, info in TABLES.items()]
+    for dump_args in ({"indent": 2}, {}):
+        index = SchemaIndex(write(tmp_path, {"tables": tables}, **dump_args))
+        index.load()
+        assert index.list_tables() == ["conditions", "facilities", "studies"]
+        assert index.describe_table("conditions") == [{"name": "name", "type": "character varying", "nullable": True}]
+
+
+def test_sidecar_is_reused_until_the_file_changes(tmp_path, monkeypatch):
+    path = write(tmp_path, {"tables": TABLES}, indent=2)
+    SchemaIndex(path).load()
+    assert (tmp_path / "database_schema.json.idx").exists()
+
+    def scan(*args, **kwargs):
+        raise AssertionError("file scanned despite a current sidecar")
+
+    monkeypatch.setattr(schema_index_module, "_indented_spans", scan)
+    monkeypatch.setattr(schema_index_module, "_object_spans", scan)
+    index = SchemaIndex(path)
+    index.load()
+    assert index.describe_table("studies")[0]["description"] == 'Trial "NCT" id'
+
+    monkeypatch.undo()
+    write(tmp_path, {"tables": {"studies": TABLES["studies"]}}, indent=2)
+    assert index.changed_on_disk()
+    index.load()
+    assert index.list_tables() == ["studies"]
+
+
+def test_non_ascii_schema_is_indexed(tmp_path):
+    tables = {"studies": {"columns": [{"name": "titre", "type": "text", "description": "Étude clinique"}]}}
+    index = SchemaIndex(write(tmp_path, {"tables": tables}, indent=2, ensure_ascii=False))
+    index.load()
+    assert index.describe_table("studies")[0]["description"] == "Étude clinique"
+    assert index.describe_table("missing") is None
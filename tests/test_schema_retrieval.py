@@ -0,0 +1,36 @@
+"""Tests for the schema retriever's instruction rewrite."""
+
+from google.genai import types
+from google.adk.models.llm_request import LlmRequest
+
+from adk_aact_agent_project.bench_schema_retrieval import _schema_file
+from adk_aact_agent_project.config import BASE_AGENT_INSTRUCTIONS, SCHEMA_RETRIEVAL_STEP, SCHEMA_STEP
+from adk_aact_agent_project.schema_index import SchemaIndex
+from adk_aact_agent_project.schema_retrieval import SchemaRetriever
+
+
+def request(question):
+    llm_request = LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text=question)])])
+    llm_request.config.system_instruction = BASE_AGENT_INSTRUCTIONS
+    return llm_request
+
+
+def test_instructions_default_to_the_exploratory_step():
+    assert SCHEMA_STEP in BASE_AGENT_INSTRUCTIONS
+    assert SCHEMA_RETRIEVAL_STEP not in BASE_AGENT_INSTRUCTIONS
+
+
+def test_step_is_rewritten_when_tables_are_injected(tmp_path):
+    index = SchemaIndex(_schema_file(str(tmp_path)))
+    index.load()
+    llm_request = request("Which countries host the most trial facilities?")
+    SchemaRetriever(lambda: index).before_model_callback(None, llm_request)
+    instruction = llm_request.config.system_instruction
+    assert SCHEMA_RETRIEVAL_STEP in instruction and SCHEMA_STEP not in instruction
+    assert "- ctgov.facilities:" in instruction
+
+
+def test_step_is_kept_without_a_schema_index():
+    llm_request = request("Which countries host the most trial facilities?")
+    SchemaRetriever(lambda: None).before_model_callback(None, llm_request)
+    assert llm_request.config.system_instruction == BASE_AGENT_INSTRUCTIONS
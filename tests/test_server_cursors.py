@@ -0,0 +1,167 @@
+"""Tests for paged results: the cursor registry and the streaming tools."""
+
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from adk_aact_agent_project import aact_tools
+from adk_aact_agent_project.db_pool import AsyncConnectionPool
+from adk_aact_agent_project.server_cursors import CursorNotFound, CursorRegistry
+
+ROWS = 10
+
+
+def _connect():
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("CREATE TABLE studies (n INTEGER)")
+    conn.executemany("INSERT INTO studies VALUES (?)", [(i,) for i in range(ROWS)])
+    return conn
+
+
+def _declare(conn, query, params, n):
+    # SQLite stands in for a named Postgres cursor: same look-ahead fetch
+    cursor = conn.cursor()
+    cursor.execute(query, params or ())
+    return cursor, [dict(row) for row in cursor.fetchmany(n + 1)]
+
+
+def _fetch(cursor, n):
+    return [dict(row) for row in cursor.fetchmany(n)]
+
+
+def _finish(conn, cursor):
+    cursor.close()
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(CursorRegistry, "_declare", staticmethod(_declare))
+    monkeypatch.setattr(CursorRegistry, "_fetch", staticmethod(_fetch))
+    monkeypatch.setattr(CursorRegistry, "_finish", staticmethod(_finish))
+    pool = AsyncConnectionPool(_connect, min_size=0, max_size=2)
+    return CursorRegistry(pool, idle_timeout=60, max_cursors=1)
+
+
+def test_pages_through_result_and_releases_connection(registry):
+    async def main():
+        rows, token = await registry.open("SELECT n FROM studies ORDER BY n", 4)
+        seen = [row["n"] for row in rows]
+        assert token is not None and registry.pool.in_use == 1
+        while token:
+            rows, token = await registry.fetch(token, 4)
+            seen += [row["n"] for row in rows]
+        assert seen == list(range(ROWS))
+        assert len(registry) == 0 and registry.pool.in_use == 0
+
+    asyncio.run(main())
+
+
+def test_single_page_result_returns_no_token(registry):
+    async def main():
+        rows, token = await registry.open("SELECT n FROM studies", ROWS)
+        assert len(rows) == ROWS and token is None and registry.pool.in_use == 0
+
+    asyncio.run(main())
+
+
+def test_max_cursors_and_unknown_token(registry):
+    async def main():
+        _, token = await registry.open("SELECT n FROM studies", 2)
+        with pytest.raises(RuntimeError):
+            await registry.open("SELECT n FROM studies", 2)
+        await registry.close(token)
+        with pytest.raises(CursorNotFound):
+            await registry.fetch(token, 2)
+
+    asyncio.run(main())
+
+
+def test_idle_cursors_expire(registry):
+    async def main():
+        registry.idle_timeout = 0
+        await registry.open("SELECT n FROM studies", 2)
+        await asyncio.sleep(0.01)
+        await registry.expire_idle()
+        assert len(registry) == 0 and registry.expired == 1 and registry.pool.in_use == 0
+
+    asyncio.run(main())
+
+
+def test_page_sizes_below_one_are_rejected(registry):
+    async def main():
+        with pytest.raises(ValueError):
+            await registry.open("SELECT n FROM studies", 0)
+        _, token = await registry.open("SELECT n FROM studies", 2)
+        with pytest.raises(ValueError):
+            await registry.fetch(token, 0)
+        with pytest.raises(ValueError):
+            await registry.fetch(token, -3)
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("call", [
+    lambda: aact_tools.read_query("SELECT 1", max_rows=0, stream=True),
+    lambda: aact_tools.read_query("SELECT 1", max_rows=-5),
+    lambda: aact_tools.fetch_more("token", n=0),
+])
+def test_tools_reject_row_counts_below_one(call):
+    result = asyncio.run(call())
+    assert "at least 1" in result["error"]
+
+
+class CancellableConnection:
+    """Connection whose in-flight statement blocks until ``cancel()``."""
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self.closed = False
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def close(self):
+        self.closed = True
+
+
+def test_cancelled_open_cancels_statement_and_discards_connection(registry, monkeypatch):
+    conn = CancellableConnection()
+    finished = threading.Event()
+
+    def declare(conn, query, params, n):
+        conn.cancelled.wait(5)
+        finished.set()
+        raise RuntimeError("canceling statement due to user request")
+
+    monkeypatch.setattr(CursorRegistry, "_declare", staticmethod(declare))
+    registry.pool = AsyncConnectionPool(lambda: conn, min_size=0, max_size=1)
+
+    async def main():
+        task = asyncio.create_task(registry.open("SELECT n FROM studies", 2))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert conn.cancelled.is_set() and finished.is_set()
+        assert conn.closed and registry.pool.in_use == 0 and registry.pool.size == 0
+
+    asyncio.run(main())
+
+
+def test_failed_fetch_closes_cursor_and_releases_connection(registry, monkeypatch):
+    def fetch(cursor, n):
+        raise RuntimeError("current transaction is aborted")
+
+    async def main():
+        _, token = await registry.open("SELECT n FROM studies", 2)
+        monkeypatch.setattr(CursorRegistry, "_fetch", staticmethod(fetch))
+        with pytest.raises(RuntimeError):
+            await registry.fetch(token, 4)
+        assert len(registry) == 0 and registry.pool.in_use == 0
+        with pytest.raises(CursorNotFound):
+            await registry.fetch(token, 2)
+
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+"""Tests for the write-behind session store."""
+
+import asyncio
+from types import SimpleNamespace
+
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from adk_aact_agent_project.session_store import (
+    EventLogSessionService, SessionFlushPlugin, SQLiteSessionBackend
+)
+
+APP = "aact"
+
+
+def service(path, **kwargs):
+    return EventLogSessionService(SQLiteSessionBackend(path), **kwargs)
+
+
+def event(text, **state):
+    return Event(
+        author="user",
+        invocation_id="inv",
+        content=types.Content(role="user", parts=[types.Part(text=text)]),
+        actions=EventActions(state_delta=state),
+    )
+
+
+def texts(session):
+    return [e.content.parts[0].text for e in session.events]
+
+
+def test_queued_writes_are_committed_in_order(tmp_path):
+    path = tmp_path / "sessions.db"
+
+    async def main():
+        store = service(path, flush_interval=60, max_batch=3)
+        session = await store.create_session(app_name=APP, user_id="u", session_id="s")
+        for i in range(7):
+            await store.append_event(session, event(f"turn {i}", turn=i))
+        # A full batch is committed without waiting for the flush interval
+        await asyncio.sleep(0.05)
+        assert store.batches >= 1 and store.stats()["pending_writes"] < 8
+        await store.close()
+
+    asyncio.run(main())
+
+    async def reload():
+        store = service(path)
+        session = await store.get_session(app_name=APP, user_id="u", session_id="s")
+        await store.close()
+        return session
+
+    session = asyncio.run(reload())
+    assert texts(session) == [f"turn {i}" for i in range(7)]
+    assert session.state["turn"] == 6
+
+
+def test_sessions_reload_after_close_with_scoped_state(tmp_path):
+    path = tmp_path / "sessions.db"
+
+    async def write():
+        store = service(path, flush_interval=60)
+        session = await store.create_session(app_name=APP, user_id="u", session_id="s", state={"app:snapshot": "2025"})
+        await store.append_event(session, event("hello", **{"user:units": "metric", "topic": "oncology"}))
+        await store.close()
+
+    async def read():
+        store = service(path)
+        session = await store.get_session(app_name=APP, user_id="u", session_id="s")
+        listed = await store.list_sessions(app_name=APP, user_id="u")
+        await store.close()
+        return session, listed
+
+    asyncio.run(write())
+    session, listed = asyncio.run(read())
+    assert texts(session) == ["hello"]
+    assert session.state == {"app:snapshot": "2025", "user:units": "metric", "topic": "oncology"}
+    assert [s.id for s in listed.sessions] == ["s"]
+
+
+def test_delete_removes_the_session_and_its_events(tmp_path):
+    path = tmp_path / "sessions.db"
+
+    async def main():
+        store = service(path, flush_interval=60)
+        for session_id in ("keep", "drop"):
+            session = await store.create_session(app_name=APP, user_id="u", session_id=session_id)
+            await store.append_event(session, event(session_id))
+        await store.delete_session(app_name=APP, user_id="u", session_id="drop")
+        assert await store.get_session(app_name=APP, user_id="u", session_id="drop") is None
+        await store.close()
+
+        store = service(path)
+        assert await store.get_session(app_name=APP, user_id="u", session_id="drop") is None
+        kept = await store.get_session(app_name=APP, user_id="u", session_id="keep")
+        assert texts(kept) == ["keep"]
+        assert store.backend.count_sessions() == 1
+        await store.close()
+
+    asyncio.run(main())
+
+
+def test_flush_plugin_commits_after_each_invocation(tmp_path):
+    store = service(tmp_path / "sessions.db", flush_interval=60)
+    plugin = SessionFlushPlugin(store)
+
+    async def main():
+        session = await store.create_session(app_name=APP, user_id="u", session_id="s")
+        await store.append_event(session, event("hi"))
+        assert store.stats()["pending_writes"] == 2
+        await plugin.after_run_callback(invocation_context=SimpleNamespace())
+        assert store.stats()["pending_writes"] == 0 and store.writes == 2
+
+    asyncio.run(main())
+
+
+def test_service_outlives_an_event_loop(tmp_path):
+    store = service(tmp_path / "sessions.db", flush_interval=0.01)
+
+    async def turn(session_id):
+        session = await store.create_session(app_name=APP, user_id="u", session_id=session_id)
+        await store.append_event(session, event(session_id))
+        await store.flush()
+
+    asyncio.run(turn("first"))
+    asyncio.run(turn("second"))
+
+    async def close():
+        await store.close()
+
+    asyncio.run(close())
+    assert store.writes == 4
@@ -0,0 +1,95 @@
+"""Tests for the circuit breaker and its use by the MCP clients."""
+
+import asyncio
+import contextlib
+from types import SimpleNamespace
+
+from adk_aact_agent_project.mcp_pool import MCPServerPool
+from adk_aact_agent_project.supervisor import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, SupervisedClient
+
+
+def open_breaker():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.0)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.trips == 1
+    return breaker
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60.0)
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+    assert 0 < breaker.retry_after() <= 60.0
+
+
+def test_half_open_allows_one_trial():
+    breaker = open_breaker()
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow()
+
+
+def test_failed_trial_reopens():
+    breaker = open_breaker()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.trips == 1
+
+
+def cancel_trial(call):
+    """Start ``call()`` as the trial, cancel it, and return it."""
+    async def main():
+        task = asyncio.create_task(call())
+        for _ in range(10):
+            await asyncio.sleep(0)
+        task.cancel()
+        results = await asyncio.gather(task, return_exceptions=True)
+        assert isinstance(results[0], asyncio.CancelledError)
+
+    asyncio.run(main())
+
+
+class HangingServer:
+    alive = True
+
+    async def call_tool(self, name, arguments=None, **kwargs):
+        await asyncio.sleep(60)
+
+
+def test_cancelled_supervised_trial_frees_the_slot():
+    breaker = open_breaker()
+    client = SupervisedClient("uvx", [], breaker=breaker)
+    client.client = HangingServer()
+    client._ready.set()
+    cancel_trial(lambda: client.call_tool("read_query", {"query": "SELECT 1"}))
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+def test_cancelled_pool_trial_frees_the_slot():
+    breaker = open_breaker()
+    pool = MCPServerPool("uvx", [], breaker=breaker, call_timeout=60.0)
+
+    @contextlib.asynccontextmanager
+    async def checkout():
+        yield HangingServer()
+
+    pool.checkout = checkout
+    cancel_trial(lambda: pool.call_tool("read_query", {"query": "SELECT 1"}))
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+def test_unexpected_error_counts_as_failure():
+    breaker = CircuitBreaker(failure_threshold=1)
+    client = SupervisedClient("uvx", [], breaker=breaker)
+    client.client = SimpleNamespace(alive=True, call_tool=None)
+    client._ready.set()
+    with contextlib.suppress(TypeError):
+        asyncio.run(client.call_tool("read_query"))
+    assert breaker.state == OPEN